@@ -0,0 +1,20 @@
+"""
+ASGI config for jankenfw project.
+It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests are handled by Django, WebSocket connections by the game events
+endpoint. For more information on this file, see
+https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
+"""
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "jankenfw.config")
+os.environ.setdefault("DJANGO_CONFIGURATION", "Production")
+
+from configurations.asgi import application as django_application  # noqa
+from jankenfw.game.consumers import game_events  # noqa
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        return await game_events(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -27,6 +27,7 @@ class Common(Configuration):
 
     # https://docs.djangoproject.com/en/2.0/topics/http/middleware/
     MIDDLEWARE = (
+        "libs.middleware.RequestMetricsMiddleware",
         "django.middleware.security.SecurityMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -40,6 +41,7 @@ class Common(Configuration):
     ROOT_URLCONF = "jankenfw.urls"
     SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
     WSGI_APPLICATION = "jankenfw.wsgi.application"
+    ASGI_APPLICATION = "jankenfw.asgi.application"
 
     # Email
     EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -167,6 +169,7 @@ class Common(Configuration):
                 "propagate": False,
             },
             "django.db.backends": {"handlers": ["console"], "level": "INFO"},
+            "libs.middleware": {"handlers": ["console"], "level": "WARNING"},
         },
     }
 
@@ -190,3 +193,63 @@ class Common(Configuration):
             "rest_framework.authentication.TokenAuthentication",
         ),
     }
+
+    # Models
+    # Primary keys of BaseModel rows, 'libs.ids.uuid7' makes time-ordered keys
+    PRIMARY_KEY_GENERATOR = os.getenv("PRIMARY_KEY_GENERATOR", "uuid.uuid4")
+
+    # Game
+    # Seconds after which the in-memory high score list is reloaded from the database
+    LEADERBOARD_TTL = int(os.getenv("LEADERBOARD_TTL", 60))
+    # Seconds after which the move analytics are computed again
+    ANALYTICS_TTL = int(os.getenv("ANALYTICS_TTL", 600))
+    # Channel layer delivering game events to WebSocket subscribers
+    GAME_CHANNEL_LAYER = os.getenv(
+        "GAME_CHANNEL_LAYER", "jankenfw.game.events.InMemoryChannelLayer"
+    )
+    # Cache of game states used to check moves without the database
+    GAME_STATE_CACHE = os.getenv(
+        "GAME_STATE_CACHE", "jankenfw.game.state.LocalGameStateCache"
+    )
+    GAME_STATE_CACHE_SIZE = int(os.getenv("GAME_STATE_CACHE_SIZE", 10000))
+    GAME_STATE_CACHE_TTL = int(os.getenv("GAME_STATE_CACHE_TTL", 300))
+    # Django cache used by 'jankenfw.game.state.DjangoGameStateCache'
+    GAME_STATE_CACHE_ALIAS = os.getenv("GAME_STATE_CACHE_ALIAS", "default")
+    # Queue pairing players waiting for an opponent
+    GAME_MATCHMAKING_QUEUE = os.getenv(
+        "GAME_MATCHMAKING_QUEUE", "jankenfw.game.matchmaking.InMemoryMatchmakingQueue"
+    )
+    # Return moves before they are written, see 'jankenfw.game.writebehind'
+    GAME_WRITE_BEHIND = strtobool(os.getenv("GAME_WRITE_BEHIND", "no"))
+    # Maximum number of seconds a move waits before it is written to the database
+    GAME_WRITE_BEHIND_DELAY = float(os.getenv("GAME_WRITE_BEHIND_DELAY", 1))
+    # Number of queued journal entries that triggers a flush before the delay
+    GAME_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("GAME_WRITE_BEHIND_BATCH_SIZE", 1000))
+    # Journal of moves not written yet, replayed on start, they are lost if empty
+    GAME_WRITE_BEHIND_JOURNAL = os.getenv("GAME_WRITE_BEHIND_JOURNAL", "")
+    # Sync the journal to disk after every move
+    GAME_WRITE_BEHIND_FSYNC = strtobool(os.getenv("GAME_WRITE_BEHIND_FSYNC", "no"))
+    # Strategies of bot players by name, see 'jankenfw.game.bots'
+    GAME_BOT_STRATEGIES = {
+        "random": "jankenfw.game.bots.RandomStrategy",
+        "frequency": "jankenfw.game.bots.FrequencyStrategy",
+        "markov": "jankenfw.game.bots.MarkovStrategy",
+    }
+    # Threads making the moves of bots, 0 makes them in the thread of the opponent
+    GAME_BOT_WORKERS = int(os.getenv("GAME_BOT_WORKERS", 4))
+    # Number of past moves of an opponent loaded when bots meet them first
+    GAME_BOT_HISTORY = int(os.getenv("GAME_BOT_HISTORY", 200))
+    # Number of opponents whose move history is kept in memory
+    GAME_BOT_MEMORY_SIZE = int(os.getenv("GAME_BOT_MEMORY_SIZE", 10000))
+    # Directory of the columnar archive of finished games, see 'jankenfw.game.archive'
+    GAME_ARCHIVE_DIR = os.getenv(
+        "GAME_ARCHIVE_DIR", join(os.path.dirname(BASE_DIR), "archive")
+    )
+
+    # Metrics
+    # Requests running more queries are logged as a warning
+    METRICS_QUERY_BUDGET = int(os.getenv("METRICS_QUERY_BUDGET", 20))
+    # Number of the last requests of a route the metric quantiles are computed from
+    METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", 1000))
+    # Bearer token required to read the metrics, they are public if it's empty
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
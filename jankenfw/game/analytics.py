@@ -0,0 +1,251 @@
+"""
+Move distributions and predictability of players across all games.
+
+The moves of finished rounds are loaded in bulk as columns of small ints, from
+the Move table with a single 'values_list' query and from the memory-mapped
+archive, see 'jankenfw.game.archive'. The statistics are computed from the
+columns by NumPy in one pass and kept in memory for 'ANALYTICS_TTL' seconds.
+"""
+
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from jankenfw.game.archive import UUID_DTYPE, MoveArchive
+from jankenfw.game.enum import MoveChoices
+from jankenfw.game.models import Move
+from jankenfw.game.rules import SIZE
+
+# Id of a missing winner in the UUID columns
+NO_ID = bytes(16)
+
+# Results of a round for the player of a move, as in the archive
+RESULTS = {"after_win": 1, "after_tie": 0, "after_loss": -1}
+
+
+class MoveColumns:
+    """
+    Moves of finished rounds as columns, every player and game is an index.
+    """
+
+    __slots__ = ("player", "game", "round", "move", "result")
+
+    def __init__(self, player, game, round, move, result) -> None:
+        self.player = np.asarray(player, dtype=np.int64)
+        self.game = np.asarray(game, dtype=np.int64)
+        self.round = np.asarray(round, dtype=np.int32)
+        self.move = np.asarray(move, dtype=np.int8)
+        self.result = np.asarray(result, dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.move)
+
+    @classmethod
+    def concatenate(cls, parts: Iterable["MoveColumns"]) -> "MoveColumns":
+        """
+        Return the moves of all parts, the players and games of every part are
+        numbered after the ones of the previous parts.
+        """
+
+        players, games = [], []
+        player_offset = game_offset = 0
+        parts = list(parts)
+        for part in parts:
+            players.append(part.player + player_offset)
+            games.append(part.game + game_offset)
+            if len(part):
+                player_offset += int(part.player.max()) + 1
+                game_offset += int(part.game.max()) + 1
+        if not parts:
+            return cls([], [], [], [], [])
+        return cls(
+            np.concatenate(players),
+            np.concatenate(games),
+            *(
+                np.concatenate([getattr(part, name) for part in parts])
+                for name in ("round", "move", "result")
+            ),
+        )
+
+
+def _uuids(values: Iterable[Optional[UUID]]) -> np.ndarray:
+    return np.array(
+        [NO_ID if value is None else value.bytes for value in values], dtype=UUID_DTYPE
+    )
+
+
+def load_moves(chunk_size: int = 10000) -> MoveColumns:
+    """
+    Return the moves of the finished rounds in the Move table.
+
+    Every chunk of rows is turned into arrays and the players and games are
+    numbered by 'np.unique' once all rows are read.
+    """
+
+    rows = (
+        Move.objects.filter(game_round__move_count__gte=2)
+        .values_list(
+            "player_id",
+            "game_id",
+            "game_round__round_number",
+            "move",
+            "game_round__winner_id",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+    chunks = []
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        player_ids, game_ids, round_numbers, moves, winner_ids = zip(*chunk)
+        chunks.append(
+            (
+                _uuids(player_ids),
+                _uuids(game_ids),
+                np.array(round_numbers, dtype=np.int32),
+                np.array(moves, dtype=np.int8),
+                _uuids(winner_ids),
+            )
+        )
+    if not chunks:
+        return MoveColumns([], [], [], [], [])
+
+    player_ids, game_ids, rounds, moves, winner_ids = (
+        np.concatenate(column) for column in zip(*chunks)
+    )
+    _, players = np.unique(player_ids, return_inverse=True)
+    _, games = np.unique(game_ids, return_inverse=True)
+    results = np.where(
+        winner_ids == player_ids, 1, np.where(winner_ids == np.void(NO_ID), 0, -1)
+    )
+    return MoveColumns(players, games, rounds, moves, results)
+
+
+def load_archived_moves(archive: MoveArchive) -> MoveColumns:
+    """
+    Return the moves in the archive. A player has a different index in every
+    segment, which only matters for statistics across games.
+    """
+
+    return MoveColumns.concatenate(
+        MoveColumns(
+            segment["move_player"],
+            segment["move_game"],
+            segment["move_round"],
+            segment["move"],
+            segment["move_result"],
+        )
+        for segment in archive.segments
+    )
+
+
+def _labels(counts: np.ndarray) -> Dict[str, int]:
+    return {label: int(counts[value]) for value, label in MoveChoices.choices}
+
+
+def _rate(part: int, total: int) -> Optional[float]:
+    return round(part / total, 4) if total else None
+
+
+def compute(columns: MoveColumns) -> Dict:
+    """
+    Return the move frequencies, the tie rate and the moves played after a won,
+    tied or lost round of the same game.
+    """
+
+    moves, results = columns.move, columns.result
+    rounds_won = int(np.count_nonzero(results == 1))
+    rounds_tied = int(np.count_nonzero(results == 0)) // 2
+    rounds = rounds_won + rounds_tied
+    move_counts = np.bincount(moves, minlength=SIZE)
+
+    # Moves of every player in every game in the order of the rounds, a move and
+    # the next one of the same player and game form a transition.
+    order = np.lexsort((columns.round, columns.game, columns.player))
+    player, game = columns.player[order], columns.game[order]
+    moves, results = moves[order].astype(np.int64), results[order]
+    following = (player[1:] == player[:-1]) & (game[1:] == game[:-1])
+    previous, previous_result = moves[:-1][following], results[:-1][following]
+    pairs = previous * SIZE + moves[1:][following]
+
+    transitions, repeat_rates = {}, {}
+    for name, result in RESULTS.items():
+        matrix = np.bincount(
+            pairs[previous_result == result], minlength=SIZE * SIZE
+        ).reshape(SIZE, SIZE)
+        transitions[name] = {
+            label: _labels(matrix[value]) for value, label in MoveChoices.choices
+        }
+        repeat_rates[name] = _rate(int(np.trace(matrix)), int(matrix.sum()))
+
+    return {
+        "moves": len(columns),
+        "rounds": rounds,
+        "rounds_tied": rounds_tied,
+        "tie_rate": _rate(rounds_tied, rounds),
+        "move_counts": _labels(move_counts),
+        "move_frequencies": {
+            label: _rate(int(move_counts[value]), len(columns))
+            for value, label in MoveChoices.choices
+        },
+        "transitions": transitions,
+        "repeat_rates": repeat_rates,
+    }
+
+
+class MoveAnalytics:
+    """
+    Statistics of all moves, computed on first use and again once they get older
+    than 'ANALYTICS_TTL' seconds.
+
+    Only the first report is waited for. Once it expires, one request computes
+    it again while the others get the expired report.
+    """
+
+    def __init__(self) -> None:
+        self._refresh_lock = threading.Lock()
+        # (computed_at, report), replaced as a whole
+        self._computed: Optional[Tuple[float, Dict]] = None
+
+    def clear(self) -> None:
+        self._computed = None
+
+    def compute(self) -> Dict:
+        columns = MoveColumns.concatenate(
+            (load_moves(), load_archived_moves(MoveArchive()))
+        )
+        return {**compute(columns), "computed_at": timezone.now()}
+
+    @staticmethod
+    def _is_fresh(computed: Optional[Tuple[float, Dict]]) -> bool:
+        return (
+            computed is not None
+            and time.monotonic() - computed[0] <= settings.ANALYTICS_TTL
+        )
+
+    def report(self) -> Dict:
+        """
+        Return the statistics, computed by one request at a time.
+        """
+
+        computed = self._computed
+        if not self._is_fresh(computed) and self._refresh_lock.acquire(
+            blocking=computed is None
+        ):
+            try:
+                computed = self._computed
+                if not self._is_fresh(computed):
+                    computed = self._computed = (time.monotonic(), self.compute())
+            finally:
+                self._refresh_lock.release()
+        return computed[1]
+
+
+analytics = MoveAnalytics()
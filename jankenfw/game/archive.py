@@ -0,0 +1,395 @@
+"""
+Columnar archive of the moves of finished games.
+
+'archive_games' moves the Move and GameRound rows of finished games out of the
+database into segments of .npy files in the 'GAME_ARCHIVE_DIR' directory, one
+segment per batch of games:
+
+    games.npy         ids of the games, 16 bytes each
+    game_winner.npy   index of the winner of every game in players.npy, -1 for a tie
+    players.npy       ids of the players, 16 bytes each
+    move_game.npy     index of the game of every move in games.npy
+    move_player.npy   index of the player of every move in players.npy
+    move_round.npy    round number of every move
+    move.npy          the move, a MoveChoices value
+    move_result.npy   1 if the player won the round, 0 for a tie, -1 if lost
+
+Moves are ordered by game, round and the order they were made in. The rows of
+the archived games stay in the database with 'archived_at' set, their counters
+and statistics aren't changed. MoveArchive reads the columns as memory-mapped
+arrays, so statistics are computed by NumPy without loading the archive into
+memory.
+"""
+
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jankenfw.game.enum import GameStatusChoices
+from jankenfw.game.models import Game, GameRound, Move
+from jankenfw.game.rules import SIZE
+from jankenfw.game.state import get_game_state_cache
+from jankenfw.game.stats import Round
+from libs.ids import uuid7
+
+UUID_DTYPE = np.dtype("V16")
+
+COLUMNS = {
+    "games": UUID_DTYPE,
+    "game_winner": np.int32,
+    "players": UUID_DTYPE,
+    "move_game": np.int32,
+    "move_player": np.int32,
+    "move_round": np.int16,
+    "move": np.int8,
+    "move_result": np.int8,
+}
+
+# Number, moves and winner of a round of an archived game
+ArchivedRound = Tuple[int, List[Tuple[UUID, int]], Optional[UUID]]
+
+# Directories of segments being written, renamed once their games are archived
+PENDING_SUFFIX = ".tmp"
+
+
+def _uuids(ids: Sequence[UUID]) -> np.ndarray:
+    return np.array([id.bytes for id in ids], dtype=UUID_DTYPE)
+
+
+class Segment:
+    """
+    Columns of an archive segment, memory-mapped from the .npy files.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in COLUMNS
+        }
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def player_index(self, player_id: UUID) -> Optional[int]:
+        found = np.flatnonzero(self["players"] == np.void(player_id.bytes))
+        return int(found[0]) if found.size else None
+
+    def player_ids(self) -> List[UUID]:
+        return [UUID(bytes=bytes(player)) for player in self["players"]]
+
+    def game_ids(self) -> List[UUID]:
+        return [UUID(bytes=bytes(game)) for game in self["games"]]
+
+    def _groups(self, *keys: np.ndarray) -> Iterator[Tuple[int, int]]:
+        """
+        Yield the (start, end) bounds of the runs of moves with the same keys.
+        """
+
+        if not len(keys[0]):
+            return
+        changed = np.zeros(len(keys[0]) - 1, dtype=bool)
+        for key in keys:
+            changed |= key[1:] != key[:-1]
+        starts = np.flatnonzero(np.concatenate(([True], changed)))
+        ends = np.append(starts[1:], len(keys[0]))
+        yield from zip(starts.tolist(), ends.tolist())
+
+    def game_rounds(self, index: int) -> List[ArchivedRound]:
+        """
+        Return the number, the moves and the winner of every round of the game at
+        the index in games.npy.
+        """
+
+        players = self["players"]
+        move_game = self["move_game"]
+        start = int(np.searchsorted(move_game, index, side="left"))
+        end = int(np.searchsorted(move_game, index, side="right"))
+        move_round, move_player = self["move_round"], self["move_player"]
+        move, results = self["move"], self["move_result"]
+
+        rounds = []
+        for first, last in self._groups(move_round[start:end]):
+            first, last = start + first, start + last
+            moves = [
+                (UUID(bytes=bytes(players[seat])), value)
+                for seat, value in zip(
+                    move_player[first:last].tolist(), move[first:last].tolist()
+                )
+            ]
+            winners = np.flatnonzero(results[first:last] == 1)
+            rounds.append(
+                (
+                    int(move_round[first]),
+                    moves,
+                    moves[winners[0]][0] if winners.size else None,
+                )
+            )
+        return rounds
+
+    def rounds(self) -> Iterator[Round]:
+        """
+        Yield the moves and the winner of every archived round.
+        """
+
+        players = self.player_ids()
+        move_player, move = self["move_player"], self["move"]
+        results = self["move_result"]
+        for start, end in self._groups(self["move_game"], self["move_round"]):
+            seats = move_player[start:end].tolist()
+            winners = np.flatnonzero(results[start:end] == 1)
+            yield (
+                [
+                    (players[seat], value)
+                    for seat, value in zip(seats, move[start:end].tolist())
+                ],
+                players[seats[winners[0]]] if winners.size else None,
+            )
+
+    def games(self) -> Iterator[Tuple[List[UUID], List[int], Optional[UUID]]]:
+        """
+        Yield the players, the rounds won by each of them and the winner of every
+        archived game.
+        """
+
+        players = self.player_ids()
+        move_player, results = self["move_player"], self["move_result"]
+        winners = self["game_winner"]
+        move_game = self["move_game"]
+        for start, end in self._groups(move_game):
+            seats = list(dict.fromkeys(move_player[start:end].tolist()))
+            won = move_player[start:end][results[start:end] == 1].tolist()
+            winner = int(winners[move_game[start]])
+            yield (
+                [players[seat] for seat in seats],
+                [won.count(seat) for seat in seats],
+                players[winner] if winner >= 0 else None,
+            )
+
+
+class MoveArchive:
+    """
+    Segments of the archive directory, read as memory-mapped arrays.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or settings.GAME_ARCHIVE_DIR
+        names = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        self.segments = [
+            Segment(os.path.join(self.directory, name))
+            for name in sorted(names)
+            if not name.endswith(PENDING_SUFFIX)
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(segment["move"]) for segment in self.segments)
+
+    def move_counts(self) -> np.ndarray:
+        """
+        Return the number of archived moves of every choice, indexed by the move.
+        """
+
+        counts = np.zeros(SIZE, dtype=np.int64)
+        for segment in self.segments:
+            counts += np.bincount(segment["move"], minlength=SIZE)
+        return counts
+
+    def game_rounds(self, game_ids: Sequence[UUID]) -> Dict[UUID, List[ArchivedRound]]:
+        """
+        Return the rounds of the archived games by the id of the game.
+        """
+
+        wanted = _uuids(game_ids)
+        found = {}
+        for segment in self.segments:
+            games = segment["games"]
+            for index in np.flatnonzero(np.isin(games, wanted)).tolist():
+                found[UUID(bytes=bytes(games[index]))] = segment.game_rounds(index)
+        return found
+
+    def player_moves(self, player_id: UUID, limit: int) -> List[int]:
+        """
+        Return the last 'limit' archived moves of the player, the oldest first.
+        Segments are read from the latest one until there are enough moves.
+        """
+
+        moves = []
+        for segment in reversed(self.segments):
+            if len(moves) >= limit:
+                break
+            index = segment.player_index(player_id)
+            if index is None:
+                continue
+            found = segment["move"][segment["move_player"] == index]
+            moves[:0] = found[len(moves) - limit :].tolist()
+        return moves
+
+    def rounds(self) -> Iterator[Round]:
+        for segment in self.segments:
+            yield from segment.rounds()
+
+    def games(self) -> Iterator[Tuple[List[UUID], List[int], Optional[UUID]]]:
+        for segment in self.segments:
+            yield from segment.games()
+
+
+def _drop_game_states(game_ids: Sequence[UUID]) -> None:
+    cache = get_game_state_cache()
+    for game_id in game_ids:
+        cache.delete(game_id)
+
+
+def archive_batch(game_ids: Sequence[UUID], directory: str) -> Tuple[int, int]:
+    """
+    Archive the moves and rounds of the finished games into a new segment, return
+    the number of archived games and moves.
+
+    The segment is written before the rows are deleted in the same transaction
+    and renamed into place once it is committed.
+    """
+
+    with transaction.atomic():
+        games = list(
+            Game.objects.select_for_update()
+            .filter(
+                pk__in=game_ids,
+                status=GameStatusChoices.FINISHED,
+                archived_at__isnull=True,
+            )
+            .order_by("id")
+            .values_list("id", "winner_id")
+        )
+        if not games:
+            return 0, 0
+        ids = [game_id for game_id, _ in games]
+
+        moves = list(
+            Move.objects.filter(game_id__in=ids)
+            .order_by("game_id", "game_round__round_number", "created_at")
+            .values_list(
+                "game_id",
+                "player_id",
+                "game_round__round_number",
+                "move",
+                "game_round__winner_id",
+            )
+        )
+        game_index = {game_id: index for index, game_id in enumerate(ids)}
+        players = {}
+        for _, player_id, _, _, _ in moves:
+            players.setdefault(player_id, len(players))
+        for _, winner_id in games:
+            if winner_id is not None:
+                players.setdefault(winner_id, len(players))
+
+        columns = {
+            "games": _uuids(ids),
+            "game_winner": [
+                -1 if winner_id is None else players[winner_id]
+                for _, winner_id in games
+            ],
+            "players": _uuids(list(players)),
+            "move_game": [game_index[move[0]] for move in moves],
+            "move_player": [players[move[1]] for move in moves],
+            "move_round": [move[2] or 0 for move in moves],
+            "move": [move[3] or 0 for move in moves],
+            "move_result": [
+                0 if winner_id is None else 1 if winner_id == player_id else -1
+                for _, player_id, _, _, winner_id in moves
+            ],
+        }
+
+        path = os.path.join(directory, uuid7().hex)
+        pending = path + PENDING_SUFFIX
+        os.makedirs(pending)
+        try:
+            for name, dtype in COLUMNS.items():
+                np.save(
+                    os.path.join(pending, f"{name}.npy"),
+                    np.asarray(columns[name], dtype=dtype),
+                )
+
+            # The rounds and moves of the games change, so do their versions
+            now = timezone.now()
+            Game.objects.filter(pk__in=ids).update(
+                current_round=None,
+                archived_at=now,
+                version=F("version") + 1,
+                updated_at=now,
+            )
+            Move.objects.filter(game_id__in=ids).delete()
+            GameRound.objects.filter(game_id__in=ids).delete()
+        except BaseException:
+            shutil.rmtree(pending, ignore_errors=True)
+            raise
+
+        transaction.on_commit(lambda: os.rename(pending, path))
+        transaction.on_commit(lambda: _drop_game_states(ids))
+
+    return len(ids), len(moves)
+
+
+def recover_segments(directory: str) -> None:
+    """
+    Finish the segments left behind by an interrupted run: a segment is kept if
+    its games were archived, otherwise it is removed.
+    """
+
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if not name.endswith(PENDING_SUFFIX):
+            continue
+        pending = os.path.join(directory, name)
+        try:
+            game_ids = Segment(pending).game_ids()
+        except (OSError, ValueError):
+            game_ids = []
+        if (
+            game_ids
+            and Game.objects.filter(pk__in=game_ids, archived_at__isnull=False).exists()
+        ):
+            os.rename(pending, pending[: -len(PENDING_SUFFIX)])
+        else:
+            shutil.rmtree(pending)
+
+
+def archive_games(
+    before: datetime, batch_size: int = 10000, directory: Optional[str] = None
+) -> Dict:
+    """
+    Archive the games finished before the datetime in segments of at most
+    'batch_size' games.
+    """
+
+    directory = directory or settings.GAME_ARCHIVE_DIR
+    os.makedirs(directory, exist_ok=True)
+    recover_segments(directory)
+
+    candidates = Game.objects.filter(
+        status=GameStatusChoices.FINISHED,
+        archived_at__isnull=True,
+        updated_at__lt=before,
+    ).order_by("id")
+    report = {"segments": 0, "games": 0, "moves": 0}
+    last_id = None
+    while True:
+        batch = candidates if last_id is None else candidates.filter(id__gt=last_id)
+        game_ids = list(batch.values_list("id", flat=True)[:batch_size])
+        if not game_ids:
+            return report
+        last_id = game_ids[-1]
+
+        games, moves = archive_batch(game_ids, directory)
+        if games:
+            report["segments"] += 1
+            report["games"] += games
+            report["moves"] += moves
@@ -0,0 +1,243 @@
+"""
+Bot players and the strategies choosing their moves.
+
+A bot is a Player without a user whose 'bot' field names its strategy in the
+'GAME_BOT_STRATEGIES' setting. It takes a seat with 'join_game' like any other
+player and answers the move of its opponent: once the move is committed, the
+bot's move is made in a pool of 'GAME_BOT_WORKERS' threads, so it adds no
+queries or CPU time to the request of the opponent.
+
+Strategies choose from an OpponentHistory, the counts of the opponent's moves
+kept in the memory of the process. It is updated with every move the bot
+answers, only a missing history is loaded from the last 'GAME_BOT_HISTORY'
+moves of the opponent.
+"""
+
+import logging
+import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
+from uuid import UUID
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from jankenfw.game import rules
+from jankenfw.game.archive import MoveArchive
+from jankenfw.game.models import Move, Player
+from jankenfw.game.rules import SIZE
+
+logger = logging.getLogger(__name__)
+
+MOVES = sorted(rules.BEATS)
+# Moves beating each move
+COUNTERS = {
+    move: sorted(other for other, beaten in rules.BEATS.items() if move in beaten)
+    for move in MOVES
+}
+
+
+class OpponentHistory:
+    """
+    Counts of the moves of an opponent and of the moves following each move,
+    enough to predict the next move without reading the past moves again.
+    """
+
+    __slots__ = ("counts", "transitions", "last")
+
+    def __init__(self, moves: Iterable[int] = ()) -> None:
+        self.counts = [0] * SIZE
+        # Flat SIZE x SIZE matrix indexed by 'previous * SIZE + next'
+        self.transitions = [0] * SIZE * SIZE
+        self.last = None
+        for move in moves:
+            self.record(move)
+
+    def record(self, move: int) -> None:
+        self.counts[move] += 1
+        if self.last is not None:
+            self.transitions[self.last * SIZE + move] += 1
+        self.last = move
+
+    def most_common(self, after: Optional[int] = None) -> Optional[int]:
+        """
+        Return the most common move, or the most common move following the 'after'
+        move, None without such moves.
+        """
+
+        counts = self.counts
+        if after is not None:
+            counts = self.transitions[after * SIZE : (after + 1) * SIZE]
+        move = max(MOVES, key=counts.__getitem__)
+        return move if counts[move] else None
+
+
+class BaseStrategy:
+    """
+    Strategy of a bot choosing its move from the history of its opponent.
+    """
+
+    def __init__(self, randomizer: Optional[random.Random] = None) -> None:
+        self.random = randomizer or random.Random()
+
+    def choose(self, history: OpponentHistory) -> int:
+        raise NotImplementedError
+
+    def counter(self, predicted: Optional[int]) -> int:
+        """
+        Return a move beating the predicted move, a random move without prediction.
+        """
+
+        if predicted is None:
+            return self.random.choice(MOVES)
+        return self.random.choice(COUNTERS[predicted])
+
+
+class RandomStrategy(BaseStrategy):
+    """
+    Play random moves, which can't be predicted.
+    """
+
+    def choose(self, history: OpponentHistory) -> int:
+        return self.counter(None)
+
+
+class FrequencyStrategy(BaseStrategy):
+    """
+    Beat the move the opponent played most often.
+    """
+
+    def choose(self, history: OpponentHistory) -> int:
+        return self.counter(history.most_common())
+
+
+class MarkovStrategy(BaseStrategy):
+    """
+    Beat the move the opponent played most often after their last move, the most
+    common move if their last move wasn't followed yet.
+    """
+
+    def choose(self, history: OpponentHistory) -> int:
+        predicted = None
+        if history.last is not None:
+            predicted = history.most_common(after=history.last)
+        if predicted is None:
+            predicted = history.most_common()
+        return self.counter(predicted)
+
+
+def load_history(opponent_id: UUID) -> List[int]:
+    """
+    Return the last 'GAME_BOT_HISTORY' moves of the opponent in finished rounds,
+    the oldest first. Moves of archived games are read from the archive if there
+    are fewer moves in the database.
+    """
+
+    limit = settings.GAME_BOT_HISTORY
+    moves = list(
+        Move.objects.filter(player_id=opponent_id, game_round__move_count__gte=2)
+        .order_by("-created_at")
+        .values_list("move", flat=True)[:limit]
+    )
+    moves.reverse()
+    if len(moves) < limit:
+        moves[:0] = MoveArchive().player_moves(opponent_id, limit - len(moves))
+    return moves
+
+
+class BotMemory:
+    """
+    Histories of the opponents of bots kept in the memory of the process.
+
+    At most 'GAME_BOT_MEMORY_SIZE' opponents are kept, the least recently used
+    are evicted first.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # opponent_id -> OpponentHistory, the least recently used first
+        self._histories: OrderedDict = OrderedDict()
+
+    def choose(self, strategy: BaseStrategy, opponent_id: UUID, move: int) -> int:
+        """
+        Return the move chosen by the strategy and record the move of the opponent
+        afterwards, so the strategy doesn't see the move it answers.
+        """
+
+        with self._lock:
+            history = self._histories.get(opponent_id)
+        if history is None:
+            loaded = OpponentHistory(load_history(opponent_id))
+
+        with self._lock:
+            if history is None:
+                history = self._histories.setdefault(opponent_id, loaded)
+            self._histories.move_to_end(opponent_id)
+            while len(self._histories) > settings.GAME_BOT_MEMORY_SIZE:
+                self._histories.popitem(last=False)
+
+            chosen = strategy.choose(history)
+            history.record(move)
+        return chosen
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histories.clear()
+
+
+@lru_cache(maxsize=None)
+def get_bot_memory() -> BotMemory:
+    return BotMemory()
+
+
+@lru_cache(maxsize=None)
+def get_strategy(name: str) -> BaseStrategy:
+    """
+    Return the strategy with the name in the 'GAME_BOT_STRATEGIES' setting, raise
+    KeyError for an unknown name.
+    """
+
+    return import_string(settings.GAME_BOT_STRATEGIES[name])()
+
+
+def get_bot_player(strategy: str) -> Player:
+    """
+    Return the bot player of the strategy, it's created on first use.
+    """
+
+    player, _ = Player.objects.get_or_create(user=None, bot=strategy)
+    return player
+
+
+@lru_cache(maxsize=None)
+def get_bot_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=settings.GAME_BOT_WORKERS, thread_name_prefix="bot"
+    )
+
+
+def submit_bot_task(task: Callable[[], object]) -> None:
+    """
+    Run the task in the bot worker pool, or right away with 'GAME_BOT_WORKERS' set
+    to 0, e.g. in tests.
+    """
+
+    if settings.GAME_BOT_WORKERS <= 0:
+        task()
+        return
+    get_bot_pool().submit(_run_in_worker, task)
+
+
+def _run_in_worker(task: Callable[[], object]) -> None:
+    # Worker threads keep their own connections, like requests they drop stale ones.
+    close_old_connections()
+    try:
+        task()
+    except Exception:
+        logger.exception("The move of a bot failed.")
+    finally:
+        close_old_connections()
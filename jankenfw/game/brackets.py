@@ -0,0 +1,75 @@
+"""
+Pairings of tournament players, independent of the database.
+
+A single elimination stage pairs the remaining players in order and the player
+left over gets a bye to the next stage, so n players are resolved in
+ceil(log2 n) stages. A round-robin tournament pairs every player with every
+other player once using the circle method, in n - 1 stages for an even n and
+n stages for an odd n, with a different player getting a bye in each stage.
+"""
+
+from typing import List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+Pairing = Tuple[List[Tuple[T, T]], Optional[T]]
+
+
+def elimination_stages(players: int) -> int:
+    """
+    Return the number of single elimination stages of the players, replays of
+    tied games not included.
+    """
+
+    return max(players - 1, 0).bit_length()
+
+
+def elimination_pairs(players: Sequence[T]) -> Pairing:
+    """
+    Return the games of a single elimination stage and the player with a bye.
+    """
+
+    pairs = [
+        (players[index], players[index + 1]) for index in range(0, len(players) - 1, 2)
+    ]
+    bye = players[-1] if len(players) % 2 else None
+    return pairs, bye
+
+
+def round_robin_stages(players: int) -> int:
+    """
+    Return the number of round-robin stages of the players.
+    """
+
+    if players < 2:
+        return 0
+    return players - 1 if players % 2 == 0 else players
+
+
+def round_robin_pairs(players: Sequence[T], stage: int) -> Pairing:
+    """
+    Return the games of the round-robin stage, numbered from 1, and the player
+    with a bye.
+
+    The first player stays in place while the others rotate by one position
+    every stage, the players facing each other in the circle are paired.
+    """
+
+    circle = list(players)
+    if len(circle) % 2:
+        circle.append(None)
+    if len(circle) < 2:
+        return [], None
+
+    rest = circle[1:]
+    shift = (stage - 1) % len(rest)
+    circle = [circle[0], *rest[shift:], *rest[:shift]]
+
+    pairs, bye = [], None
+    for index in range(len(circle) // 2):
+        first, second = circle[index], circle[-1 - index]
+        if first is None or second is None:
+            bye = second if first is None else first
+        else:
+            pairs.append((first, second))
+    return pairs, bye
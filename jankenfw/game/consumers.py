@@ -0,0 +1,79 @@
+import asyncio
+import json
+import re
+from typing import Optional
+from urllib.parse import parse_qs
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.authtoken.models import Token
+
+from jankenfw.game.events import game_channel, get_channel_layer
+from jankenfw.game.models import Game
+
+GAME_EVENTS_PATH = re.compile(r"^/ws/game/(?P<pk>[0-9a-fA-F-]{32,36})/$")
+
+
+@sync_to_async
+def _can_subscribe(token: Optional[str], game_id: UUID) -> bool:
+    """
+    Check the token of the user and that the game exists.
+    """
+
+    if not token or not Token.objects.filter(key=token).exists():
+        return False
+    return Game.objects.filter(pk=game_id).exists()
+
+
+async def game_events(scope, receive, send) -> None:
+    """
+    WebSocket endpoint that pushes the events of a single game to the client.
+
+    Connect to '/ws/game/<game id>/?token=<auth token>'. Each event is sent as
+    a JSON text frame, e.g. {"type": "move_made", "game": "...", "player": "..."}.
+    Messages sent by the client are ignored.
+    """
+
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    match = GAME_EVENTS_PATH.match(scope["path"])
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token", [None])[0]
+
+    try:
+        game_id = UUID(match["pk"]) if match else None
+    except ValueError:
+        game_id = None
+
+    if game_id is None or not await _can_subscribe(token, game_id):
+        await send({"type": "websocket.close", "code": 4403})
+        return
+
+    # Subscribe before accepting, so no event published after the accept is missed.
+    subscription = get_channel_layer().subscribe(game_channel(game_id))
+    await send({"type": "websocket.accept"})
+
+    receiver = asyncio.ensure_future(receive())
+    getter = asyncio.ensure_future(subscription.get())
+
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {receiver, getter}, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if getter in done:
+                text = json.dumps(getter.result(), cls=DjangoJSONEncoder)
+                await send({"type": "websocket.send", "text": text})
+                getter = asyncio.ensure_future(subscription.get())
+
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.ensure_future(receive())
+    finally:
+        receiver.cancel()
+        getter.cancel()
+        subscription.close()
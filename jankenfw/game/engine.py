@@ -0,0 +1,193 @@
+"""
+Rules of a game, independent of the database.
+
+A LiveGame holds the state of one game in a few small integers and lists:
+players are encoded as seats 0 and 1 in the order they joined and moves are
+the MoveChoices values. 'services' restores a LiveGame from the rows it
+locked, applies the action and persists the result.
+"""
+
+from typing import Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from jankenfw.game import rules
+from jankenfw.game.enum import GameStatusChoices
+
+WAITING_FOR_PLAYER = int(GameStatusChoices.WAITING_FOR_PLAYER)
+IN_PROGRESS = int(GameStatusChoices.IN_PROGRESS)
+FINISHED = int(GameStatusChoices.FINISHED)
+
+
+class GameError(Exception):
+    """
+    An action that the rules don't allow, the message is shown to the player.
+    """
+
+
+class MoveResult:
+    """
+    Outcome of a single move.
+
+    Winners are player keys, None for a tie or while the round or the game
+    goes on.
+    """
+
+    __slots__ = (
+        "round_number",
+        "round_finished",
+        "round_winner",
+        "game_finished",
+        "game_winner",
+        "rounds_won",
+    )
+
+    def __init__(
+        self,
+        round_number: int,
+        round_finished: bool = False,
+        round_winner: Optional[Hashable] = None,
+        game_finished: bool = False,
+        game_winner: Optional[Hashable] = None,
+        rounds_won: int = 0,
+    ) -> None:
+        self.round_number = round_number
+        self.round_finished = round_finished
+        self.round_winner = round_winner
+        self.game_finished = game_finished
+        self.game_winner = game_winner
+        self.rounds_won = rounds_won
+
+
+class LiveGame:
+    """
+    State machine of a game of two players.
+
+    Players are identified by any hashable key (e.g. the id of the Player row),
+    which is mapped to its seat when the player joins.
+    """
+
+    __slots__ = (
+        "rounds",
+        "status",
+        "players",
+        "next_seat",
+        "round_number",
+        "round_moves",
+        "round_winners",
+    )
+
+    def __init__(
+        self,
+        rounds: int,
+        status: int = WAITING_FOR_PLAYER,
+        players: Sequence[Hashable] = (),
+        next_move: Optional[Hashable] = None,
+        round_number: int = 1,
+        round_moves: Iterable[Tuple[Hashable, int]] = (),
+        round_winners: Iterable[Optional[Hashable]] = (),
+    ) -> None:
+        self.rounds = rounds
+        self.status = int(status)
+        self.players: List[Hashable] = list(players)
+        self.next_seat: Optional[int] = (
+            None if next_move is None else self.players.index(next_move)
+        )
+        self.round_number = round_number
+        # (seat, move) in the order the moves were made
+        self.round_moves: List[Tuple[int, int]] = [
+            (self.players.index(player), move) for player, move in round_moves
+        ]
+        # Seat of the winner of every finished round, None for a tie
+        self.round_winners: List[Optional[int]] = [
+            None if player is None else self.players.index(player)
+            for player in round_winners
+        ]
+
+    @property
+    def next_move(self) -> Optional[Hashable]:
+        return None if self.next_seat is None else self.players[self.next_seat]
+
+    def join(self, player: Hashable) -> int:
+        """
+        Add the player to the game and return its seat, the game starts when the
+        second player joins.
+        """
+
+        if player in self.players:
+            raise GameError("You have already joined this game.")
+        elif self.status == FINISHED:
+            raise GameError("This game is finished.")
+        elif len(self.players) >= 2:
+            raise GameError("This game is full.")
+
+        self.players.append(player)
+        if len(self.players) == 2:
+            self.status = IN_PROGRESS
+        return len(self.players) - 1
+
+    def check_move(self, player: Hashable) -> None:
+        """
+        Raise GameError if the player can't move now.
+        """
+
+        if self.status == FINISHED:
+            raise GameError("This game is finished.")
+        elif self.status == WAITING_FOR_PLAYER:
+            raise GameError("Waiting for players.")
+        elif player not in self.players:
+            raise GameError("You are not a player in this game.")
+        elif self.next_seat is not None and self.players[self.next_seat] != player:
+            raise GameError("It's not your move.")
+
+    def move(self, player: Hashable, move: int) -> MoveResult:
+        """
+        Make the move of the player, the second move of a round resolves it.
+        """
+
+        self.check_move(player)
+        seat = self.players.index(player)
+        self.round_moves.append((seat, move))
+
+        if len(self.round_moves) < 2:
+            self.next_seat = 1 - seat
+            return MoveResult(self.round_number)
+
+        return self._finish_round()
+
+    def wins(self) -> List[int]:
+        """
+        Return the number of rounds won by each seat.
+        """
+
+        return [self.round_winners.count(0), self.round_winners.count(1)]
+
+    def _finish_round(self) -> MoveResult:
+        (first_seat, first_move), (second_seat, second_move) = self.round_moves
+        outcome = rules.resolve(first_move, second_move)
+        if outcome == rules.FIRST:
+            winner = first_seat
+        elif outcome == rules.SECOND:
+            winner = second_seat
+        else:
+            winner = None
+
+        result = MoveResult(
+            self.round_number,
+            round_finished=True,
+            round_winner=None if winner is None else self.players[winner],
+        )
+        self.round_winners.append(winner)
+        self.round_moves = []
+        self.next_seat = None
+
+        if self.round_number < self.rounds:
+            self.round_number += 1
+            return result
+
+        self.status = FINISHED
+        result.game_finished = True
+        wins = self.wins()
+        if wins[0] != wins[1]:
+            seat = 0 if wins[0] > wins[1] else 1
+            result.game_winner = self.players[seat]
+            result.rounds_won = wins[seat]
+        return result
@@ -9,9 +9,8 @@ class MoveChoices(models.IntegerChoices):
     Rock = 1, "rock"
     Paper = 2, "paper"
     Scissors = 3, "scissors"
-    # TODO: Implement below options
-    # Lizard = 4, "lizard"
-    # Spock = 5, "spock"
+    Lizard = 4, "lizard"
+    Spock = 5, "spock"
 
 
 class GameStatusChoices(models.IntegerChoices):
@@ -22,3 +21,12 @@ class GameStatusChoices(models.IntegerChoices):
     WAITING_FOR_PLAYER = 1, "waiting for player"
     IN_PROGRESS = 2, "in progress"
     FINISHED = 3, "finished"
+
+
+class TournamentFormatChoices(models.IntegerChoices):
+    """
+    Formats of a tournament.
+    """
+
+    SINGLE_ELIMINATION = 1, "single elimination"
+    ROUND_ROBIN = 2, "round robin"
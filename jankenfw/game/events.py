@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Set
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    A single subscriber of a channel, events are read with 'get'.
+    """
+
+    async def get(self) -> Dict:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class BaseChannelLayer:
+    """
+    Delivers events published to a channel to all of its subscribers.
+    """
+
+    def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+    def publish(self, channel: str, event: Dict) -> None:
+        raise NotImplementedError
+
+
+class InMemorySubscription(Subscription):
+    def __init__(self, layer: "InMemoryChannelLayer", channel: str) -> None:
+        self.layer = layer
+        self.channel = channel
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def put(self, event: Dict) -> None:
+        """
+        Queue the event, it can be called from any thread.
+        """
+
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        except RuntimeError:
+            # The event loop of the subscriber is already closed.
+            self.close()
+
+    async def get(self) -> Dict:
+        return await self._queue.get()
+
+    def close(self) -> None:
+        self.layer.unsubscribe(self)
+
+
+class InMemoryChannelLayer(BaseChannelLayer):
+    """
+    Channel layer delivering events to subscribers of the same process.
+
+    It needs no external service, but subscribers connected to other processes
+    don't get the events. Use a shared channel layer to run more than one process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, Set[InMemorySubscription]] = defaultdict(set)
+
+    def subscribe(self, channel: str) -> InMemorySubscription:
+        """
+        Subscribe to the channel, it has to be called from a running event loop.
+        """
+
+        subscription = InMemorySubscription(self, channel)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: InMemorySubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.channel, None)
+
+    def publish(self, channel: str, event: Dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+@lru_cache(maxsize=None)
+def get_channel_layer() -> BaseChannelLayer:
+    """
+    Return the channel layer set with the 'GAME_CHANNEL_LAYER' setting.
+    """
+
+    return import_string(settings.GAME_CHANNEL_LAYER)()
+
+
+def game_channel(game_id: UUID) -> str:
+    return f"game.{game_id}"
+
+
+def publish_event(game_id: UUID, event_type: str, **data: Any) -> None:
+    """
+    Publish an event to subscribers of the game once the current transaction
+    is committed.
+    """
+
+    event = {"type": event_type, "game": str(game_id), **data}
+    transaction.on_commit(
+        lambda: get_channel_layer().publish(game_channel(game_id), event)
+    )
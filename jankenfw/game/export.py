@@ -0,0 +1,186 @@
+"""
+Streaming export of games with their rounds and moves.
+
+Games are read with a server-side cursor ('iterator(chunk_size=...)') and the
+players, rounds and moves of every chunk of games are read by one query each,
+so the memory used doesn't depend on the number of exported games. The rounds
+of archived games are read from the MoveArchive, their moves have no time.
+Games are written as NDJSON, one game with its nested rounds and moves per line,
+or as CSV, one row per move.
+"""
+
+import csv
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import orjson
+from django.db.models import QuerySet
+
+from jankenfw.game.archive import MoveArchive
+from jankenfw.game.models import Game, GameRound, Move
+
+FORMATS = ("ndjson", "csv")
+
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+CSV_HEADER = (
+    "game",
+    "created_at",
+    "status",
+    "rounds",
+    "winner",
+    "round_number",
+    "round_winner",
+    "player",
+    "move",
+    "moved_at",
+    "archived_at",
+)
+
+
+def filter_games(
+    status: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> QuerySet:
+    """
+    Return the games with the status, created in the [since, until) range.
+    """
+
+    games = Game.objects.all()
+    if status is not None:
+        games = games.filter(status=status)
+    if since is not None:
+        games = games.filter(created_at__gte=since)
+    if until is not None:
+        games = games.filter(created_at__lt=until)
+    return games
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_games(games: QuerySet, chunk_size: int = 2000) -> Iterator[Dict]:
+    """
+    Yield the games with their players, rounds and moves, ordered by creation.
+    """
+
+    rows = (
+        games.order_by("created_at", "id")
+        .values("id", "created_at", "status", "rounds", "winner", "archived_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    archive = None
+    for chunk in _chunks(rows, chunk_size):
+        game_ids = [game["id"] for game in chunk]
+
+        players = defaultdict(list)
+        for game_id, player_id in (
+            Game.player.through.objects.filter(game_id__in=game_ids)
+            .order_by("id")
+            .values_list("game_id", "player_id")
+        ):
+            players[game_id].append(player_id)
+
+        moves = defaultdict(list)
+        for round_id, player_id, move, created_at in (
+            Move.objects.filter(game_id__in=game_ids)
+            .order_by("created_at")
+            .values_list("game_round_id", "player_id", "move", "created_at")
+        ):
+            moves[round_id].append(
+                {"player": player_id, "move": move, "created_at": created_at}
+            )
+
+        rounds = defaultdict(list)
+        for round_id, game_id, round_number, winner_id in (
+            GameRound.objects.filter(game_id__in=game_ids)
+            .order_by("round_number")
+            .values_list("id", "game_id", "round_number", "winner_id")
+        ):
+            rounds[game_id].append(
+                {
+                    "round_number": round_number,
+                    "winner": winner_id,
+                    "moves": moves[round_id],
+                }
+            )
+
+        archived_ids = [game["id"] for game in chunk if game["archived_at"]]
+        if archived_ids:
+            archive = archive or MoveArchive()
+            for game_id, game_rounds in archive.game_rounds(archived_ids).items():
+                rounds[game_id] = [
+                    {
+                        "round_number": round_number,
+                        "winner": winner_id,
+                        "moves": [
+                            {"player": player_id, "move": move, "created_at": None}
+                            for player_id, move in moves
+                        ],
+                    }
+                    for round_number, moves, winner_id in game_rounds
+                ]
+
+        for game in chunk:
+            game["players"] = players[game["id"]]
+            game["game_rounds"] = rounds[game["id"]]
+            yield game
+
+
+def ndjson_lines(games: Iterable[Dict]) -> Iterator[bytes]:
+    for game in games:
+        yield orjson.dumps(game, option=orjson.OPT_APPEND_NEWLINE)
+
+
+class _Echo:
+    """
+    File-like object returning what is written to it, for csv.writer.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(games: Iterable[Dict]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for game in games:
+        columns = (
+            game["id"],
+            game["created_at"].isoformat(),
+            game["status"],
+            game["rounds"],
+            game["winner"] or "",
+        )
+        archived_at = game["archived_at"].isoformat() if game["archived_at"] else ""
+        for game_round in game["game_rounds"]:
+            for move in game_round["moves"]:
+                yield writer.writerow(
+                    (
+                        *columns,
+                        game_round["round_number"],
+                        game_round["winner"] or "",
+                        move["player"],
+                        move["move"],
+                        move["created_at"].isoformat() if move["created_at"] else "",
+                        archived_at,
+                    )
+                )
+
+
+def export_lines(games: QuerySet, format: str, chunk_size: int = 2000) -> Iterator:
+    """
+    Return the lines of the exported games in the format, 'ndjson' or 'csv'.
+    """
+
+    rows = iter_games(games, chunk_size)
+    return ndjson_lines(rows) if format == "ndjson" else csv_lines(rows)
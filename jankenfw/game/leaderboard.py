@@ -0,0 +1,137 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.db import connection
+
+from jankenfw.game.models import Player
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    """
+    High score list of all players kept sorted in memory.
+
+    Players are ordered by games won, players with the same number of won games
+    share the same rank. The list is loaded from the Player table on first use.
+    Once it gets older than 'LEADERBOARD_TTL' seconds it is reloaded by a
+    background thread, so increments made by other processes show up, and reads
+    keep using the loaded list meanwhile. Increments made in this process are
+    applied right away.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # Sorted (-games_won, player_id) keys, the index of a key is its position.
+        self._keys: List[Tuple[int, str]] = []
+        # player_id -> (games_won, username)
+        self._players: Dict[str, Tuple[int, Optional[str]]] = {}
+        self._loaded_at: Optional[float] = None
+        self._refresher: Optional[threading.Thread] = None
+
+    def clear(self) -> None:
+        """
+        Drop the loaded list, it is loaded again on next read.
+        """
+
+        with self._lock:
+            self._keys = []
+            self._players = {}
+            self._loaded_at = None
+
+    def load(self) -> None:
+        """
+        Load the list of all players from the database in a single query.
+        """
+
+        rows = Player.objects.values_list("id", "user__username", "games_won")
+        players = {
+            str(player_id): (games_won, username)
+            for player_id, username, games_won in rows
+        }
+        keys = sorted(
+            (-games_won, player_id) for player_id, (games_won, _) in players.items()
+        )
+
+        with self._lock:
+            self._players = players
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+
+    def _refresh(self) -> None:
+        try:
+            self.load()
+        except Exception:
+            logger.exception("Reloading the leaderboard failed.")
+        finally:
+            connection.close()
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded_at is None:
+            self.load()
+        elif time.monotonic() - self._loaded_at > settings.LEADERBOARD_TTL and (
+            self._refresher is None or not self._refresher.is_alive()
+        ):
+            self._refresher = threading.Thread(target=self._refresh, daemon=True)
+            self._refresher.start()
+
+    def increment(
+        self, player_id: UUID, username: Optional[str], amount: int = 1
+    ) -> None:
+        """
+        Add won games to the player and move it to its new position.
+
+        Nothing is done if the list isn't loaded yet, it will be read from the database
+        with the new score anyway.
+        """
+
+        player_id = str(player_id)
+
+        with self._lock:
+            if self._loaded_at is None:
+                return
+
+            games_won, _ = self._players.get(player_id, (0, username))
+            if player_id in self._players:
+                del self._keys[bisect_left(self._keys, (-games_won, player_id))]
+
+            games_won += amount
+            self._players[player_id] = (games_won, username)
+            insort(self._keys, (-games_won, player_id))
+
+    def _entry(self, player_id: str) -> Dict:
+        games_won, username = self._players.get(player_id, (0, None))
+
+        return {
+            "rank": bisect_left(self._keys, (-games_won,)) + 1,
+            "player": player_id,
+            "username": username,
+            "games_won": games_won,
+        }
+
+    def top(self, count: int) -> List[Dict]:
+        """
+        Return the best 'count' players.
+        """
+
+        with self._lock:
+            self._ensure_loaded()
+            return [self._entry(player_id) for _, player_id in self._keys[:count]]
+
+    def rank(self, player_id: UUID) -> Dict:
+        """
+        Return the rank of the player, a player missing from the list (e.g. created
+        by another process since it was loaded) hasn't won any game yet.
+        """
+
+        with self._lock:
+            self._ensure_loaded()
+            return self._entry(str(player_id))
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jankenfw.game.archive import archive_games
+
+
+class Command(BaseCommand):
+    """
+    Move the rounds and moves of old finished games to the columnar archive.
+
+    Every batch of games is written as one segment of .npy files in the
+    'GAME_ARCHIVE_DIR' directory and its rows are deleted from the database in
+    the same transaction, e.g. nightly:
+
+        ./manage.py archive_games --older-than-days 30 --batch-size 10000
+    """
+
+    help = "Move the rounds and moves of old finished games to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=30,
+            help="Archive games finished at least this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of games archived in one segment.",
+        )
+        parser.add_argument(
+            "--directory", help="Directory of the archive, 'GAME_ARCHIVE_DIR' if unset."
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("Batch size has to be positive.")
+        if options["older_than_days"] < 0:
+            raise CommandError("Age has to be zero or positive.")
+
+        before = timezone.now() - timedelta(days=options["older_than_days"])
+        report = archive_games(before, options["batch_size"], options["directory"])
+        self.stdout.write(
+            f"Archived {report['games']} games with {report['moves']} moves "
+            f"in {report['segments']} segments."
+        )
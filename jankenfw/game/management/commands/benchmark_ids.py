@@ -0,0 +1,129 @@
+import json
+import time
+from typing import Callable, Dict, Optional
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.models import Game, Move
+
+MOVE_CHOICES = MoveChoices.values
+
+
+def index_size(table: str) -> Optional[int]:
+    """
+    Return the size of all indexes of the table in bytes, None if the database
+    doesn't report it.
+    """
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_indexes_size(%s::regclass)", [table])
+            return cursor.fetchone()[0]
+        if connection.vendor == "sqlite":
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE type = 'index' "
+                    "AND tbl_name = %s)",
+                    [table],
+                )
+            except Exception:
+                # SQLite built without the dbstat table
+                return None
+            return cursor.fetchone()[0]
+    return None
+
+
+class Command(BaseCommand):
+    """
+    Compare the insert throughput and the index size of Move rows with random and
+    time-ordered primary keys.
+
+    Every generator inserts the rows into the Move table in its own transaction,
+    which is rolled back afterwards, so run it on an empty database, e.g.:
+
+        ./manage.py benchmark_ids --rows 10000000 --json
+    """
+
+    help = "Compare Move inserts with random and time-ordered primary keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, default=10_000_000, help="Number of inserted moves."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="Size of the insert batches."
+        )
+        parser.add_argument(
+            "--generators",
+            default="uuid.uuid4,libs.ids.uuid7",
+            help="Comma separated dotted paths of the compared id generators.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["batch_size"] < 1:
+            raise CommandError("Rows and batch size have to be positive.")
+
+        report = {"rows": options["rows"], "database": connection.vendor}
+        for path in options["generators"].split(","):
+            try:
+                generator = import_string(path)
+            except ImportError:
+                raise CommandError(f"Unknown id generator '{path}'.")
+            report[path] = self.measure(
+                generator, options["rows"], options["batch_size"]
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                self.stdout.write(f"{key:>24}: {value}")
+
+    def measure(
+        self, generator: Callable[[], UUID], rows: int, batch_size: int
+    ) -> Dict:
+        """
+        Insert the rows with ids of the generator and measure them, the inserted
+        rows are rolled back.
+        """
+
+        table = Move._meta.db_table
+        elapsed = 0.0
+
+        with transaction.atomic():
+            size_before = index_size(table)
+            game = Game.objects.create(
+                id=generator(), status=GameStatusChoices.FINISHED
+            )
+
+            for start in range(0, rows, batch_size):
+                moves = [
+                    Move(
+                        id=generator(),
+                        game=game,
+                        move=MOVE_CHOICES[index % len(MOVE_CHOICES)],
+                    )
+                    for index in range(start, min(start + batch_size, rows))
+                ]
+                started = time.perf_counter()
+                Move.objects.bulk_create(moves)
+                elapsed += time.perf_counter() - started
+
+            size_after = index_size(table)
+            transaction.set_rollback(True)
+
+        return {
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows / elapsed, 1) if elapsed else 0,
+            "index_bytes": (
+                size_after - (size_before or 0) if size_after is not None else None
+            ),
+        }
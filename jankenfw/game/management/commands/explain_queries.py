@@ -0,0 +1,200 @@
+import random
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.models import Game, GameRound, Move, Player
+from jankenfw.game.pagination import GamePagination
+from libs.ids import generate_id
+
+# Most of the games in a long-running deployment are finished.
+STATUS_WEIGHTS = (1, 1, 98)
+
+
+class Command(BaseCommand):
+    """
+    Print the query plans of the game hot paths.
+
+    The dataset is seeded and the queries are explained in one transaction that
+    is rolled back, so the database is left unchanged. With --without-indexes the
+    plans are explained again after dropping the indexes of the explained tables
+    in the same transaction, to compare them, e.g.:
+
+        ./manage.py explain_queries --seed-moves 1000000 --without-indexes
+    """
+
+    help = "Print the query plans of the game hot paths, optionally seeding a dataset first."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed-moves",
+            type=int,
+            default=0,
+            help="Number of moves to seed before explaining the queries.",
+        )
+        parser.add_argument(
+            "--rounds", type=int, default=5, help="Number of rounds per seeded game."
+        )
+        parser.add_argument(
+            "--players", type=int, default=1000, help="Number of seeded players."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=10000, help="Size of the insert batches."
+        )
+        parser.add_argument(
+            "--without-indexes",
+            action="store_true",
+            help="Explain the queries again without the indexes of the tables.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed_moves"]:
+                self.seed(
+                    options["seed_moves"],
+                    options["rounds"],
+                    options["players"],
+                    options["batch_size"],
+                )
+
+            queries = self.queries()
+            if queries is None:
+                self.stderr.write("No data to explain, seed some with --seed-moves.")
+            else:
+                self.explain(queries)
+                if options["without_indexes"]:
+                    dropped = self.drop_indexes()
+                    self.stdout.write(
+                        self.style.MIGRATE_HEADING(
+                            f"Without the indexes {', '.join(dropped)}"
+                        )
+                    )
+                    self.stdout.write("")
+                    self.explain(queries)
+
+            # The seeded rows and the dropped indexes are never committed.
+            transaction.set_rollback(True)
+
+    def queries(self) -> Optional[Dict]:
+        """
+        Return the querysets of the hot paths by name, None without data.
+        """
+
+        game = Game.objects.first()
+        game_round = GameRound.objects.filter(game=game).first()
+        player = Player.objects.first()
+
+        if not (game and game_round and player):
+            return None
+
+        # A page of the game list deep into the table
+        pagination = GamePagination()
+        middle = Game.objects.order_by(*pagination.ordering)[Game.objects.count() // 2]
+        position = pagination._get_position_from_instance(middle, pagination.ordering)
+
+        return {
+            "Move(game_round=...)": Move.objects.filter(game_round=game_round),
+            "GameRound(game=..., round_number=...)": GameRound.objects.filter(
+                game=game, round_number=game_round.round_number
+            ),
+            "Player(user=...)": Player.objects.filter(user_id=player.user_id),
+            "Player.order_by('-games_won')": Player.objects.order_by("-games_won")[:10],
+            "Game(status=IN_PROGRESS)": Game.objects.filter(
+                status=GameStatusChoices.IN_PROGRESS
+            ),
+            "Game(status != FINISHED)": Game.objects.exclude(
+                status=GameStatusChoices.FINISHED
+            ),
+            "Game page after a cursor": Game.objects.filter(
+                pagination._after_position(position, reverse=False)
+            ).order_by(*pagination.ordering)[:10],
+        }
+
+    def explain(self, queries: Dict) -> None:
+        # EXPLAIN ANALYZE is only understood by PostgreSQL.
+        explain_options = {"analyze": True} if connection.vendor == "postgresql" else {}
+
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
+
+    def drop_indexes(self) -> List[str]:
+        """
+        Drop the indexes and unique constraints of the explained tables, return
+        their names. SQLite keeps unique constraints in the definition of the
+        table, so they are only dropped on other databases.
+        """
+
+        # Only used to build the statements, it isn't entered.
+        editor = connection.schema_editor()
+        dropped = []
+        with connection.cursor() as cursor:
+            for model in (Game, GameRound, Move, Player):
+                removable = list(model._meta.indexes)
+                if connection.vendor != "sqlite":
+                    removable += model._meta.constraints
+                for index in removable:
+                    cursor.execute(str(index.remove_sql(model, editor)))
+                    dropped.append(index.name)
+        return dropped
+
+    def seed(self, moves: int, rounds: int, players: int, batch_size: int) -> None:
+        """
+        Insert finished and in progress games with the requested number of moves.
+        """
+
+        users = get_user_model().objects.bulk_create(
+            [
+                get_user_model()(username=f"seed-{uuid4().hex}", password="!")
+                for _ in range(players)
+            ],
+            batch_size=batch_size,
+        )
+        seeded_players = Player.objects.bulk_create(
+            [Player(user=user, games_won=random.randint(0, 1000)) for user in users],
+            batch_size=batch_size,
+        )
+        games_count = max(moves // (rounds * 2), 1)
+
+        for start in range(0, games_count, batch_size):
+            games, game_rounds, game_moves = [], [], []
+
+            for _ in range(min(batch_size, games_count - start)):
+                game = Game(
+                    id=generate_id(),
+                    rounds=rounds,
+                    status=random.choices(GameStatusChoices.values, STATUS_WEIGHTS)[0],
+                )
+                games.append(game)
+                player_one, player_two = random.sample(seeded_players, 2)
+
+                for round_number in range(1, rounds + 1):
+                    game_round = GameRound(
+                        id=generate_id(),
+                        game=game,
+                        round_number=round_number,
+                        move_count=2,
+                        winner=random.choice((player_one, player_two, None)),
+                    )
+                    game_rounds.append(game_round)
+                    game_moves += [
+                        Move(
+                            game=game,
+                            game_round=game_round,
+                            player=seeded_player,
+                            move=random.choice(MoveChoices.values),
+                        )
+                        for seeded_player in (player_one, player_two)
+                    ]
+                game.current_round = game_round
+
+            Game.objects.bulk_create(games)
+            GameRound.objects.bulk_create(game_rounds)
+            Move.objects.bulk_create(game_moves)
+
+            self.stdout.write(f"Seeded {start + len(games)}/{games_count} games.")
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jankenfw.game.enum import GameStatusChoices
+from jankenfw.game.export import FORMATS, export_lines, filter_games
+from jankenfw.game.serializers import ExportSerializer
+
+STATUSES = {
+    label.replace(" ", "-"): value for value, label in GameStatusChoices.choices
+}
+
+
+class Command(BaseCommand):
+    """
+    Export games with their rounds and moves as NDJSON or CSV.
+
+    Games are streamed from a server-side cursor and written as they are read,
+    so exports of any size run in constant memory, e.g.:
+
+        ./manage.py export_games --format csv --status finished \\
+            --since 2026-01-01 --until 2026-02-01 --output moves.csv
+    """
+
+    help = "Export games with their rounds and moves as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="ndjson")
+        parser.add_argument(
+            "--status", choices=sorted(STATUSES), help="Export games with the status."
+        )
+        parser.add_argument(
+            "--since", help="Export games created at or after the date or datetime."
+        )
+        parser.add_argument(
+            "--until", help="Export games created before the date or datetime."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of games read from the cursor at once.",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File the games are written to, '-' for stdout.",
+        )
+
+    def handle(self, *args, **options):
+        data = {"output": options["format"], "chunk_size": options["chunk_size"]}
+        if options["status"]:
+            data["status"] = STATUSES[options["status"]]
+        for name in ("since", "until"):
+            if options[name]:
+                data[name] = options[name]
+
+        sz = ExportSerializer(data=data)
+        if not sz.is_valid():
+            raise CommandError(
+                " ".join(
+                    f"{name}: {' '.join(errors)}" for name, errors in sz.errors.items()
+                )
+            )
+
+        validated = sz.validated_data
+        games = filter_games(
+            validated.get("status"), validated.get("since"), validated.get("until")
+        )
+        lines = export_lines(games, validated["output"], validated["chunk_size"])
+
+        if options["output"] == "-":
+            self.write(self.stdout, lines)
+        else:
+            with open(options["output"], "w", newline="") as output:
+                self.write(output, lines)
+
+    def write(self, output, lines) -> None:
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode()
+            output.write(line)
+        output.flush()
@@ -0,0 +1,129 @@
+from collections import Counter, defaultdict
+from itertools import chain, groupby
+from operator import itemgetter
+from typing import Dict, Iterator, Tuple
+from uuid import UUID
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from jankenfw.game.archive import MoveArchive
+from jankenfw.game.enum import GameStatusChoices
+from jankenfw.game.models import Game, GameRound, Matchup, Move, PlayerStats
+from jankenfw.game.stats import Round, matchup_counters, round_counters
+
+
+class Command(BaseCommand):
+    """
+    Recompute the PlayerStats and Matchup rows from the moves and rounds.
+
+    Moves are streamed from the database and games are read in batches, so only
+    the counters of the players are kept in memory. Archived games are read from
+    the memory-mapped archive, see 'jankenfw.game.archive'. The rows are replaced
+    in a single transaction, e.g. after a backfill:
+
+        ./manage.py rebuild_player_stats --batch-size 10000
+    """
+
+    help = "Recompute the statistics of all players from the moves and rounds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of rows or games read and written at once.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("Batch size has to be positive.")
+
+        archive = MoveArchive()
+        stats = round_counters(chain(self.rounds(batch_size), archive.rounds()))
+        matchups = defaultdict(Counter)
+        archived_games = (
+            matchup_counters(*game) for game in archive.games() if len(game[0]) == 2
+        )
+        for game_counters in chain(self.games(batch_size), archived_games):
+            for key, counter in game_counters.items():
+                matchups[key].update(counter)
+
+        with transaction.atomic():
+            PlayerStats.objects.all().delete()
+            Matchup.objects.all().delete()
+            PlayerStats.objects.bulk_create(
+                (
+                    PlayerStats(player_id=player_id, **counter)
+                    for player_id, counter in stats.items()
+                ),
+                batch_size=batch_size,
+            )
+            Matchup.objects.bulk_create(
+                (
+                    Matchup(player_id=player_id, opponent_id=opponent_id, **counter)
+                    for (player_id, opponent_id), counter in matchups.items()
+                ),
+                batch_size=batch_size,
+            )
+
+        self.stdout.write(
+            f"Rebuilt the statistics of {len(stats)} players and {len(matchups)} matchups."
+        )
+
+    def rounds(self, batch_size: int) -> Iterator[Round]:
+        """
+        Stream the moves of the finished rounds, grouped by round.
+        """
+
+        moves = (
+            Move.objects.filter(game_round__move_count__gte=2)
+            .order_by("game_round_id")
+            .values_list("game_round_id", "player_id", "move", "game_round__winner_id")
+            .iterator(chunk_size=batch_size)
+        )
+        for _, round_moves in groupby(moves, key=itemgetter(0)):
+            round_moves = list(round_moves)
+            yield [(move[1], move[2]) for move in round_moves], round_moves[0][3]
+
+    def games(self, batch_size: int) -> Iterator[Dict[Tuple[UUID, UUID], Counter]]:
+        """
+        Yield the Matchup increments of every finished game, the games are read in
+        batches ordered by their id.
+        """
+
+        finished = Game.objects.filter(
+            status=GameStatusChoices.FINISHED, archived_at__isnull=True
+        ).order_by("id")
+        last_id = None
+        while True:
+            batch = finished if last_id is None else finished.filter(id__gt=last_id)
+            game_ids = list(batch.values_list("id", flat=True)[:batch_size])
+            if not game_ids:
+                return
+            last_id = game_ids[-1]
+
+            players = defaultdict(list)
+            for game_id, player_id in (
+                Game.player.through.objects.filter(game_id__in=game_ids)
+                .order_by("player_id")
+                .values_list("game_id", "player_id")
+            ):
+                players[game_id].append(player_id)
+
+            winners = defaultdict(Counter)
+            for game_id, winner_id in GameRound.objects.filter(
+                game_id__in=game_ids, winner__isnull=False
+            ).values_list("game_id", "winner_id"):
+                winners[game_id][winner_id] += 1
+
+            for game_id in game_ids:
+                game_players = players[game_id]
+                if len(game_players) != 2:
+                    continue
+                wins = [winners[game_id][player_id] for player_id in game_players]
+                winner = None
+                if wins[0] != wins[1]:
+                    winner = game_players[0 if wins[0] > wins[1] else 1]
+                yield matchup_counters(game_players, wins, winner)
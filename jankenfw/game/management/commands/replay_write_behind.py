@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jankenfw.game.writebehind import WriteBehind
+
+
+class Command(BaseCommand):
+    """
+    Write the moves left in the write-behind journal to the database.
+
+    The journal is replayed when a process using write-behind starts, run this
+    command when write-behind was turned off or the journal was moved, e.g.:
+
+        ./manage.py replay_write_behind --journal /var/lib/jankenfw/moves.journal
+    """
+
+    help = "Write the moves left in the write-behind journal to the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journal",
+            default=settings.GAME_WRITE_BEHIND_JOURNAL,
+            help="Path of the journal, GAME_WRITE_BEHIND_JOURNAL by default.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["journal"]:
+            raise CommandError(
+                "No journal, set GAME_WRITE_BEHIND_JOURNAL or --journal."
+            )
+
+        count = WriteBehind(options["journal"]).replay()
+        self.stdout.write(f"Replayed {count} journal entries.")
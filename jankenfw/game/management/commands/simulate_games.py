@@ -0,0 +1,288 @@
+import json
+import multiprocessing
+import random
+import time
+from itertools import cycle
+from typing import Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from jankenfw.game import rules
+from jankenfw.game.enum import GameStatusChoices
+from jankenfw.game.models import Game, GameRound, Player
+from jankenfw.game.services import do_move, join_game
+
+
+class QueryCounter:
+    """
+    Count the queries run on the connection while it is installed as an execute
+    wrapper.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Return the nearest-rank percentile of the values.
+    """
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def play_games(games: List[Dict], script: Optional[List[int]], seed: int) -> Dict:
+    """
+    Play the games through the service functions and measure every call.
+
+    Each game is a dict with the game id and the ids of both players.
+    """
+
+    randomizer = random.Random(seed)
+    moves = cycle(script) if script else None
+    move_choices = list(rules.BEATS)
+
+    join_latencies, move_latencies, played = [], [], []
+    counter = QueryCounter()
+
+    with connection.execute_wrapper(counter):
+        for simulated in games:
+            game = Game.objects.get(pk=simulated["game"])
+            players = list(Player.objects.filter(pk__in=simulated["players"]))
+
+            for player in players:
+                started = time.perf_counter()
+                join_game(game, player)
+                join_latencies.append(time.perf_counter() - started)
+
+            queries_before_moves = counter.count
+            round_moves = []
+            while len(round_moves) < game.rounds * 2:
+                player = players[len(round_moves) % 2]
+                move = next(moves) if moves else randomizer.choice(move_choices)
+
+                started = time.perf_counter()
+                result = do_move(game, move, player)
+                move_latencies.append(time.perf_counter() - started)
+
+                if result and "error" in result:
+                    raise CommandError(f"Game {game.id}: {result['error']}")
+                round_moves.append(move)
+
+            played.append((round_moves, counter.count - queries_before_moves))
+
+    return {
+        "join_latencies": join_latencies,
+        "move_latencies": move_latencies,
+        "move_queries": sum(queries for _, queries in played),
+        "first_moves": [move for moves, _ in played for move in moves[::2]],
+        "second_moves": [move for moves, _ in played for move in moves[1::2]],
+    }
+
+
+def play_games_in_worker(*args) -> Dict:
+    """
+    Play the games in a worker process, which has its own database connection.
+    """
+
+    try:
+        return play_games(*args)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    """
+    Play simulated games through 'join_game' and 'do_move' and report the throughput.
+
+    The simulated users, players and games are created and played in one
+    transaction that is rolled back, so they don't show up in the high scores.
+    With --keep they are committed, which is needed to play with more than one
+    worker process. Runs can be compared over time with the JSON report, e.g.:
+
+        ./manage.py simulate_games --games 1000 --rounds 3 --json
+        ./manage.py simulate_games --games 1000 --workers 4 --keep --json
+    """
+
+    help = "Play simulated games through the game services and report the throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--games", type=int, default=100, help="Number of simulated games."
+        )
+        parser.add_argument(
+            "--rounds", type=int, default=3, help="Number of rounds per game."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes playing the games concurrently. "
+            "More than one worker needs a database with concurrent writers, "
+            "e.g. PostgreSQL.",
+        )
+        parser.add_argument(
+            "--moves",
+            help="Comma separated move values played in a loop, e.g. '1,2,3'. "
+            "Moves are random by default.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None, help="Seed of the random moves."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Commit the simulated users, players and games instead of rolling "
+            "them back.",
+        )
+
+    def handle(self, *args, **options):
+        script = self.parse_moves(options["moves"])
+        workers = max(options["workers"], 1)
+        seed = (
+            options["seed"] if options["seed"] is not None else random.randrange(2**32)
+        )
+        if not options["keep"]:
+            if workers > 1:
+                raise CommandError(
+                    "Games played by more than one worker are committed, "
+                    "pass --keep to keep them."
+                )
+            if settings.GAME_WRITE_BEHIND:
+                raise CommandError(
+                    "Moves written behind are committed by another thread, "
+                    "pass --keep to keep them."
+                )
+
+        if options["keep"]:
+            report = self.simulate(options, script, workers, seed)
+        else:
+            with transaction.atomic():
+                report = self.simulate(options, script, workers, seed)
+                # The simulated rows are never committed.
+                transaction.set_rollback(True)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                self.stdout.write(f"{key:>24}: {value}")
+
+    def simulate(
+        self, options: Dict, script: Optional[List[int]], workers: int, seed: int
+    ) -> Dict:
+        """
+        Create and play the games, return the report.
+        """
+
+        games = self.create_games(options["games"], options["rounds"])
+        chunks = [games[index::workers] for index in range(workers)]
+        arguments = [
+            (chunk, script, seed + index) for index, chunk in enumerate(chunks)
+        ]
+
+        started = time.perf_counter()
+        if workers == 1:
+            results = [play_games(*arguments[0])]
+        else:
+            # Forked workers must not share the connection of this process.
+            connections.close_all()
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                results = pool.starmap(play_games_in_worker, arguments)
+        elapsed = time.perf_counter() - started
+
+        return self.build_report(results, elapsed, options, workers)
+
+    def parse_moves(self, moves: Optional[str]) -> Optional[List[int]]:
+        if not moves:
+            return None
+        try:
+            script = [int(move) for move in moves.split(",")]
+        except ValueError:
+            raise CommandError("Moves have to be comma separated numbers.")
+        if not set(script) <= set(rules.BEATS):
+            raise CommandError(f"Valid moves are {sorted(rules.BEATS)}.")
+        return script
+
+    def create_games(self, games: int, rounds: int) -> List[Dict]:
+        """
+        Create waiting games with their first round and two players for each.
+        """
+
+        User = get_user_model()
+        prefix = uuid4().hex[:8]
+        users = [
+            User(username=f"simulated-{prefix}-{index}", password="!")
+            for index in range(games * 2)
+        ]
+        players = [Player(user=user) for user in users]
+        new_games, game_rounds = [], []
+        for _ in range(games):
+            game = Game(rounds=rounds, status=GameStatusChoices.WAITING_FOR_PLAYER)
+            game.current_round = GameRound(game=game)
+            new_games.append(game)
+            game_rounds.append(game.current_round)
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            Player.objects.bulk_create(players)
+            Game.objects.bulk_create(new_games)
+            GameRound.objects.bulk_create(game_rounds)
+
+        return [
+            {
+                "game": game.id,
+                "players": [players[index * 2].id, players[index * 2 + 1].id],
+            }
+            for index, game in enumerate(new_games)
+        ]
+
+    def build_report(
+        self, results: List[Dict], elapsed: float, options: Dict, workers: int
+    ) -> Dict:
+        move_latencies = [
+            value for result in results for value in result["move_latencies"]
+        ]
+        join_latencies = [
+            value for result in results for value in result["join_latencies"]
+        ]
+        first_moves = [move for result in results for move in result["first_moves"]]
+        second_moves = [move for result in results for move in result["second_moves"]]
+        outcomes = rules.resolve_many(first_moves, second_moves)
+        moves = len(move_latencies)
+
+        return {
+            "games": options["games"],
+            "rounds": options["rounds"],
+            "workers": workers,
+            "moves": moves,
+            "seconds": round(elapsed, 3),
+            "moves_per_second": round(moves / elapsed, 1) if elapsed else 0,
+            "move_p50_ms": round(percentile(move_latencies, 50) * 1000, 3),
+            "move_p95_ms": round(percentile(move_latencies, 95) * 1000, 3),
+            "move_p99_ms": round(percentile(move_latencies, 99) * 1000, 3),
+            "join_p50_ms": round(percentile(join_latencies, 50) * 1000, 3),
+            "queries_per_move": (
+                round(sum(result["move_queries"] for result in results) / moves, 2)
+                if moves
+                else 0
+            ),
+            "tie_rate": (
+                round(float((outcomes == rules.TIE).mean()), 3) if len(outcomes) else 0
+            ),
+        }
@@ -0,0 +1,195 @@
+import json
+import multiprocessing
+import random
+import time
+from typing import List, Sequence
+from uuid import UUID, uuid4
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from jankenfw.game import rules
+from jankenfw.game.enum import GameStatusChoices, TournamentFormatChoices
+from jankenfw.game.models import Game, Player, Tournament
+from jankenfw.game.services import do_move
+from jankenfw.game.tournaments import start_tournament
+from jankenfw.game.writebehind import get_write_behind
+
+FORMATS = {
+    "elimination": TournamentFormatChoices.SINGLE_ELIMINATION,
+    "round-robin": TournamentFormatChoices.ROUND_ROBIN,
+}
+
+
+def play_tournament_games(game_ids: Sequence[UUID], seed: int) -> int:
+    """
+    Play the games with random moves through 'do_move', return the number of moves.
+    """
+
+    randomizer = random.Random(seed)
+    move_choices = list(rules.BEATS)
+    moves = 0
+
+    for game_id in game_ids:
+        game = Game.objects.only("rounds").get(pk=game_id)
+        players = list(Player.objects.filter(game=game).order_by("id"))
+
+        for index in range(game.rounds * 2):
+            result = do_move(game, randomizer.choice(move_choices), players[index % 2])
+            if result and "error" in result:
+                raise CommandError(f"Game {game.id}: {result['error']}")
+            moves += 1
+
+    # Tournaments advance once the finished games are written.
+    if settings.GAME_WRITE_BEHIND:
+        get_write_behind().flush()
+    return moves
+
+
+def play_tournament_games_in_worker(*args) -> int:
+    """
+    Play the games in a worker process, which has its own database connection.
+    """
+
+    try:
+        return play_tournament_games(*args)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    """
+    Play a simulated tournament through the game services and report its stages.
+
+    The games of a stage don't depend on each other, so every stage is played as
+    one wave of games split between the workers. Tied elimination games are
+    replayed in an extra wave. A bracket of 1024 players takes 10 stages, e.g.:
+
+        ./manage.py simulate_tournament --players 1024 --workers 8 --json
+    """
+
+    help = "Play a simulated tournament through the game services."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--players", type=int, default=16, help="Number of simulated players."
+        )
+        parser.add_argument(
+            "--rounds", type=int, default=1, help="Number of rounds per game."
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(FORMATS),
+            default="elimination",
+            help="Format of the tournament.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of worker processes playing the games of a stage "
+            "concurrently. More than one worker needs a database with concurrent "
+            "writers, e.g. PostgreSQL.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None, help="Seed of the random moves."
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+
+    def handle(self, *args, **options):
+        if options["players"] < 2:
+            raise CommandError("At least two players are needed.")
+        workers = max(options["workers"], 1)
+        seed = (
+            options["seed"] if options["seed"] is not None else random.randrange(2**32)
+        )
+
+        tournament = self.create_tournament(
+            options["players"], options["rounds"], FORMATS[options["format"]]
+        )
+        start_tournament(tournament)
+
+        waves, games, moves = 0, 0, 0
+        started = time.perf_counter()
+        while tournament.status != GameStatusChoices.FINISHED:
+            game_ids = list(
+                Game.objects.filter(tournament=tournament)
+                .exclude(status=GameStatusChoices.FINISHED)
+                .values_list("id", flat=True)
+            )
+            if not game_ids:
+                raise CommandError(f"Tournament {tournament.id} has no games to play.")
+
+            moves += self.play_wave(game_ids, workers, seed + waves)
+            waves += 1
+            games += len(game_ids)
+            tournament.refresh_from_db(fields=["status", "stage", "winner"])
+        elapsed = time.perf_counter() - started
+
+        report = {
+            "tournament": str(tournament.id),
+            "format": options["format"],
+            "players": options["players"],
+            "rounds": options["rounds"],
+            "workers": workers,
+            "stages": tournament.stage,
+            "waves": waves,
+            "games": games,
+            "moves": moves,
+            "seconds": round(elapsed, 3),
+            "games_per_second": round(games / elapsed, 1) if elapsed else 0,
+            "winner": str(tournament.winner_id) if tournament.winner_id else None,
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                self.stdout.write(f"{key:>24}: {value}")
+
+    def play_wave(self, game_ids: List[UUID], workers: int, seed: int) -> int:
+        """
+        Play the games of a wave, split between the workers.
+        """
+
+        if workers == 1:
+            return play_tournament_games(game_ids, seed)
+
+        arguments = [
+            (game_ids[index::workers], seed + index) for index in range(workers)
+        ]
+        # Forked workers must not share the connection of this process.
+        connections.close_all()
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            return sum(pool.starmap(play_tournament_games_in_worker, arguments))
+
+    def create_tournament(self, players: int, rounds: int, format: int) -> Tournament:
+        """
+        Create a tournament joined by new simulated players.
+        """
+
+        User = get_user_model()
+        prefix = uuid4().hex[:8]
+        users = [
+            User(username=f"tournament-{prefix}-{index}", password="!")
+            for index in range(players)
+        ]
+        new_players = [Player(user=user) for user in users]
+        tournament = Tournament(
+            name=f"Simulated tournament {prefix}", format=format, rounds=rounds
+        )
+
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            Player.objects.bulk_create(new_players)
+            tournament.save(force_insert=True)
+            Tournament.player.through.objects.bulk_create(
+                Tournament.player.through(tournament=tournament, player=player)
+                for player in new_players
+            )
+
+        return tournament
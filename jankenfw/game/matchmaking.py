@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Dict, Optional
+from uuid import UUID
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BaseMatchmakingQueue:
+    """
+    Queue of players waiting for an opponent, grouped by the number of rounds.
+    """
+
+    def pair(self, player_id: UUID, rounds: int) -> Optional[UUID]:
+        """
+        Take the longest waiting player for the same number of rounds out of the
+        queue and return it. If nobody is waiting, queue the player and return None.
+
+        The returned player is reported as waiting until its game is stored with
+        'matched' or it is put back with 'requeue'.
+        """
+
+        raise NotImplementedError
+
+    def requeue(self, player_id: UUID, rounds: int) -> None:
+        """
+        Put the player back at the front of the queue.
+        """
+
+        raise NotImplementedError
+
+    def matched(self, player_id: UUID, game_id: UUID) -> None:
+        """
+        Store the game found for a waiting player.
+        """
+
+        raise NotImplementedError
+
+    def status(self, player_id: UUID) -> Optional[Dict]:
+        """
+        Return {"game": <game id>} once the player was paired (until it queues again),
+        {"game": None} while waiting and None for a player who isn't in the queue.
+        """
+
+        raise NotImplementedError
+
+    def cancel(self, player_id: UUID) -> bool:
+        """
+        Remove the player from the queue, return False if it wasn't waiting.
+        """
+
+        raise NotImplementedError
+
+
+class InMemoryMatchmakingQueue(BaseMatchmakingQueue):
+    """
+    Matchmaking queue kept in the memory of the process.
+
+    Each number of rounds has its own FIFO of waiting players, so pairing, queueing
+    and cancelling are O(1). Players queued in other processes are not seen.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # rounds -> player_id -> None, kept in the order the players joined
+        self._waiting: Dict[int, OrderedDict] = defaultdict(OrderedDict)
+        # player_id -> rounds
+        self._rounds: Dict[UUID, int] = {}
+        # player_id -> game_id, None while the game of a paired player is created
+        self._games: Dict[UUID, Optional[UUID]] = {}
+
+    def pair(self, player_id: UUID, rounds: int) -> Optional[UUID]:
+        with self._lock:
+            if player_id in self._rounds:
+                return None
+
+            waiting = self._waiting[rounds]
+            if waiting:
+                opponent_id, _ = waiting.popitem(last=False)
+                del self._rounds[opponent_id]
+                self._games[opponent_id] = None
+                return opponent_id
+
+            self._games.pop(player_id, None)
+            waiting[player_id] = None
+            self._rounds[player_id] = rounds
+            return None
+
+    def requeue(self, player_id: UUID, rounds: int) -> None:
+        with self._lock:
+            self._games.pop(player_id, None)
+            self._waiting[rounds][player_id] = None
+            self._waiting[rounds].move_to_end(player_id, last=False)
+            self._rounds[player_id] = rounds
+
+    def matched(self, player_id: UUID, game_id: UUID) -> None:
+        with self._lock:
+            self._games[player_id] = game_id
+
+    def status(self, player_id: UUID) -> Optional[Dict]:
+        with self._lock:
+            if player_id in self._games:
+                return {"game": self._games[player_id]}
+            if player_id in self._rounds:
+                return {"game": None}
+            return None
+
+    def cancel(self, player_id: UUID) -> bool:
+        with self._lock:
+            rounds = self._rounds.pop(player_id, None)
+            if rounds is None:
+                return False
+            del self._waiting[rounds][player_id]
+            return True
+
+
+@lru_cache(maxsize=None)
+def get_matchmaking_queue() -> BaseMatchmakingQueue:
+    """
+    Return the matchmaking queue set with the 'GAME_MATCHMAKING_QUEUE' setting.
+    """
+
+    return import_string(settings.GAME_MATCHMAKING_QUEUE)()
@@ -0,0 +1,56 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:22
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Game = apps.get_model("game", "Game")
+    GameRound = apps.get_model("game", "GameRound")
+    Move = apps.get_model("game", "Move")
+
+    last_round = (
+        GameRound.objects.filter(game=OuterRef("pk"))
+        .values("game")
+        .annotate(last=Max("round_number"))
+        .values("last")
+    )
+    Game.objects.update(
+        current_round_number=Coalesce(
+            Subquery(last_round), 1, output_field=models.SmallIntegerField()
+        )
+    )
+
+    moves = (
+        Move.objects.filter(game_round=OuterRef("pk"))
+        .values("game_round")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    GameRound.objects.update(
+        move_count=Coalesce(
+            Subquery(moves), 0, output_field=models.SmallIntegerField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='current_round_number',
+            field=models.SmallIntegerField(default=1, help_text='Number of the round being played.'),
+        ),
+        migrations.AddField(
+            model_name='gameround',
+            name='move_count',
+            field=models.SmallIntegerField(default=0, help_text='Number of moves made in the round.'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:23
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_current_round(apps, schema_editor):
+    Game = apps.get_model("game", "Game")
+    GameRound = apps.get_model("game", "GameRound")
+
+    current_round = GameRound.objects.filter(
+        game=OuterRef("pk"), round_number=OuterRef("current_round_number")
+    ).order_by("-created_at")
+    Game.objects.update(current_round=Subquery(current_round.values("pk")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_game_round_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='current_round',
+            field=models.ForeignKey(help_text='The round being played.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='game.gameround'),
+        ),
+        migrations.RunPython(backfill_current_round, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='game',
+            name='current_round_number',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0003_game_current_round'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(condition=models.Q(('status', 3), _negated=True), fields=['status'], name='game_not_finished_status'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['-games_won'], name='player_games_won_desc'),
+        ),
+        migrations.AddConstraint(
+            model_name='gameround',
+            constraint=models.UniqueConstraint(fields=('game', 'round_number'), name='game_round_unique_number'),
+        ),
+        migrations.AddConstraint(
+            model_name='move',
+            constraint=models.UniqueConstraint(fields=('game_round', 'player'), name='move_unique_player_per_round'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='player',
+            name='player_games_won_desc',
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['-created_at', '-id'], name='game_created_at_desc'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['-games_won', 'id'], name='player_games_won_desc'),
+        ),
+    ]
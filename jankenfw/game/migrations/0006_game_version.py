@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped whenever players, rounds or moves of the game change.'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:49
+
+from django.db import migrations, models
+import libs.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0006_game_version"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="game",
+            name="id",
+            field=models.UUIDField(
+                default=libs.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gameround",
+            name="id",
+            field=models.UUIDField(
+                default=libs.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="move",
+            name="id",
+            field=models.UUIDField(
+                default=libs.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="player",
+            name="id",
+            field=models.UUIDField(
+                default=libs.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:52
+
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+FINISHED = 3
+
+
+def backfill_counters(apps, schema_editor):
+    Game = apps.get_model("game", "Game")
+    GameRound = apps.get_model("game", "GameRound")
+    Player = apps.get_model("game", "Player")
+    Membership = Game.player.through
+
+    games = (
+        Membership.objects.filter(player=OuterRef("pk"), game__status=FINISHED)
+        .values("player")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    rounds = (
+        GameRound.objects.filter(winner=OuterRef("pk"), game__status=FINISHED)
+        .values("winner")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Player.objects.update(
+        games_played=Coalesce(Subquery(games), 0, output_field=models.IntegerField()),
+        rounds_won=Coalesce(Subquery(rounds), 0, output_field=models.IntegerField()),
+    )
+
+    # A game is tied when both players won the same number of rounds.
+    players = defaultdict(list)
+    for game_id, player_id in Membership.objects.filter(
+        game__status=FINISHED
+    ).values_list("game_id", "player_id"):
+        players[game_id].append(player_id)
+
+    wins = defaultdict(Counter)
+    for game_id, winner_id in GameRound.objects.filter(
+        game__status=FINISHED, winner__isnull=False
+    ).values_list("game_id", "winner_id"):
+        wins[game_id][winner_id] += 1
+
+    ties = Counter()
+    for game_id, game_players in players.items():
+        if len({wins[game_id][player_id] for player_id in game_players}) == 1:
+            ties.update(game_players)
+
+    Player.objects.bulk_update(
+        [Player(id=player_id, games_tied=count) for player_id, count in ties.items()],
+        ["games_tied"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0007_primary_key_generator"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="games_played",
+            field=models.IntegerField(
+                default=0, help_text="Total number of finished games."
+            ),
+        ),
+        migrations.AddField(
+            model_name="player",
+            name="games_tied",
+            field=models.IntegerField(
+                default=0, help_text="Total number of finished games without a winner."
+            ),
+        ),
+        migrations.AddField(
+            model_name="player",
+            name="rounds_won",
+            field=models.IntegerField(
+                default=0, help_text="Total number of won rounds of finished games."
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
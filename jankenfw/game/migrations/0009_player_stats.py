@@ -0,0 +1,87 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import libs.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0008_player_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerStats",
+            fields=[
+                (
+                    "player",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="game.player",
+                    ),
+                ),
+                ("rounds_played", models.IntegerField(default=0)),
+                ("rounds_won", models.IntegerField(default=0)),
+                ("rounds_tied", models.IntegerField(default=0)),
+                ("rock", models.IntegerField(default=0)),
+                ("paper", models.IntegerField(default=0)),
+                ("scissors", models.IntegerField(default=0)),
+                ("lizard", models.IntegerField(default=0)),
+                ("spock", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Matchup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=libs.ids.generate_id,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("games_played", models.IntegerField(default=0)),
+                ("games_won", models.IntegerField(default=0)),
+                ("games_tied", models.IntegerField(default=0)),
+                ("rounds_won", models.IntegerField(default=0)),
+                ("rounds_lost", models.IntegerField(default=0)),
+                (
+                    "opponent",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="game.player",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="matchups",
+                        to="game.player",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="matchup",
+            index=models.Index(
+                fields=["player", "-games_played"], name="matchup_most_played"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="matchup",
+            constraint=models.UniqueConstraint(
+                fields=("player", "opponent"), name="matchup_unique_opponent"
+            ),
+        ),
+    ]
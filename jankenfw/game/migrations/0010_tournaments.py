@@ -0,0 +1,140 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+import libs.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0009_player_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tournament",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=libs.ids.generate_id,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=100)),
+                (
+                    "format",
+                    models.SmallIntegerField(
+                        choices=[(1, "single elimination"), (2, "round robin")],
+                        default=1,
+                    ),
+                ),
+                (
+                    "rounds",
+                    models.SmallIntegerField(
+                        default=1, help_text="Number of rounds of games"
+                    ),
+                ),
+                (
+                    "status",
+                    models.SmallIntegerField(
+                        choices=[
+                            (1, "waiting for player"),
+                            (2, "in progress"),
+                            (3, "finished"),
+                        ],
+                        default=1,
+                        help_text="Status that represents a tournament state.",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.SmallIntegerField(
+                        default=0,
+                        help_text="Number of the stage being played, 0 before the start.",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="position",
+            field=models.SmallIntegerField(
+                help_text="Position of the game in its tournament stage.", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="stage",
+            field=models.SmallIntegerField(
+                help_text="Number of the tournament stage of the game.", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="winner",
+            field=models.ForeignKey(
+                help_text="A winner of the finished game.",
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="game.player",
+            ),
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="bye",
+            field=models.ForeignKey(
+                help_text="A player without a game in the stage being played.",
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="game.player",
+            ),
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="player",
+            field=models.ManyToManyField(
+                blank=True, related_name="tournaments", to="game.player"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="winner",
+            field=models.ForeignKey(
+                help_text="A winner of the finished tournament.",
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="game.player",
+            ),
+        ),
+        migrations.AddField(
+            model_name="game",
+            name="tournament",
+            field=models.ForeignKey(
+                help_text="The tournament the game is played in.",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="games",
+                to="game.tournament",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="game",
+            index=models.Index(
+                condition=models.Q(("tournament__isnull", False)),
+                fields=["tournament", "stage", "position"],
+                name="game_tournament_stage",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.0.4 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0010_tournaments"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="player",
+            name="bot",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Strategy of a bot player, empty for human players.",
+                max_length=30,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="player",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("bot", ""), _negated=True),
+                fields=("bot",),
+                name="player_unique_bot",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.4 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0011_player_bot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="game",
+            name="archived_at",
+            field=models.DateTimeField(
+                help_text="When the rounds and moves of the finished game were archived.",
+                null=True,
+            ),
+        ),
+    ]
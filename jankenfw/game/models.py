@@ -3,7 +3,11 @@ from django.contrib.auth import get_user_model
 from django.db import models
 
 from libs.models import BaseModel
-from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.enum import (
+    GameStatusChoices,
+    MoveChoices,
+    TournamentFormatChoices,
+)
 
 
 class Player(BaseModel):
@@ -13,8 +17,35 @@ class Player(BaseModel):
 
     user = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True)
     games_won = models.IntegerField(default=0, help_text="Total number of won games.")
+    games_played = models.IntegerField(
+        default=0, help_text="Total number of finished games."
+    )
+    games_tied = models.IntegerField(
+        default=0, help_text="Total number of finished games without a winner."
+    )
+    rounds_won = models.IntegerField(
+        default=0, help_text="Total number of won rounds of finished games."
+    )
+    bot = models.CharField(
+        max_length=30,
+        blank=True,
+        default="",
+        help_text="Strategy of a bot player, empty for human players.",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-games_won", "id"], name="player_games_won_desc")
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bot"], name="player_unique_bot", condition=~models.Q(bot="")
+            )
+        ]
 
     def __str__(self):
+        if self.bot:
+            return f"{self.bot} bot"
         return str(self.user.username)
 
 
@@ -37,6 +68,92 @@ class Game(BaseModel):
         null=True,
         help_text="A player who should do next move.",
     )
+    current_round = models.ForeignKey(
+        "GameRound",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        help_text="The round being played.",
+    )
+    version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped whenever players, rounds or moves of the game change.",
+    )
+    winner = models.ForeignKey(
+        Player,
+        on_delete=models.DO_NOTHING,
+        related_name="+",
+        null=True,
+        help_text="A winner of the finished game.",
+    )
+    tournament = models.ForeignKey(
+        "Tournament",
+        on_delete=models.CASCADE,
+        related_name="games",
+        null=True,
+        help_text="The tournament the game is played in.",
+    )
+    stage = models.SmallIntegerField(
+        null=True, help_text="Number of the tournament stage of the game."
+    )
+    position = models.SmallIntegerField(
+        null=True, help_text="Position of the game in its tournament stage."
+    )
+    archived_at = models.DateTimeField(
+        null=True,
+        help_text="When the rounds and moves of the finished game were archived.",
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="game_created_at_desc"),
+            models.Index(
+                fields=["status"],
+                name="game_not_finished_status",
+                condition=~models.Q(status=GameStatusChoices.FINISHED),
+            ),
+            models.Index(
+                fields=["tournament", "stage", "position"],
+                name="game_tournament_stage",
+                condition=models.Q(tournament__isnull=False),
+            ),
+        ]
+
+
+class Tournament(BaseModel):
+    """
+    A Tournament object represents players playing games in stages.
+    """
+
+    name = models.CharField(max_length=100)
+    format = models.SmallIntegerField(
+        choices=TournamentFormatChoices.choices,
+        default=TournamentFormatChoices.SINGLE_ELIMINATION,
+    )
+    rounds = models.SmallIntegerField(default=1, help_text="Number of rounds of games")
+    player = models.ManyToManyField(Player, blank=True, related_name="tournaments")
+    status = models.SmallIntegerField(
+        choices=GameStatusChoices.choices,
+        default=GameStatusChoices.WAITING_FOR_PLAYER,
+        help_text="Status that represents a tournament state.",
+    )
+    stage = models.SmallIntegerField(
+        default=0, help_text="Number of the stage being played, 0 before the start."
+    )
+    bye = models.ForeignKey(
+        Player,
+        on_delete=models.DO_NOTHING,
+        related_name="+",
+        null=True,
+        help_text="A player without a game in the stage being played.",
+    )
+    winner = models.ForeignKey(
+        Player,
+        on_delete=models.DO_NOTHING,
+        related_name="+",
+        null=True,
+        help_text="A winner of the finished tournament.",
+    )
 
 
 class GameRound(BaseModel):
@@ -52,10 +169,20 @@ class GameRound(BaseModel):
         help_text="A winner of the round.",
     )
     round_number = models.SmallIntegerField(default=1)
+    move_count = models.SmallIntegerField(
+        default=0, help_text="Number of moves made in the round."
+    )
     game = models.ForeignKey(
         Game, on_delete=models.DO_NOTHING, related_name="game_round", null=True
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game", "round_number"], name="game_round_unique_number"
+            )
+        ]
+
 
 class Move(BaseModel):
     """
@@ -66,3 +193,56 @@ class Move(BaseModel):
     move = models.SmallIntegerField(choices=MoveChoices.choices, null=True)
     player = models.ForeignKey(Player, on_delete=models.DO_NOTHING, null=True)
     game_round = models.ForeignKey(GameRound, on_delete=models.DO_NOTHING, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["game_round", "player"], name="move_unique_player_per_round"
+            )
+        ]
+
+
+class PlayerStats(models.Model):
+    """
+    Rounds and moves of a player, updated whenever a round of its games finishes.
+    """
+
+    player = models.OneToOneField(
+        Player, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    rounds_played = models.IntegerField(default=0)
+    rounds_won = models.IntegerField(default=0)
+    rounds_tied = models.IntegerField(default=0)
+    # Number of moves of every choice, named after the MoveChoices labels
+    rock = models.IntegerField(default=0)
+    paper = models.IntegerField(default=0)
+    scissors = models.IntegerField(default=0)
+    lizard = models.IntegerField(default=0)
+    spock = models.IntegerField(default=0)
+
+
+class Matchup(BaseModel):
+    """
+    Head-to-head record of a player against an opponent, updated whenever a game
+    between them finishes. Every pair of players has a row for each of them.
+    """
+
+    player = models.ForeignKey(
+        Player, on_delete=models.CASCADE, related_name="matchups"
+    )
+    opponent = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="+")
+    games_played = models.IntegerField(default=0)
+    games_won = models.IntegerField(default=0)
+    games_tied = models.IntegerField(default=0)
+    rounds_won = models.IntegerField(default=0)
+    rounds_lost = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["player", "opponent"], name="matchup_unique_opponent"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["player", "-games_played"], name="matchup_most_played")
+        ]
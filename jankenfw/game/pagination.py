@@ -0,0 +1,137 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over a compound, unique ordering.
+
+    DRF's CursorPagination filters only by the first ordering field and skips rows
+    sharing its value with an offset, which degrades when many rows have the same
+    value (e.g. players without a won game). Here the cursor stores the values of
+    all ordering fields and a page starts right after that row, so every page is
+    a single index range scan no matter how deep it is and rows inserted meanwhile
+    don't shift the pages.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            offset, reverse, current_position = (0, False, None)
+        else:
+            offset, reverse, current_position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(
+                    self._after_position(current_position, reverse)
+                )
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # The ordering is unique, so the links built for these pages have no offset.
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = list(results[: self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def _after_position(self, position: str, reverse: bool) -> Q:
+        """
+        Build a row comparison that selects rows following the position in the
+        direction of the page, e.g. for '-created_at', '-id' ordering:
+
+            created_at <= x AND (created_at < x OR id < y)
+
+        The redundant bound on the first field is the range of the index scan, the
+        other conditions only filter the rows sharing its value.
+        """
+
+        values = json.loads(position)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValueError("The position doesn't match the ordering.")
+
+        fields = [order.lstrip("-") for order in self.ordering]
+        lookups = [
+            "lt" if order.startswith("-") != reverse else "gt"
+            for order in self.ordering
+        ]
+
+        bound = Q(**{f"{fields[0]}__{lookups[0]}e": values[0]})
+        conditions = [
+            Q(
+                **dict(zip(fields[1:index], values[1:index])),
+                **{f"{fields[index]}__{lookups[index]}": values[index]},
+            )
+            for index in range(len(fields))
+        ]
+        return bound & reduce(or_, conditions)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                attr = instance[field_name]
+            else:
+                attr = getattr(instance, field_name)
+            values.append(str(attr))
+
+        return json.dumps(values)
+
+
+class GamePagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class HighScorePagination(KeysetPagination):
+    ordering = ("-games_won", "id")
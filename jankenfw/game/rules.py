@@ -0,0 +1,62 @@
+from typing import Dict, FrozenSet, Sequence
+
+import numpy as np
+
+from jankenfw.game.enum import MoveChoices
+
+# Outcomes of a single (first move, second move) pair.
+TIE = 0
+FIRST = 1
+SECOND = 2
+
+BEATS: Dict[int, FrozenSet[int]] = {
+    MoveChoices.Rock: frozenset((MoveChoices.Scissors, MoveChoices.Lizard)),
+    MoveChoices.Paper: frozenset((MoveChoices.Rock, MoveChoices.Spock)),
+    MoveChoices.Scissors: frozenset((MoveChoices.Paper, MoveChoices.Lizard)),
+    MoveChoices.Lizard: frozenset((MoveChoices.Paper, MoveChoices.Spock)),
+    MoveChoices.Spock: frozenset((MoveChoices.Scissors, MoveChoices.Rock)),
+}
+
+# Size of tables indexed by a move. Move values start at 1, so index 0 is unused.
+SIZE = max(MoveChoices.values) + 1
+
+
+def _build_outcomes() -> tuple:
+    outcomes = [TIE] * (SIZE * SIZE)
+    for first, beaten in BEATS.items():
+        for second in beaten:
+            outcomes[first * SIZE + second] = FIRST
+            outcomes[second * SIZE + first] = SECOND
+    return tuple(outcomes)
+
+
+# Flat outcome table indexed by ``first * SIZE + second``, the row and column 0
+# are left as ties and never looked up for valid moves.
+OUTCOMES = _build_outcomes()
+_OUTCOMES_ARRAY = np.asarray(OUTCOMES, dtype=np.int8)
+
+
+def resolve(first: int, second: int) -> int:
+    """
+    Resolve a single pair of moves.
+
+    Return TIE, FIRST or SECOND depending on which move wins.
+    """
+
+    return OUTCOMES[first * SIZE + second]
+
+
+def resolve_many(first: Sequence[int], second: Sequence[int]) -> np.ndarray:
+    """
+    Resolve many pairs of moves in one call.
+
+    Both sequences have to be of the same length, the result holds the outcome
+    of each ``(first[i], second[i])`` pair, looked up by NumPy in one pass.
+    """
+
+    first = np.asarray(first, dtype=np.intp)
+    second = np.asarray(second, dtype=np.intp)
+    if first.shape != second.shape:
+        raise ValueError("Both move sequences have to be of the same length.")
+
+    return _OUTCOMES_ARRAY[first * SIZE + second]
@@ -1,6 +1,18 @@
-from rest_framework import serializers
+from django.conf import settings
+from rest_framework import ISO_8601, serializers
 
-from jankenfw.game.models import Game, Move, GameRound, Player
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.export import FORMATS
+from jankenfw.game.models import (
+    Game,
+    Move,
+    GameRound,
+    Matchup,
+    Player,
+    PlayerStats,
+    Tournament,
+)
+from libs.serializers import ValuesSerializer
 
 
 class GameSerializer(serializers.ModelSerializer):
@@ -11,7 +23,71 @@ class GameSerializer(serializers.ModelSerializer):
     class Meta:
         model = Game
         fields = "__all__"
-        read_only_fields = ("player", "status", "next_move")
+        read_only_fields = (
+            "player",
+            "status",
+            "next_move",
+            "current_round",
+            "version",
+            "winner",
+            "tournament",
+            "stage",
+            "position",
+            "archived_at",
+        )
+
+
+class TournamentSerializer(serializers.ModelSerializer):
+    """
+    Serialize a Tournament object
+    """
+
+    class Meta:
+        model = Tournament
+        fields = "__all__"
+        read_only_fields = ("player", "status", "stage", "bye", "winner")
+
+
+class EmbeddedPlayerSerializer(serializers.ModelSerializer):
+    """
+    Serialize a Player object embedded in a game
+    """
+
+    username = serializers.CharField(source="user.username", default=None)
+
+    class Meta:
+        model = Player
+        fields = ("id", "username")
+        read_only_fields = fields
+
+
+class RoundWinnerSerializer(serializers.ModelSerializer):
+    """
+    Serialize the winner of a finished GameRound object, None for a tie
+    """
+
+    class Meta:
+        model = GameRound
+        fields = ("round_number", "winner")
+        read_only_fields = fields
+
+
+class EmbeddedGameSerializer(GameSerializer):
+    """
+    Serialize a Game object with its players, the number of the current round and
+    the winners of the finished rounds.
+
+    The game has to be fetched with 'finished_rounds' prefetched, see
+    'GameViewSet.get_queryset'.
+    """
+
+    player = EmbeddedPlayerSerializer(many=True, read_only=True)
+    current_round_number = serializers.IntegerField(
+        source="current_round.round_number", default=None, read_only=True
+    )
+    round_winners = RoundWinnerSerializer(
+        source="finished_rounds", many=True, read_only=True
+    )
 
 
 class MoveSerializer(serializers.ModelSerializer):
@@ -49,3 +125,125 @@ class PlayerHighScoreSerializer(serializers.ModelSerializer):
             "games_won",
         )
         read_only_fields = fields
+
+
+class MatchupSerializer(serializers.ModelSerializer):
+    """
+    Serialize the head-to-head record of a player against an opponent
+    """
+
+    username = serializers.CharField(source="opponent.user.username", default=None)
+
+    class Meta:
+        model = Matchup
+        fields = (
+            "opponent",
+            "username",
+            "games_played",
+            "games_won",
+            "games_tied",
+            "rounds_won",
+            "rounds_lost",
+        )
+        read_only_fields = fields
+
+
+class PlayerStatsSerializer(serializers.ModelSerializer):
+    """
+    Serialize the statistics of a Player object with its PlayerStats and the
+    Matchup objects passed in the 'matchups' context
+    """
+
+    username = serializers.CharField(source="user.username", default=None)
+    games_lost = serializers.SerializerMethodField()
+    win_rate = serializers.SerializerMethodField()
+    rounds = serializers.SerializerMethodField()
+    moves = serializers.SerializerMethodField()
+    head_to_head = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Player
+        fields = (
+            "id",
+            "username",
+            "games_played",
+            "games_won",
+            "games_tied",
+            "games_lost",
+            "win_rate",
+            "rounds",
+            "moves",
+            "head_to_head",
+        )
+        read_only_fields = fields
+
+    def get_games_lost(self, player: Player) -> int:
+        return player.games_played - player.games_won - player.games_tied
+
+    def get_win_rate(self, player: Player) -> float:
+        if not player.games_played:
+            return 0.0
+        return round(player.games_won / player.games_played, 4)
+
+    def _stats(self, player: Player) -> PlayerStats:
+        try:
+            return player.stats
+        except PlayerStats.DoesNotExist:
+            # The player hasn't finished a round yet
+            return PlayerStats(player=player)
+
+    def get_rounds(self, player: Player) -> dict:
+        stats = self._stats(player)
+        return {
+            "played": stats.rounds_played,
+            "won": stats.rounds_won,
+            "tied": stats.rounds_tied,
+        }
+
+    def get_moves(self, player: Player) -> dict:
+        stats = self._stats(player)
+        return {label: getattr(stats, label) for label in MoveChoices.labels}
+
+    def get_head_to_head(self, player: Player) -> list:
+        return MatchupSerializer(self.context.get("matchups", []), many=True).data
+
+
+class MatchmakingSerializer(serializers.Serializer):
+    """
+    Validate a request to find an opponent
+    """
+
+    rounds = serializers.IntegerField(min_value=1, max_value=100, default=1)
+
+
+class BotSerializer(serializers.Serializer):
+    """
+    Validate a request to add a bot player to a game
+    """
+
+    strategy = serializers.ChoiceField(choices=())
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["strategy"].choices = sorted(settings.GAME_BOT_STRATEGIES)
+
+
+class ExportSerializer(serializers.Serializer):
+    """
+    Validate the format and the filters of exported games
+    """
+
+    output = serializers.ChoiceField(choices=FORMATS, default="ndjson")
+    status = serializers.ChoiceField(choices=GameStatusChoices.choices, required=False)
+    since = serializers.DateTimeField(
+        required=False, input_formats=[ISO_8601, "%Y-%m-%d"]
+    )
+    until = serializers.DateTimeField(
+        required=False, input_formats=[ISO_8601, "%Y-%m-%d"]
+    )
+    chunk_size = serializers.IntegerField(min_value=1, max_value=10000, default=2000)
+
+
+# Fast, read-only serializers of 'values()' rows with the same output
+game_values = ValuesSerializer(GameSerializer)
+high_score_values = ValuesSerializer(PlayerHighScoreSerializer)
@@ -1,127 +1,286 @@
-from typing import Tuple, Dict, Union
-
-from django.db.models import Max, Count
-
-from jankenfw.game.enum import MoveChoices, GameStatusChoices
+from functools import partial
+from typing import Tuple, Dict, Sequence, Optional, Union
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import CharField, OuterRef, Subquery, UUIDField
+
+from jankenfw.game.bots import get_bot_memory, get_strategy, submit_bot_task
+from jankenfw.game.engine import GameError, LiveGame
+from jankenfw.game.enum import GameStatusChoices
+from jankenfw.game.events import publish_event
+from jankenfw.game.leaderboard import leaderboard
+from jankenfw.game.matchmaking import get_matchmaking_queue
 from jankenfw.game.models import Move, GameRound, Player, Game
+from jankenfw.game.state import GameState, update_game_state
+from jankenfw.game.stats import count_finished_game, count_rounds
+from jankenfw.game.tournaments import advance_tournament
+from jankenfw.game.writebehind import get_write_behind
 
 
+@transaction.atomic
 def join_game(game: Game, player: Player) -> Dict:
     """
     Add a player to the provided game.
 
+    The game row is locked first, so two players can't take the last slot at once.
+    Joining bumps the version of the game and updates its cached state.
+
     Return an error if:
         - a player already joined a game
         - the game is full
         - the game is finished
     """
 
-    if game.player.filter(id=player.id).exists():
-        return {"error": "You have already joined this game."}
-    elif game.status == GameStatusChoices.FINISHED:
-        return {"error": "This game is finished."}
-    elif game.player.count() >= 2:
-        return {"error": "This game is full."}
+    game.status, game.version = (
+        Game.objects.select_for_update()
+        .values_list("status", "version")
+        .get(pk=game.pk)
+    )
+    player_ids = list(
+        Game.player.through.objects.filter(game=game).values_list(
+            "player_id", flat=True
+        )
+    )
 
-    game.player.add(player)
+    live_game = LiveGame(game.rounds, status=game.status, players=player_ids)
+    try:
+        live_game.join(player.id)
+    except GameError as error:
+        return {"error": str(error)}
 
-    if game.player.count() == 2:
-        game.status = GameStatusChoices.IN_PROGRESS
-        game.save()
+    game.player.add(player)
+    publish_event(game.id, "player_joined", player=str(player.id))
+
+    game.status = live_game.status
+    game.version += 1
+    game.save(update_fields=["status", "version", "updated_at"])
+    update_game_state(
+        game.id,
+        game.version,
+        lambda state: state.replace(
+            status=game.status,
+            players=tuple(sorted((*state.players, (player.id, player.user_id)))),
+        ),
+    )
 
     return {"status": "You joined the game."}
 
 
+def _create_match(player_ids: Sequence[UUID], rounds: int) -> Game:
+    """
+    Create an in progress game with its first round for the paired players.
+
+    The game, its round and both memberships are inserted in one transaction.
+    """
+
+    game = Game(rounds=rounds, status=GameStatusChoices.IN_PROGRESS)
+    game.current_round = GameRound(game=game)
+    memberships = [
+        Game.player.through(game_id=game.id, player_id=player_id)
+        for player_id in player_ids
+    ]
+
+    with transaction.atomic():
+        game.save(force_insert=True)
+        game.current_round.save(force_insert=True)
+        Game.player.through.objects.bulk_create(memberships)
+
+    return game
+
+
+def find_match(player: Player, rounds: int) -> Dict:
+    """
+    Pair the player with the longest waiting player who wants to play the same
+    number of rounds and start a game for them.
+
+    If nobody is waiting the player is queued, the paired game can be read with
+    'get_match' later.
+    """
+
+    queue = get_matchmaking_queue()
+    opponent_id = queue.pair(player.id, rounds)
+
+    if opponent_id is None:
+        return {"status": "Waiting for an opponent."}
+
+    try:
+        game = _create_match((opponent_id, player.id), rounds)
+    except Exception:
+        queue.requeue(opponent_id, rounds)
+        raise
+
+    queue.matched(opponent_id, game.id)
+    publish_event(game.id, "player_joined", player=str(opponent_id))
+    publish_event(game.id, "player_joined", player=str(player.id))
+
+    return {"status": "Opponent found.", "game": game.id}
+
+
+def get_match(player: Player) -> Dict:
+    """
+    Return the game found for the queued player.
+
+    Return an error if the player isn't waiting for an opponent.
+    """
+
+    match = get_matchmaking_queue().status(player.id)
+
+    if match is None:
+        return {"error": "You are not waiting for an opponent."}
+    elif match["game"] is None:
+        return {"status": "Waiting for an opponent."}
+
+    return {"status": "Opponent found.", "game": match["game"]}
+
+
+def cancel_match(player: Player) -> Dict:
+    """
+    Remove the player from the matchmaking queue.
+    """
+
+    if not get_matchmaking_queue().cancel(player.id):
+        return {"error": "You are not waiting for an opponent."}
+
+    return {"status": "You left the queue."}
+
+
 def _get_current_round(game: Game) -> Tuple[int, GameRound]:
     """
     Get current round object and current round number of the provided game.
+
+    The round is read through the 'current_round' pointer of the game, so it is
+    a primary key lookup, or no query at all if it was loaded with the game.
     """
 
-    game_rounds = GameRound.objects.filter(game=game)
-    current_game_round_number = game_rounds.aggregate(Max("round_number"))[
-        "round_number__max"
-    ]
-    game_round = game_rounds.get(round_number=current_game_round_number)
+    game_round = game.current_round
+
+    return game_round.round_number, game_round
+
+
+def _lock_game(game: Game) -> Game:
+    """
+    Lock the row of the provided game until the end of the transaction and return
+    its fresh state.
+
+    The current round, the ids of both players in the order they joined and their
+    bot strategies are read by the same query.
+    """
+
+    seats = Game.player.through.objects.filter(game=OuterRef("pk")).order_by("id")
+    annotations = {}
+    for index, seat in enumerate(("first", "second")):
+        annotations[f"{seat}_player_id"] = Subquery(
+            seats.values("player")[index : index + 1], output_field=UUIDField()
+        )
+        annotations[f"{seat}_player_bot"] = Subquery(
+            seats.values("player__bot")[index : index + 1], output_field=CharField()
+        )
 
-    return current_game_round_number, game_round
+    return (
+        Game.objects.select_for_update(of=("self",))
+        .select_related("current_round")
+        .annotate(**annotations)
+        .get(pk=game.pk)
+    )
 
 
-def _findout_winner(game: Game, game_round: GameRound) -> str:
+def _findout_winner(game: Game, game_round: GameRound, moves: Sequence[Move]) -> str:
     """
     Findout who is the winner of the round or game.
+
+    The moves of the round are passed in by the caller, so resolving a round
+    doesn't query them again. The round is resolved by the game engine, this
+    function persists its result: if it is not the last round the next round is
+    started, otherwise the game is finished. The round and the game are counted in
+    the statistics of both players. The game itself is saved by the caller.
     """
 
-    moves = Move.objects.filter(game_round=game_round)
-    player_one = moves[0].player
-    player_one_move = moves[0].move
-    player_two = moves[1].player
-    player_two_move = moves[1].move
-
-    winner = ""
-
-    # TODO: Create better move mapping to find a winner
-    if player_one_move == player_two_move:
-        winner = "Tie"
-    elif (
-        player_one_move == MoveChoices.Rock and player_two_move == MoveChoices.Scissors
-    ):
-        winner = player_one
-    elif player_one_move == MoveChoices.Rock and player_two_move == MoveChoices.Paper:
-        winner = player_two
-    elif (
-        player_one_move == MoveChoices.Scissors and player_two_move == MoveChoices.Rock
-    ):
-        winner = player_two
-    elif (
-        player_one_move == MoveChoices.Scissors and player_two_move == MoveChoices.Paper
-    ):
-        winner = player_one
-    elif player_one_move == MoveChoices.Paper and player_two_move == MoveChoices.Rock:
-        winner = player_one
-    elif (
-        player_one_move == MoveChoices.Paper and player_two_move == MoveChoices.Scissors
-    ):
-        winner = player_two
+    first_move, second_move = moves[0], moves[1]
+    players = {move.player_id: move.player for move in moves}
+
+    # Only the last round reads the winners of the previous rounds.
+    round_winners = []
+    if game_round.round_number >= game.rounds:
+        round_winners = list(
+            GameRound.objects.filter(
+                game=game, round_number__lt=game_round.round_number
+            )
+            .order_by("round_number")
+            .values_list("winner", flat=True)
+        )
+
+    live_game = LiveGame(
+        game.rounds,
+        status=GameStatusChoices.IN_PROGRESS,
+        players=list(players),
+        round_number=game_round.round_number,
+        round_moves=[(first_move.player_id, first_move.move)],
+        round_winners=round_winners,
+    )
+    result = live_game.move(second_move.player_id, second_move.move)
+
+    winner = "Tie" if result.round_winner is None else players[result.round_winner]
 
     if winner != "Tie":
         game_round.winner = winner
-        game_round.save()
-
-    if game_round.round_number < game.rounds:
-        if winner == "Tie":
-            return f"Round finished. It's a Tie"
-        return f"{game_round.round_number} round winner is {winner}"
-
-    elif game_round.round_number == game.rounds:
-        win_count = (
-            GameRound.objects.filter(game=game)
-            .values_list("winner")
-            .annotate(winner_count=Count("winner"))
-            .order_by("-winner_count")
+    game_round.save(update_fields=["winner", "move_count", "updated_at"])
+    count_rounds(
+        [([(move.player_id, move.move) for move in moves], game_round.winner_id)]
+    )
+    publish_event(
+        game.id,
+        "round_finished",
+        round=game_round.round_number,
+        winner=str(game_round.winner_id) if game_round.winner_id else None,
+        moves={str(move.player_id): move.move for move in moves},
+    )
+
+    if not result.game_finished:
+        game.current_round = GameRound.objects.create(
+            game=game, round_number=live_game.round_number
         )
-        # No winners at this game
-        if win_count[0][0] is None:
-            return f"The game finished. It's a Tie."
 
-        player_one_games_won = win_count[0][1]
-        player_two_games_won = win_count[1][1]
+        return _round_status(
+            game_round.round_number, None if winner == "Tie" else winner
+        )
 
-        if player_one_games_won == player_two_games_won:
-            return f"The game finished. It's a Tie."
+    game.status = live_game.status
+    game.winner_id = result.game_winner
+    count_finished_game(live_game.players, live_game.wins(), result.game_winner)
 
-        winner_id, rounds_won = win_count[0]
+    if result.game_winner is None:
+        publish_event(game.id, "game_finished", winner=None)
+        return _game_status(None)
 
-        player = Player.objects.get(id=winner_id)
-        player.games_won += 1
-        player.save()
+    player, rounds_won = players[result.game_winner], result.rounds_won
+    player.games_won += 1
+    transaction.on_commit(
+        partial(
+            leaderboard.increment, player.id, getattr(player.user, "username", None)
+        )
+    )
+    publish_event(game.id, "game_finished", winner=str(player.id))
 
-        game.status = GameStatusChoices.FINISHED
-        game.save()
+    return _game_status(player, rounds_won, player.games_won)
 
-        return f"Game winner is {player}. Total rounds won {rounds_won}. Total games won {player.games_won}"
 
+def _round_status(round_number: int, winner: Optional[object]) -> str:
+    if winner is None:
+        return f"Round finished. It's a Tie"
+    return f"{round_number} round winner is {winner}"
 
-def _is_game_active(game: Game) -> Dict:
+
+def _game_status(
+    winner: Optional[object], rounds_won: int = 0, games_won: int = 0
+) -> str:
+    if winner is None:
+        return f"The game finished. It's a Tie."
+    return f"Game winner is {winner}. Total rounds won {rounds_won}. Total games won {games_won}"
+
+
+def _is_game_active(game: Union[Game, GameState]) -> Dict:
     """
     Check if the game is in progress.
 
@@ -138,36 +297,269 @@ def _is_game_active(game: Game) -> Dict:
     return {"status": "This game is in progress."}
 
 
-def do_move(game: Game, move: Move, player: Player) -> Dict:
+def _can_move(state: GameState, user_id: UUID) -> Dict:
+    """
+    Check with the state of the game if the user can move now.
+
+    Return an error if:
+        - the game is not in progress
+        - the user is not a player in the game
+        - it is the other player's move
+    """
+
+    result = _is_game_active(state)
+    if "error" in result:
+        return result
+
+    player_id = state.player_of_user(user_id)
+    if player_id is None:
+        return {"error": "You are not a player in this game."}
+    elif state.next_move and state.next_move != player_id:
+        return {"error": "It's not your move."}
+
+    return result
+
+
+def _finish_round_state(
+    state: GameState, status: int, round_number: int, winner_id: Optional[UUID]
+) -> GameState:
+    return state.replace(
+        status=status,
+        next_move=None,
+        round_number=round_number,
+        round_moves=(),
+        round_winners=(*state.round_winners, winner_id),
+    )
+
+
+def do_move(game: Game, move: Move, player: Player) -> Optional[Dict]:
     """
     Create a Move object for provided Player and Game.
 
-    If there are already two moves in the current game round, and it is not the last round
-    create a new Round.
+    The game row is locked for the whole move, so concurrent moves in the same game
+    are applied one after another. The current round and the number of moves in it
+    are kept on the Game and GameRound rows, so a move takes a small, fixed number
+    of queries. Every move bumps the version of the game and updates its cached
+    state, including the result of the round.
 
-    For finished round call a 'findout_winner' method to get the round/game winner.
+    The move is checked by the game engine. For finished round call
+    a 'findout_winner' method to get the round/game winner.
 
     Next set a player who should do next move.
+
+    If the other player is a bot, its answer is made by the bot workers once the
+    move is committed.
+
+    A finished game of a tournament advances the tournament to its next stage once
+    all games of the stage are finished.
+
+    With the 'GAME_WRITE_BEHIND' setting the move is made by 'do_move_write_behind'.
+
+    Return an error if the game is not in progress or it is not the player's move.
     """
 
-    other_player = game.player.exclude(id=player.id).first()
+    if settings.GAME_WRITE_BEHIND:
+        return do_move_write_behind(game, move, player)
+    return _do_move(game, move, player)
+
+
+@transaction.atomic
+def _do_move(game: Game, move: Move, player: Player) -> Optional[Dict]:
+    game = _lock_game(game)
+
+    seats = [
+        (player_id, bot)
+        for player_id, bot in (
+            (game.first_player_id, game.first_player_bot),
+            (game.second_player_id, game.second_player_bot),
+        )
+        if player_id is not None
+    ]
+    live_game = LiveGame(
+        game.rounds,
+        status=game.status,
+        players=[player_id for player_id, _ in seats],
+        next_move=game.next_move_id,
+    )
+    try:
+        live_game.check_move(player.id)
+    except GameError as error:
+        return {"error": str(error)}
+
     current_game_round_number, game_round = _get_current_round(game)
-    moves_in_current_round = Move.objects.filter(game_round=game_round).count()
 
-    if moves_in_current_round >= 2 and current_game_round_number < game.rounds:
+    # Rounds finished before the next round was started together with the result.
+    if game_round.move_count >= 2 and current_game_round_number < game.rounds:
         game_round = GameRound.objects.create(
             game=game, round_number=current_game_round_number + 1
         )
+        game.current_round = game_round
+
+    Move.objects.create(game=game, player=player, move=move, game_round=game_round)
+    game_round.move_count += 1
+    game.version += 1
+    # The move itself is only revealed with the round result.
+    publish_event(
+        game.id, "move_made", player=str(player.id), round=game_round.round_number
+    )
+
+    if game_round.move_count >= 2:
+        moves = list(
+            Move.objects.filter(game_round=game_round)
+            .select_related("player__user")
+            .order_by("created_at")
+        )
+        status = _findout_winner(game, game_round, moves)
+        game.next_move = None
+        update_game_state(
+            game.id,
+            game.version,
+            partial(
+                _finish_round_state,
+                status=game.status,
+                round_number=game.current_round.round_number,
+                winner_id=game_round.winner_id,
+            ),
+        )
+        game.save(
+            update_fields=[
+                "status",
+                "next_move",
+                "current_round",
+                "winner",
+                "version",
+                "updated_at",
+            ]
+        )
+        if game.status == GameStatusChoices.FINISHED and game.tournament_id:
+            advance_tournament(game.tournament_id)
+        return {"status": status}
+
+    game_round.save(update_fields=["move_count", "updated_at"])
+    live_game.move(player.id, move)
+    game.next_move_id = live_game.next_move
+    game.save(update_fields=["next_move", "current_round", "version", "updated_at"])
+    update_game_state(
+        game.id,
+        game.version,
+        partial(
+            GameState.replace,
+            next_move=game.next_move_id,
+            round_number=game_round.round_number,
+            round_moves=(player.id,),
+        ),
+    )
+    other_player_id, other_player_bot = seats[1 - live_game.players.index(player.id)]
+    if other_player_bot:
+        transaction.on_commit(
+            partial(
+                _schedule_bot_move,
+                game.id,
+                other_player_id,
+                other_player_bot,
+                player.id,
+                move,
+            )
+        )
+
+
+def _schedule_bot_move(
+    game_id: UUID, bot_id: UUID, strategy: str, opponent_id: UUID, opponent_move: int
+) -> None:
+    submit_bot_task(
+        partial(_play_bot_move, game_id, bot_id, strategy, opponent_id, opponent_move)
+    )
+
 
-    if game.next_move == player or not game.next_move:
-        Move.objects.create(game=game, player=player, move=move, game_round=game_round)
+def _play_bot_move(
+    game_id: UUID, bot_id: UUID, strategy: str, opponent_id: UUID, opponent_move: int
+) -> Optional[Dict]:
+    """
+    Answer the move of the opponent with the move chosen by the bot's strategy.
+
+    The strategy chooses from the history of the opponent kept in memory, the
+    answered move is added to the history only after the choice.
+    """
+
+    move = get_bot_memory().choose(get_strategy(strategy), opponent_id, opponent_move)
+    return do_move(Game(pk=game_id), move, Player(pk=bot_id, bot=strategy))
+
+
+def do_move_write_behind(game: Game, move: Move, player: Player) -> Optional[Dict]:
+    """
+    Make the move on the game kept in memory, its rows are written to the database
+    later by the write-behind worker.
+
+    Events, the cached state of the game and the leaderboard are updated right
+    away, so the response is the same as the response of 'do_move'.
+    """
+
+    try:
+        buffered = get_write_behind().move(game.pk, player.pk, move)
+    except GameError as error:
+        return {"error": str(error)}
+
+    result = buffered.result
+    publish_event(
+        game.pk, "move_made", player=str(player.pk), round=result.round_number
+    )
+
+    if not result.round_finished:
+        update_game_state(
+            game.pk,
+            buffered.version,
+            partial(
+                GameState.replace,
+                next_move=buffered.next_move,
+                round_number=result.round_number,
+                round_moves=(player.pk,),
+            ),
+        )
+        strategy = buffered.bots.get(buffered.next_move)
+        if strategy:
+            transaction.on_commit(
+                partial(
+                    _schedule_bot_move,
+                    game.pk,
+                    buffered.next_move,
+                    strategy,
+                    player.pk,
+                    move,
+                )
+            )
+        return None
+
+    winner = result.round_winner
+    publish_event(
+        game.pk,
+        "round_finished",
+        round=result.round_number,
+        winner=str(winner) if winner else None,
+        moves={str(player_id): value for player_id, value in buffered.round_moves},
+    )
+    update_game_state(
+        game.pk,
+        buffered.version,
+        partial(
+            _finish_round_state,
+            status=buffered.status,
+            round_number=buffered.round_number,
+            winner_id=winner,
+        ),
+    )
+
+    if not result.game_finished:
+        status = _round_status(
+            result.round_number, None if winner is None else buffered.usernames[winner]
+        )
+        return {"status": status}
 
-        moves_in_current_round = Move.objects.filter(game_round=game_round).count()
-        if moves_in_current_round >= 2:
-            status = _findout_winner(game, game_round)
-            game.next_move = None
-            game.save()
-            return {"status": status}
+    winner = result.game_winner
+    if winner is None:
+        publish_event(game.pk, "game_finished", winner=None)
+        return {"status": _game_status(None)}
 
-        game.next_move = other_player
-        game.save()
+    username = buffered.usernames[winner]
+    transaction.on_commit(partial(leaderboard.increment, winner, username))
+    publish_event(game.pk, "game_finished", winner=str(winner))
+    return {"status": _game_status(username, result.rounds_won, buffered.games_won)}
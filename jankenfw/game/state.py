@@ -0,0 +1,329 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from jankenfw.game.models import Game, GameRound, Move
+
+
+class GameState:
+    """
+    Compact state of a game, enough to check a move without the database.
+
+    'players' holds (player id, user id) pairs, 'round_moves' the ids of players
+    who moved in the current round and 'round_winners' the winner of every
+    finished round, None for a tie.
+    """
+
+    __slots__ = (
+        "id",
+        "version",
+        "status",
+        "rounds",
+        "players",
+        "next_move",
+        "round_number",
+        "round_moves",
+        "round_winners",
+    )
+
+    def __init__(
+        self,
+        id: UUID,
+        version: int,
+        status: int,
+        rounds: int,
+        players: Tuple[Tuple[UUID, Optional[UUID]], ...],
+        next_move: Optional[UUID],
+        round_number: Optional[int],
+        round_moves: Tuple[UUID, ...] = (),
+        round_winners: Tuple[Optional[UUID], ...] = (),
+    ) -> None:
+        self.id = id
+        self.version = version
+        self.status = status
+        self.rounds = rounds
+        self.players = players
+        self.next_move = next_move
+        self.round_number = round_number
+        self.round_moves = round_moves
+        self.round_winners = round_winners
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GameState) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"GameState({values})"
+
+    def replace(self, **changes) -> "GameState":
+        """
+        Return a copy of the state with the changed values, states are shared by
+        readers, so they are never changed in place.
+        """
+
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return GameState(**values)
+
+    def player_of_user(self, user_id: UUID) -> Optional[UUID]:
+        for player_id, player_user_id in self.players:
+            if player_user_id == user_id:
+                return player_id
+        return None
+
+    @classmethod
+    def load(cls, game_id: UUID) -> Optional["GameState"]:
+        """
+        Load the state of the game from the database, None for an unknown game.
+        """
+
+        game = (
+            Game.objects.filter(pk=game_id)
+            .values(
+                "version",
+                "status",
+                "rounds",
+                "next_move",
+                "current_round",
+                "current_round__round_number",
+            )
+            .first()
+        )
+        if game is None:
+            return None
+
+        players = tuple(
+            Game.player.through.objects.filter(game_id=game_id)
+            .order_by("player_id")
+            .values_list("player_id", "player__user_id")
+        )
+        round_winners = tuple(
+            GameRound.objects.filter(game_id=game_id, move_count__gte=2)
+            .order_by("round_number")
+            .values_list("winner_id", flat=True)
+        )
+        round_moves = tuple(
+            Move.objects.filter(game_round_id=game["current_round"])
+            .order_by("created_at")
+            .values_list("player_id", flat=True)
+        )
+
+        if len(round_moves) >= 2:
+            # The last round of a finished game
+            round_moves = ()
+
+        return cls(
+            id=game_id,
+            version=game["version"],
+            status=game["status"],
+            rounds=game["rounds"],
+            players=players,
+            next_move=game["next_move"],
+            round_number=game["current_round__round_number"],
+            round_moves=round_moves,
+            round_winners=round_winners,
+        )
+
+
+class BaseGameStateCache:
+    """
+    Cache of game states by the id of the game.
+    """
+
+    def get(self, game_id: UUID) -> Optional[GameState]:
+        raise NotImplementedError
+
+    def add(self, state: GameState) -> None:
+        """
+        Store a state loaded from the database, unless the game is already cached.
+        """
+
+        raise NotImplementedError
+
+    def set(self, state: GameState) -> None:
+        raise NotImplementedError
+
+    def update(
+        self, game_id: UUID, version: int, change: Callable[[GameState], GameState]
+    ) -> None:
+        """
+        Apply the change to the cached state of the previous version of the game,
+        any other cached state is dropped.
+        """
+
+        raise NotImplementedError
+
+    def delete(self, game_id: UUID) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LocalGameStateCache(BaseGameStateCache):
+    """
+    Game states kept in the memory of the process.
+
+    At most 'GAME_STATE_CACHE_SIZE' games are kept, the least recently used are
+    evicted first, and a state expires 'GAME_STATE_CACHE_TTL' seconds after it
+    was stored. Writes made by other processes aren't seen until then, so use
+    a shared cache to run more than one process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # game_id -> (expires_at, state), the least recently used first
+        self._states: OrderedDict = OrderedDict()
+
+    def get(self, game_id: UUID) -> Optional[GameState]:
+        with self._lock:
+            entry = self._states.get(game_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._states[game_id]
+                return None
+            self._states.move_to_end(game_id)
+            return entry[1]
+
+    def add(self, state: GameState) -> None:
+        with self._lock:
+            entry = self._states.get(state.id)
+            if entry is None or entry[0] <= time.monotonic():
+                self._store(state)
+
+    def set(self, state: GameState) -> None:
+        with self._lock:
+            self._store(state)
+
+    def _store(self, state: GameState) -> None:
+        self._states[state.id] = (
+            time.monotonic() + settings.GAME_STATE_CACHE_TTL,
+            state,
+        )
+        self._states.move_to_end(state.id)
+        while len(self._states) > settings.GAME_STATE_CACHE_SIZE:
+            self._states.popitem(last=False)
+
+    def update(
+        self, game_id: UUID, version: int, change: Callable[[GameState], GameState]
+    ) -> None:
+        with self._lock:
+            entry = self._states.get(game_id)
+            if (
+                entry is not None
+                and entry[0] > time.monotonic()
+                and entry[1].version == version - 1
+            ):
+                self._store(change(entry[1]).replace(version=version))
+            else:
+                self._states.pop(game_id, None)
+
+    def delete(self, game_id: UUID) -> None:
+        with self._lock:
+            self._states.pop(game_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+class DjangoGameStateCache(BaseGameStateCache):
+    """
+    Game states kept in the Django cache set with the 'GAME_STATE_CACHE_ALIAS'
+    setting, e.g. Redis or Memcached shared by all processes.
+
+    A changed game is dropped from the cache rather than updated, a get and set
+    of two processes committing at once could store a result over the other.
+    """
+
+    def __init__(self) -> None:
+        self.cache = caches[settings.GAME_STATE_CACHE_ALIAS]
+
+    def _key(self, game_id: UUID) -> str:
+        return f"game-state:{game_id}"
+
+    def get(self, game_id: UUID) -> Optional[GameState]:
+        return self.cache.get(self._key(game_id))
+
+    def add(self, state: GameState) -> None:
+        self.cache.add(self._key(state.id), state, settings.GAME_STATE_CACHE_TTL)
+
+    def set(self, state: GameState) -> None:
+        self.cache.set(self._key(state.id), state, settings.GAME_STATE_CACHE_TTL)
+
+    def update(
+        self, game_id: UUID, version: int, change: Callable[[GameState], GameState]
+    ) -> None:
+        self.cache.delete(self._key(game_id))
+
+    def delete(self, game_id: UUID) -> None:
+        self.cache.delete(self._key(game_id))
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+@lru_cache(maxsize=None)
+def get_game_state_cache() -> BaseGameStateCache:
+    """
+    Return the game state cache set with the 'GAME_STATE_CACHE' setting.
+    """
+
+    return import_string(settings.GAME_STATE_CACHE)()
+
+
+def get_game_state(game_id: UUID) -> Optional[GameState]:
+    """
+    Return the cached state of the game, it's loaded from the database on a miss.
+    """
+
+    cache = get_game_state_cache()
+    state = cache.get(game_id)
+    if state is None:
+        state = GameState.load(game_id)
+        if state is not None:
+            cache.add(state)
+    return state
+
+
+def reload_game_state(game_id: UUID) -> Optional[GameState]:
+    """
+    Load the state of the game from the database and replace the cached state.
+    """
+
+    cache = get_game_state_cache()
+    state = GameState.load(game_id)
+    if state is None:
+        cache.delete(game_id)
+    else:
+        cache.set(state)
+    return state
+
+
+def update_game_state(
+    game_id: UUID, version: int, change: Callable[[GameState], GameState]
+) -> None:
+    """
+    Apply the change to the cached state of the game once the current transaction
+    is committed.
+
+    The change is applied only to the state of the previous version of the game,
+    any other cached state is dropped and loaded again on the next read. A state
+    loaded before the commit may still be cached after it, so a cached state is
+    only trusted to let moves through, 'do_move' checks them with the database.
+    """
+
+    transaction.on_commit(
+        lambda: get_game_state_cache().update(game_id, version, change)
+    )
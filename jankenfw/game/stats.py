@@ -0,0 +1,154 @@
+"""
+Counters of players, kept up to date when rounds and games finish.
+
+Finished games are counted on the Player rows and in the Matchup rows of both
+players, finished rounds in their PlayerStats rows. Missing rows are inserted
+first, then each of them is a single UPDATE ... SET x = x + n statement, so
+concurrent games don't lose increments, and the statistics are read without
+scanning moves and rounds.
+'rebuild_player_stats' recomputes PlayerStats and Matchup from the moves.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Type
+from uuid import UUID
+
+from django.db import models
+from django.db.models import Case, F, Q, Value, When
+
+from jankenfw.game.enum import MoveChoices
+from jankenfw.game.models import Matchup, Player, PlayerStats
+
+# (moves of the round as (player id, move) pairs, winner id or None for a tie)
+Round = Tuple[Sequence[Tuple[UUID, int]], Optional[UUID]]
+
+
+def move_field(move: int) -> str:
+    """
+    Return the PlayerStats field counting the move.
+    """
+
+    return MoveChoices(move).label
+
+
+def round_counters(rounds: Iterable[Round]) -> Dict[UUID, Counter]:
+    """
+    Return the PlayerStats increments of the finished rounds by player id.
+    """
+
+    counters = defaultdict(Counter)
+    for moves, winner in rounds:
+        for player, move in moves:
+            counter = counters[player]
+            counter["rounds_played"] += 1
+            counter[move_field(move)] += 1
+            if winner is None:
+                counter["rounds_tied"] += 1
+            elif winner == player:
+                counter["rounds_won"] += 1
+    return counters
+
+
+def matchup_counters(
+    players: Sequence[UUID], rounds_won: Sequence[int], winner: Optional[UUID]
+) -> Dict[Tuple[UUID, UUID], Counter]:
+    """
+    Return the Matchup increments of a finished game by (player id, opponent id).
+    """
+
+    counters = {}
+    for seat, player in enumerate(players):
+        opponent = players[1 - seat]
+        counters[(player, opponent)] = Counter(
+            games_played=1,
+            games_won=int(winner == player),
+            games_tied=int(winner is None),
+            rounds_won=rounds_won[seat],
+            rounds_lost=rounds_won[1 - seat],
+        )
+    return counters
+
+
+def increment(
+    model: Type[models.Model],
+    key_fields: Sequence[str],
+    counters: Dict[Tuple, Counter],
+) -> None:
+    """
+    Add the counters to the rows of the model with a single UPDATE statement.
+
+    The rows are identified by the values of the 'key_fields'. Rows that don't
+    exist yet are inserted with zero counters before the UPDATE, ignoring rows
+    inserted concurrently, so the UPDATE always adds to an existing row.
+    """
+
+    if not counters:
+        return
+
+    rows = {
+        key if isinstance(key, tuple) else (key,): counter
+        for key, counter in counters.items()
+    }
+    lookups = {key: Q(**dict(zip(key_fields, key))) for key in rows}
+
+    names = sorted({name for counter in rows.values() for name in counter})
+    updates = {
+        name: F(name)
+        + Case(
+            *(
+                When(lookups[key], then=Value(counter[name]))
+                for key, counter in rows.items()
+                if counter[name]
+            ),
+            default=Value(0),
+        )
+        for name in names
+    }
+    keys = Q()
+    for lookup in lookups.values():
+        keys |= lookup
+
+    model.objects.bulk_create(
+        [model(**dict(zip(key_fields, key))) for key in rows], ignore_conflicts=True
+    )
+    model.objects.filter(keys).update(**updates)
+
+
+def count_rounds(rounds: Iterable[Round]) -> None:
+    """
+    Add finished rounds to the PlayerStats of their players.
+    """
+
+    increment(PlayerStats, ("player_id",), round_counters(rounds))
+
+
+def count_finished_game(
+    players: Sequence[UUID], rounds_won: Sequence[int], winner: Optional[UUID]
+) -> int:
+    """
+    Add a finished game to the counters and the head-to-head record of its players.
+
+    All counters of both players are incremented by a single UPDATE statement,
+    so concurrent games of the same player don't lose increments. 'rounds_won'
+    holds the number of rounds won by each of the players.
+    """
+
+    increment(
+        Matchup,
+        ("player_id", "opponent_id"),
+        matchup_counters(players, rounds_won, winner),
+    )
+    return Player.objects.filter(pk__in=players).update(
+        games_played=F("games_played") + 1,
+        games_won=F("games_won")
+        + (Case(When(pk=winner, then=Value(1)), default=Value(0)) if winner else 0),
+        games_tied=F("games_tied") + (0 if winner else 1),
+        rounds_won=F("rounds_won")
+        + Case(
+            *(
+                When(pk=player, then=Value(count))
+                for player, count in zip(players, rounds_won)
+            ),
+            default=Value(0),
+        ),
+    )
@@ -0,0 +1,381 @@
+"""
+Benchmarks of the game services and API endpoints.
+
+They aren't collected with the tests, run them explicitly:
+
+    ./manage.py test jankenfw.game.test.benchmarks
+
+Each benchmark is run for datasets of the sizes in 'BENCHMARK_SIZES'
+(default '10,100,1000') seeded with the factories, and reports the number of
+queries, the p50/p95 latency and the p50 CPU time of the timed call. The query counts are fixed
+by the code, so they are asserted against a budget and a regression fails the
+benchmark. The latency depends on the machine, set 'BENCHMARK_JSON' to a file
+to write the results there and compare them between runs.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from jankenfw.game import services
+from jankenfw.game.engine import LiveGame
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.management.commands.simulate_games import QueryCounter, percentile
+from jankenfw.game.models import Game, Move, Player, PlayerStats
+from jankenfw.game.serializers import (
+    GameSerializer,
+    PlayerHighScoreSerializer,
+    game_values,
+    high_score_values,
+)
+from jankenfw.game.test.factories import (
+    GameFactory,
+    GameRoundFactory,
+    MoveFactory,
+    PlayerFactory,
+)
+from jankenfw.users.test.factories import UserFactory
+from libs.renderers import ORJSONRenderer
+
+SIZES = [int(size) for size in os.getenv("BENCHMARK_SIZES", "10,100,1000").split(",")]
+ITERATIONS = int(os.getenv("BENCHMARK_ITERATIONS", "20"))
+
+
+class BenchmarkTestCase(TestCase):
+    """
+    Collect the measurements of the benchmarks and report them after the class.
+    """
+
+    results: List[Dict] = []
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for result in cls.results:
+            print(
+                f"\n{result['name']:>24} size={result['size']:<6}"
+                f" queries={result['queries']:<4}"
+                f" p50={result['p50_ms']:.3f}ms p95={result['p95_ms']:.3f}ms"
+                f" cpu={result['cpu_p50_ms']:.3f}ms",
+                end="",
+            )
+        print()
+
+        path = os.getenv("BENCHMARK_JSON")
+        if path:
+            existing = []
+            if os.path.exists(path):
+                with open(path) as benchmark_file:
+                    existing = json.load(benchmark_file)
+            with open(path, "w") as benchmark_file:
+                json.dump(existing + cls.results, benchmark_file, indent=2)
+
+    def measure(
+        self,
+        name: str,
+        size: int,
+        call: Callable,
+        set_up: Optional[Callable] = None,
+        max_queries: Optional[int] = None,
+    ) -> Dict:
+        """
+        Time the call 'ITERATIONS' times and count the queries of each call.
+
+        'set_up' runs before every call, out of the measurement, and its return
+        value is passed to the call.
+        """
+
+        latencies, cpu_times, queries = [], [], []
+        for _ in range(ITERATIONS):
+            argument = set_up() if set_up else None
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started, cpu_started = time.perf_counter(), time.process_time()
+                call(argument) if set_up else call()
+                latencies.append(time.perf_counter() - started)
+                cpu_times.append(time.process_time() - cpu_started)
+            queries.append(counter.count)
+
+        result = {
+            "name": name,
+            "size": size,
+            "iterations": ITERATIONS,
+            "queries": max(queries),
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "cpu_p50_ms": percentile(cpu_times, 50) * 1000,
+        }
+        self.results.append(result)
+
+        if max_queries is not None:
+            self.assertLessEqual(
+                result["queries"], max_queries, f"{name} runs too many queries."
+            )
+        return result
+
+    @contextmanager
+    def dataset(self, size: int) -> Iterator[List[Player]]:
+        """
+        Seed a dataset of the size and roll it back when the block exits, so every
+        size starts from an empty database.
+        """
+
+        with self.subTest(size=size), transaction.atomic():
+            yield self.seed(size)
+            transaction.set_rollback(True)
+
+    def seed(self, size: int) -> List[Player]:
+        """
+        Create players with their statistics and finished games of two players
+        with a round and moves.
+        """
+
+        players = PlayerFactory.create_batch(size)
+        for index in range(size):
+            first, second = players[index], players[(index + 1) % size]
+            game = GameFactory(status=GameStatusChoices.FINISHED, next_move=None)
+            game.player.add(first, second)
+            game_round = GameRoundFactory(game=game, winner=first)
+            for player in (first, second):
+                MoveFactory(game=game, game_round=game_round, player=player)
+        Player.objects.filter(pk__in=[player.pk for player in players[::2]]).update(
+            games_won=1
+        )
+        PlayerStats.objects.bulk_create(
+            [PlayerStats(player=player, rounds_played=2) for player in players]
+        )
+        return players
+
+    def new_game(
+        self, players: List[Player], status: int = GameStatusChoices.IN_PROGRESS
+    ) -> Game:
+        game = GameFactory(status=status, next_move=None, rounds=3)
+        game.current_round = GameRoundFactory(game=game)
+        game.save()
+        if status == GameStatusChoices.IN_PROGRESS:
+            game.player.add(*players)
+        return game
+
+
+class EngineBenchmark(BenchmarkTestCase):
+    """
+    Play whole games of 3 rounds on the game engine, without the database, size
+    games are played by a single call.
+    """
+
+    def test_moves(self):
+        moves = [int(move) for move in MoveChoices.values]
+
+        def play(count):
+            for index in range(count // 6):
+                game = LiveGame(rounds=3)
+                game.join(0)
+                game.join(1)
+                for round_number in range(3):
+                    game.move(0, moves[(index + round_number) % 5])
+                    game.move(1, moves[(index + 2 * round_number) % 5])
+
+        for size in SIZES:
+            count = size * 6
+            with self.subTest(size=size):
+                result = self.measure("LiveGame", size, lambda: play(count))
+                result["moves_per_second"] = count / result["p50_ms"] * 1000
+
+
+class ServiceBenchmark(BenchmarkTestCase):
+    def test_do_move(self):
+        for size in SIZES:
+            with self.dataset(size) as seeded:
+                players = seeded[:2]
+
+                def first_move():
+                    return self.new_game(players)
+
+                def second_move():
+                    game = self.new_game(players)
+                    services.do_move(game, MoveChoices.Rock, players[0])
+                    return game
+
+                self.measure(
+                    "do_move",
+                    size,
+                    lambda game: services.do_move(game, MoveChoices.Rock, players[0]),
+                    set_up=first_move,
+                    max_queries=6,
+                )
+                self.measure(
+                    "do_move resolving",
+                    size,
+                    lambda game: services.do_move(game, MoveChoices.Paper, players[1]),
+                    set_up=second_move,
+                    max_queries=10,
+                )
+
+    def test_get_current_round(self):
+        for size in SIZES:
+            with self.dataset(size) as seeded:
+                players = seeded[:2]
+                game = Game.objects.select_related("current_round").get(
+                    pk=self.new_game(players).pk
+                )
+
+                self.measure(
+                    "_get_current_round",
+                    size,
+                    lambda: services._get_current_round(game),
+                    max_queries=0,
+                )
+
+    def test_findout_winner(self):
+        for size in SIZES:
+            with self.dataset(size) as seeded:
+                players = seeded[:2]
+
+                def set_up():
+                    game = self.new_game(players)
+                    game_round = game.current_round
+                    moves = [
+                        Move.objects.create(
+                            game=game, game_round=game_round, player=player, move=move
+                        )
+                        for player, move in zip(
+                            players, (MoveChoices.Rock, MoveChoices.Scissors)
+                        )
+                    ]
+                    game_round.move_count = 2
+                    return game, game_round, moves
+
+                self.measure(
+                    "_findout_winner",
+                    size,
+                    lambda arguments: services._findout_winner(*arguments),
+                    set_up=set_up,
+                    max_queries=4,
+                )
+
+    def test_join_game(self):
+        for size in SIZES:
+            with self.dataset(size) as seeded:
+                player = seeded[0]
+
+                self.measure(
+                    "join_game",
+                    size,
+                    lambda game: services.join_game(game, player),
+                    set_up=lambda: self.new_game(
+                        [], status=GameStatusChoices.WAITING_FOR_PLAYER
+                    ),
+                    max_queries=6,
+                )
+
+
+class APIBenchmark(BenchmarkTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = UserFactory()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+
+    def test_high_score_list(self):
+        for size in SIZES:
+            with self.dataset(size):
+                self.measure(
+                    "HighScoreAPI.list",
+                    size,
+                    lambda: self.client.get(reverse("player-list")),
+                    max_queries=2,
+                )
+
+    def test_game_list(self):
+        for size in SIZES:
+            with self.dataset(size):
+                self.measure(
+                    "GameViewSet.list",
+                    size,
+                    lambda: self.client.get(reverse("game-list")),
+                    max_queries=3,
+                )
+                self.measure(
+                    "GameViewSet.list embedded",
+                    size,
+                    lambda: self.client.get(
+                        reverse("game-list"), {"embed": "true", "page_size": 100}
+                    ),
+                    max_queries=4,
+                )
+
+    def test_player_stats(self):
+        for size in SIZES:
+            with self.dataset(size) as seeded:
+                url = reverse("players-stats", kwargs={"pk": seeded[0].id})
+                self.measure(
+                    "PlayerViewSet.stats",
+                    size,
+                    lambda: self.client.get(url),
+                    max_queries=3,
+                )
+
+
+class SerializationBenchmark(BenchmarkTestCase):
+    """
+    Compare the model serializers and JSONRenderer with the values serializers and
+    ORJSONRenderer used by the list and retrieve endpoints, for a page of 100 rows.
+    """
+
+    def test_games(self):
+        for size in SIZES:
+            with self.dataset(size):
+                games = Game.objects.order_by("-created_at", "-id")
+                self.measure(
+                    "GameSerializer",
+                    size,
+                    lambda: JSONRenderer().render(
+                        GameSerializer(
+                            games.prefetch_related(
+                                Prefetch("player", Player.objects.order_by("id"))
+                            )[:100],
+                            many=True,
+                        ).data
+                    ),
+                )
+                self.measure(
+                    "game_values",
+                    size,
+                    lambda: ORJSONRenderer().render(
+                        game_values.many(game_values.values(games)[:100])
+                    ),
+                )
+
+    def test_high_scores(self):
+        for size in SIZES:
+            with self.dataset(size):
+                players = Player.objects.order_by("-games_won", "id")
+                self.measure(
+                    "PlayerHighScoreSerializer",
+                    size,
+                    lambda: JSONRenderer().render(
+                        PlayerHighScoreSerializer(
+                            players.select_related("user")[:100], many=True
+                        ).data
+                    ),
+                )
+                self.measure(
+                    "high_score_values",
+                    size,
+                    lambda: ORJSONRenderer().render(
+                        high_score_values.many(high_score_values.values(players)[:100])
+                    ),
+                )
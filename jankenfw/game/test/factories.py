@@ -2,7 +2,7 @@ from factory.django import DjangoModelFactory
 import factory
 
 from jankenfw.game.enum import GameStatusChoices, MoveChoices
-from jankenfw.game.models import Game, Player, GameRound, Move
+from jankenfw.game.models import Game, Player, GameRound, Move, Tournament
 from jankenfw.users.test.factories import UserFactory
 
 
@@ -36,3 +36,10 @@ class MoveFactory(DjangoModelFactory):
     move = factory.Iterator(MoveChoices.values)
     player = factory.SubFactory(PlayerFactory)
     game_round = factory.SubFactory(GameRoundFactory)
+
+
+class TournamentFactory(DjangoModelFactory):
+    class Meta:
+        model = Tournament
+
+    name = factory.Sequence(lambda n: f"Tournament {n}")
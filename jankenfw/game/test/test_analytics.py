@@ -0,0 +1,170 @@
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from jankenfw.game.analytics import (
+    MoveColumns,
+    analytics,
+    compute,
+    load_archived_moves,
+    load_moves,
+)
+from jankenfw.game.archive import MoveArchive, archive_batch
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.models import Move
+from jankenfw.game.test.factories import GameFactory, GameRoundFactory, PlayerFactory
+from jankenfw.users.test.factories import UserFactory
+
+ROCK, PAPER, SCISSORS = MoveChoices.Rock, MoveChoices.Paper, MoveChoices.Scissors
+
+
+def create_game(players, results):
+    """
+    Create a finished game of the players with a round for every (moves, winner).
+    """
+
+    game = GameFactory(status=GameStatusChoices.FINISHED, rounds=len(results))
+    game.player.add(*players)
+    for round_number, (moves, winner) in enumerate(results, 1):
+        game_round = GameRoundFactory(
+            game=game, round_number=round_number, move_count=2, winner=winner
+        )
+        for player, move in zip(players, moves):
+            Move.objects.create(
+                game=game, game_round=game_round, player=player, move=move
+            )
+    return game
+
+
+class AnalyticsTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.addCleanup(analytics.clear)
+
+        first, second, third = PlayerFactory(), PlayerFactory(), PlayerFactory()
+        create_game(
+            [first, second],
+            [
+                ((ROCK, SCISSORS), first),
+                ((ROCK, PAPER), second),
+                ((PAPER, PAPER), None),
+            ],
+        )
+        archived = create_game(
+            [first, third], [((SCISSORS, ROCK), third), ((ROCK, ROCK), None)]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            archive_batch([archived.id], self.directory)
+
+    def columns(self):
+        return MoveColumns.concatenate(
+            (load_moves(), load_archived_moves(MoveArchive(self.directory)))
+        )
+
+    def test_load_moves(self):
+        with self.assertNumQueries(1):
+            columns = load_moves()
+
+        self.assertEqual(len(columns), 6)
+        self.assertEqual(sorted(columns.result.tolist()), [-1, -1, 0, 0, 1, 1])
+        self.assertEqual(len(set(columns.player.tolist())), 2)
+        self.assertEqual(set(columns.game.tolist()), {0})
+
+    def test_load_archived_moves(self):
+        columns = load_archived_moves(MoveArchive(self.directory))
+
+        self.assertEqual(columns.move.tolist(), [SCISSORS, ROCK, ROCK, ROCK])
+        self.assertEqual(columns.result.tolist(), [-1, 1, 0, 0])
+        self.assertEqual(columns.round.tolist(), [1, 1, 2, 2])
+
+    def test_compute(self):
+        report = compute(self.columns())
+
+        self.assertEqual(report["moves"], 10)
+        self.assertEqual(report["rounds"], 5)
+        self.assertEqual(report["rounds_tied"], 2)
+        self.assertEqual(report["tie_rate"], 0.4)
+        self.assertEqual(
+            report["move_counts"],
+            {"rock": 5, "paper": 3, "scissors": 2, "lizard": 0, "spock": 0},
+        )
+        self.assertEqual(report["move_frequencies"]["rock"], 0.5)
+        after_win = report["transitions"]["after_win"]
+        self.assertEqual(after_win["rock"]["rock"], 2)
+        self.assertEqual(after_win["paper"]["paper"], 1)
+        after_loss = report["transitions"]["after_loss"]
+        self.assertEqual(after_loss["rock"]["paper"], 1)
+        self.assertEqual(
+            after_loss["scissors"],
+            {"rock": 1, "paper": 1, "scissors": 0, "lizard": 0, "spock": 0},
+        )
+        self.assertEqual(
+            report["repeat_rates"],
+            {"after_win": 1.0, "after_tie": None, "after_loss": 0.0},
+        )
+
+    def test_compute__no_moves(self):
+        report = compute(MoveColumns([], [], [], [], []))
+
+        self.assertEqual(report["moves"], 0)
+        self.assertIsNone(report["tie_rate"])
+        self.assertIsNone(report["repeat_rates"]["after_win"])
+
+    def test_report__cached(self):
+        with override_settings(GAME_ARCHIVE_DIR=self.directory):
+            with self.assertNumQueries(1):
+                report = analytics.report()
+            with self.assertNumQueries(0):
+                self.assertIs(analytics.report(), report)
+
+            with override_settings(ANALYTICS_TTL=-1), self.assertNumQueries(1):
+                self.assertIsNot(analytics.report(), report)
+
+        self.assertEqual(report["moves"], 10)
+
+    def test_report__expired_while_refreshing(self):
+        with override_settings(GAME_ARCHIVE_DIR=self.directory):
+            report = analytics.report()
+
+        # Another request is computing the report again
+        with analytics._refresh_lock, override_settings(
+            ANALYTICS_TTL=-1
+        ), self.assertNumQueries(0):
+            self.assertIs(analytics.report(), report)
+
+
+class AnalyticsAPITestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse("analytics-list")
+        self.addCleanup(analytics.clear)
+        first, second = PlayerFactory(), PlayerFactory()
+        create_game([first, second], [((ROCK, PAPER), second)])
+
+    def test_analytics(self):
+        admin = UserFactory(is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {admin.auth_token}")
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            GAME_ARCHIVE_DIR=directory
+        ):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["moves"], 2)
+        self.assertEqual(response.data["tie_rate"], 0.0)
+        self.assertIn("computed_at", response.data)
+
+    def test_analytics__staff_only(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {UserFactory().auth_token}")
+
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
+        self.assertEqual(
+            self.client.post(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
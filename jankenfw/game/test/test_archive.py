@@ -0,0 +1,229 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jankenfw.game.archive import (
+    PENDING_SUFFIX,
+    MoveArchive,
+    archive_batch,
+    archive_games,
+    recover_segments,
+)
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.models import Game, GameRound, Matchup, Move, PlayerStats
+from jankenfw.game.state import get_game_state, get_game_state_cache
+from jankenfw.game.test.factories import GameFactory, GameRoundFactory, PlayerFactory
+
+
+def create_game(players, results, status=GameStatusChoices.FINISHED):
+    """
+    Create a game of the players with a round for every (moves, winner) result.
+    """
+
+    game = GameFactory(status=status, rounds=len(results))
+    game.player.add(*players)
+    wins = [sum(winner is player for _, winner in results) for player in players]
+    if wins[0] != wins[1]:
+        game.winner = players[0 if wins[0] > wins[1] else 1]
+        game.save(update_fields=["winner"])
+    for round_number, (moves, winner) in enumerate(results, 1):
+        game_round = GameRoundFactory(
+            game=game, round_number=round_number, move_count=2, winner=winner
+        )
+        for player, move in zip(players, moves):
+            Move.objects.create(
+                game=game, game_round=game_round, player=player, move=move
+            )
+    return game
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.players = [PlayerFactory(), PlayerFactory(), PlayerFactory()]
+
+    def archive(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return archive_games(
+                timezone.now() + timedelta(seconds=1),
+                directory=self.directory,
+                **kwargs,
+            )
+
+    def test_archive_games(self):
+        first, second, third = self.players
+        rock, paper, scissors = (
+            MoveChoices.Rock,
+            MoveChoices.Paper,
+            MoveChoices.Scissors,
+        )
+        game = create_game(
+            [first, second],
+            [((rock, scissors), first), ((paper, paper), None)],
+        )
+        create_game([first, third], [((scissors, rock), third)])
+        playing = create_game(
+            [second, third],
+            [((rock, paper), third)],
+            status=GameStatusChoices.IN_PROGRESS,
+        )
+
+        report = self.archive(batch_size=1)
+
+        self.assertEqual(report, {"segments": 2, "games": 2, "moves": 6})
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        # Only the rows of the game being played are left
+        self.assertEqual(
+            set(Move.objects.values_list("game_id", flat=True)), {playing.id}
+        )
+        self.assertEqual(
+            set(GameRound.objects.values_list("game_id", flat=True)), {playing.id}
+        )
+        game.refresh_from_db()
+        self.assertIsNotNone(game.archived_at)
+        self.assertIsNone(game.current_round_id)
+        self.assertEqual(game.winner_id, first.id)
+
+        # Archived games aren't archived again
+        self.assertEqual(self.archive()["games"], 0)
+
+        archive = MoveArchive(self.directory)
+        self.assertEqual(len(archive), 6)
+        self.assertEqual(archive.move_counts().tolist(), [0, 2, 2, 2, 0, 0])
+        self.assertEqual(
+            archive.game_rounds([game.id, playing.id]),
+            {
+                game.id: [
+                    (1, [(first.id, rock), (second.id, scissors)], first.id),
+                    (2, [(first.id, paper), (second.id, paper)], None),
+                ]
+            },
+        )
+        self.assertEqual(sorted(archive.player_moves(first.id, 10)), [1, 2, 3])
+        self.assertEqual(len(archive.player_moves(first.id, 2)), 2)
+        self.assertEqual(archive.player_moves(PlayerFactory().id, 10), [])
+
+    def test_segment_columns(self):
+        first, second, _ = self.players
+        create_game(
+            [first, second],
+            [
+                ((MoveChoices.Rock, MoveChoices.Paper), second),
+                ((MoveChoices.Rock, MoveChoices.Rock), None),
+            ],
+        )
+
+        self.archive()
+
+        (segment,) = MoveArchive(self.directory).segments
+        self.assertIsInstance(segment["move"], np.memmap)
+        self.assertEqual(segment["move"].dtype, np.int8)
+        self.assertEqual(segment.player_ids(), [first.id, second.id])
+        self.assertEqual(segment["move_round"].tolist(), [1, 1, 2, 2])
+        self.assertEqual(segment["move_result"].tolist(), [-1, 1, 0, 0])
+        self.assertEqual(segment["game_winner"].tolist(), [1])
+        self.assertEqual(
+            list(segment.rounds()),
+            [
+                ([(first.id, 1), (second.id, 2)], second.id),
+                ([(first.id, 1), (second.id, 1)], None),
+            ],
+        )
+        self.assertEqual(
+            list(segment.games()), [([first.id, second.id], [0, 1], second.id)]
+        )
+
+    def test_archive_games__new_version(self):
+        first, second, _ = self.players
+        game = create_game(
+            [first, second], [((MoveChoices.Rock, MoveChoices.Paper), second)]
+        )
+        get_game_state(game.id)
+
+        self.archive()
+
+        archived = Game.objects.get(pk=game.id)
+        self.assertEqual(archived.version, game.version + 1)
+        self.assertGreater(archived.updated_at, game.updated_at)
+        self.assertIsNone(get_game_state_cache().get(game.id))
+
+    def test_archive_games__not_committed(self):
+        first, second, _ = self.players
+        game = create_game(
+            [first, second], [((MoveChoices.Rock, MoveChoices.Paper), second)]
+        )
+
+        # The segment keeps its pending name until the transaction commits
+        archive_batch([game.id], self.directory)
+
+        (name,) = os.listdir(self.directory)
+        self.assertTrue(name.endswith(PENDING_SUFFIX))
+        self.assertEqual(MoveArchive(self.directory).segments, [])
+
+    def test_recover_segments(self):
+        first, second, _ = self.players
+        game = create_game(
+            [first, second], [((MoveChoices.Rock, MoveChoices.Paper), second)]
+        )
+        archive_batch([game.id], self.directory)
+        (name,) = os.listdir(self.directory)
+
+        # The games of the segment were archived
+        recover_segments(self.directory)
+        self.assertEqual(os.listdir(self.directory), [name[: -len(PENDING_SUFFIX)]])
+
+        # The games of the segment weren't archived
+        os.rename(
+            os.path.join(self.directory, name[: -len(PENDING_SUFFIX)]),
+            os.path.join(self.directory, name),
+        )
+        Game.objects.update(archived_at=None)
+        recover_segments(self.directory)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_archive_games_command(self):
+        first, second, _ = self.players
+        create_game([first, second], [((MoveChoices.Rock, MoveChoices.Paper), second)])
+        out = StringIO()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "archive_games",
+                older_than_days=0,
+                directory=self.directory,
+                stdout=out,
+            )
+
+        self.assertEqual(
+            out.getvalue(), "Archived 1 games with 2 moves in 1 segments.\n"
+        )
+        self.assertFalse(Move.objects.exists())
+
+    def test_rebuild_player_stats(self):
+        call_command("simulate_games", games=3, rounds=3, keep=True, stdout=StringIO())
+        columns = ("player_id", "rounds_played", "rounds_won", "rounds_tied", "rock")
+        stats = sorted(PlayerStats.objects.values_list(*columns))
+        matchups = sorted(
+            Matchup.objects.values_list("player_id", "opponent_id", "rounds_won")
+        )
+        self.archive(batch_size=2)
+        self.assertFalse(Move.objects.exists())
+
+        with override_settings(GAME_ARCHIVE_DIR=self.directory):
+            call_command("rebuild_player_stats", stdout=StringIO())
+
+        self.assertEqual(sorted(PlayerStats.objects.values_list(*columns)), stats)
+        self.assertEqual(
+            sorted(
+                Matchup.objects.values_list("player_id", "opponent_id", "rounds_won")
+            ),
+            matchups,
+        )
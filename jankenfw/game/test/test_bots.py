@@ -0,0 +1,192 @@
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from jankenfw.game.bots import (
+    COUNTERS,
+    MOVES,
+    BotMemory,
+    FrequencyStrategy,
+    MarkovStrategy,
+    OpponentHistory,
+    RandomStrategy,
+    get_bot_memory,
+    get_bot_player,
+    load_history,
+)
+from jankenfw.game.archive import archive_batch
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.models import Game, Move
+from jankenfw.game.services import do_move, join_game
+from jankenfw.game.state import get_game_state_cache
+from jankenfw.game.test.factories import GameFactory, GameRoundFactory, PlayerFactory
+from jankenfw.users.test.factories import UserFactory
+
+ROCK, PAPER, SCISSORS = MoveChoices.Rock, MoveChoices.Paper, MoveChoices.Scissors
+
+
+class OpponentHistoryTestCase(TestCase):
+    def test_history(self):
+        history = OpponentHistory([ROCK, PAPER, ROCK, PAPER, ROCK])
+
+        self.assertEqual(history.counts[ROCK], 3)
+        self.assertEqual(history.last, ROCK)
+        self.assertEqual(history.most_common(), ROCK)
+        self.assertEqual(history.most_common(after=ROCK), PAPER)
+        self.assertIsNone(history.most_common(after=MoveChoices.Spock))
+        self.assertIsNone(OpponentHistory().most_common())
+
+    def test_strategies(self):
+        history = OpponentHistory([ROCK, PAPER, ROCK, PAPER, ROCK])
+
+        self.assertIn(RandomStrategy().choose(history), MOVES)
+        self.assertIn(FrequencyStrategy().choose(history), COUNTERS[ROCK])
+        self.assertIn(MarkovStrategy().choose(history), COUNTERS[PAPER])
+        # Without a history the moves are random
+        self.assertIn(MarkovStrategy().choose(OpponentHistory()), MOVES)
+
+
+class BotMemoryTestCase(TestCase):
+    def test_choose(self):
+        opponent = PlayerFactory()
+        for move in (PAPER, PAPER, ROCK):
+            game_round = GameRoundFactory(move_count=2)
+            Move.objects.create(
+                game=game_round.game, game_round=game_round, player=opponent, move=move
+            )
+        # Moves of unfinished rounds aren't loaded
+        Move.objects.create(
+            game=game_round.game,
+            game_round=GameRoundFactory(game=game_round.game, round_number=2),
+            player=opponent,
+            move=ROCK,
+        )
+        memory = BotMemory()
+
+        with self.assertNumQueries(1):
+            move = memory.choose(FrequencyStrategy(), opponent.id, ROCK)
+
+        self.assertIn(move, COUNTERS[PAPER])
+
+        # The answered moves are recorded afterwards, without queries
+        with self.assertNumQueries(0):
+            memory.choose(FrequencyStrategy(), opponent.id, ROCK)
+            move = memory.choose(FrequencyStrategy(), opponent.id, ROCK)
+
+        self.assertIn(move, COUNTERS[ROCK])
+
+    def test_load_history__archived(self):
+        opponent = PlayerFactory()
+        game = GameFactory(status=GameStatusChoices.FINISHED)
+        for round_number, move in enumerate((PAPER, SCISSORS), 1):
+            game_round = GameRoundFactory(
+                game=game, round_number=round_number, move_count=2
+            )
+            Move.objects.create(
+                game=game, game_round=game_round, player=opponent, move=move
+            )
+        game_round = GameRoundFactory(move_count=2)
+        Move.objects.create(
+            game=game_round.game, game_round=game_round, player=opponent, move=ROCK
+        )
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            GAME_ARCHIVE_DIR=directory
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                archive_batch([game.id], directory)
+
+            with override_settings(GAME_BOT_HISTORY=3):
+                self.assertEqual(load_history(opponent.id), [PAPER, SCISSORS, ROCK])
+            with override_settings(GAME_BOT_HISTORY=2):
+                self.assertEqual(load_history(opponent.id), [SCISSORS, ROCK])
+
+    @override_settings(GAME_BOT_MEMORY_SIZE=1)
+    def test_choose__evicts(self):
+        memory = BotMemory()
+        one, two = PlayerFactory(), PlayerFactory()
+        memory.choose(RandomStrategy(), one.id, ROCK)
+        memory.choose(RandomStrategy(), two.id, ROCK)
+
+        with self.assertNumQueries(1):
+            memory.choose(RandomStrategy(), one.id, ROCK)
+
+
+@override_settings(GAME_BOT_WORKERS=0)
+class BotGameTestCase(TestCase):
+    def setUp(self):
+        get_game_state_cache().clear()
+        get_bot_memory().clear()
+        self.player = PlayerFactory()
+        self.bot = get_bot_player("markov")
+        self.game = GameFactory(
+            status=GameStatusChoices.WAITING_FOR_PLAYER, next_move=None, rounds=2
+        )
+        self.game.current_round = GameRoundFactory(game=self.game, round_number=1)
+        self.game.save()
+        join_game(self.game, self.player)
+        join_game(self.game, self.bot)
+
+    def test_get_bot_player(self):
+        self.assertEqual(get_bot_player("markov"), self.bot)
+        self.assertIsNone(self.bot.user)
+        self.assertEqual(str(self.bot), "markov bot")
+
+    def test_bot_answers_moves(self):
+        for round_number in (1, 2):
+            with self.captureOnCommitCallbacks(execute=True):
+                do_move(self.game, ROCK, self.player)
+
+            self.assertEqual(
+                Move.objects.filter(
+                    game_round__round_number=round_number, player=self.bot
+                ).count(),
+                1,
+            )
+
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.status, GameStatusChoices.FINISHED)
+        self.assertEqual(self.bot.game_set.get(), self.game)
+
+        # The bot saw the moves of its opponent after answering them
+        history = OpponentHistory([ROCK, ROCK])
+        self.assertEqual(
+            get_bot_memory()._histories[self.player.id].counts, history.counts
+        )
+
+    @override_settings(GAME_BOT_WORKERS=2)
+    def test_bot_moves_off_the_request(self):
+        with mock.patch("jankenfw.game.bots.get_bot_pool") as get_bot_pool:
+            # Same queries as a move against a human player
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(6):
+                    do_move(self.game, ROCK, self.player)
+
+        get_bot_pool.return_value.submit.assert_called_once()
+        self.assertFalse(Move.objects.filter(player=self.bot).exists())
+
+
+class GameViewSetBotTestCase(APITestCase):
+    def setUp(self):
+        user = UserFactory()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+        self.game = GameFactory(status=GameStatusChoices.WAITING_FOR_PLAYER)
+        self.game.player.add(PlayerFactory(user=user))
+
+    def test_bot(self):
+        url = reverse("game-bot", kwargs={"pk": self.game.pk})
+        response = self.client.post(url, {"strategy": "frequency"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], GameStatusChoices.IN_PROGRESS)
+        self.assertTrue(Game.objects.filter(player__bot="frequency").exists())
+
+    def test_bot__unknown_strategy(self):
+        url = reverse("game-bot", kwargs={"pk": self.game.pk})
+        response = self.client.post(url, {"strategy": "oracle"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,61 @@
+from itertools import combinations
+from unittest import TestCase
+
+from jankenfw.game.brackets import (
+    elimination_pairs,
+    elimination_stages,
+    round_robin_pairs,
+    round_robin_stages,
+)
+
+
+class EliminationTestCase(TestCase):
+    def test_elimination_pairs(self):
+        self.assertEqual(elimination_pairs("abcd"), ([("a", "b"), ("c", "d")], None))
+        self.assertEqual(elimination_pairs("abcde"), ([("a", "b"), ("c", "d")], "e"))
+        self.assertEqual(elimination_pairs("a"), ([], "a"))
+
+    def test_elimination_stages(self):
+        self.assertEqual(elimination_stages(2), 1)
+        self.assertEqual(elimination_stages(5), 3)
+        self.assertEqual(elimination_stages(1024), 10)
+        self.assertEqual(elimination_stages(1025), 11)
+
+    def test_elimination_stages__brackets(self):
+        for players in range(2, 70):
+            entrants, stages = list(range(players)), 0
+            while len(entrants) > 1:
+                pairs, bye = elimination_pairs(entrants)
+                entrants = [first for first, _ in pairs]
+                if bye is not None:
+                    entrants.insert(0, bye)
+                stages += 1
+
+            self.assertEqual(stages, elimination_stages(players))
+
+
+class RoundRobinTestCase(TestCase):
+    def test_round_robin_stages(self):
+        self.assertEqual(round_robin_stages(1), 0)
+        self.assertEqual(round_robin_stages(4), 3)
+        self.assertEqual(round_robin_stages(5), 5)
+
+    def test_round_robin_pairs(self):
+        for players in range(2, 12):
+            pairs, byes = [], []
+            for stage in range(1, round_robin_stages(players) + 1):
+                stage_pairs, bye = round_robin_pairs(range(players), stage)
+                played = [player for pair in stage_pairs for player in pair]
+                if bye is not None:
+                    played.append(bye)
+                    byes.append(bye)
+
+                # Every player plays or has a bye once in a stage
+                self.assertEqual(sorted(played), list(range(players)))
+                pairs.extend(frozenset(pair) for pair in stage_pairs)
+
+            self.assertEqual(
+                sorted(pairs, key=sorted),
+                sorted(map(frozenset, combinations(range(players), 2)), key=sorted),
+            )
+            self.assertEqual(len(set(byes)), len(byes))
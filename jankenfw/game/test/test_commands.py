@@ -0,0 +1,196 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import TestCase
+
+from jankenfw.game.enum import GameStatusChoices
+from jankenfw.game.models import Game, Matchup, Move, Player, PlayerStats, Tournament
+from jankenfw.game.test.factories import GameFactory
+
+
+class ExplainQueriesTestCase(TestCase):
+    def test_explain_queries(self):
+        out = StringIO()
+        call_command("explain_queries", seed_moves=40, rounds=2, players=4, stdout=out)
+
+        self.assertIn("Seeded 10/10 games.", out.getvalue())
+        self.assertIn("Move(game_round=...)", out.getvalue())
+        self.assertIn("Player.order_by('-games_won')", out.getvalue())
+        self.assertIn("Game page after a cursor", out.getvalue())
+        # The seeded rows are rolled back
+        self.assertFalse(Game.objects.exists())
+        self.assertFalse(Player.objects.exists())
+
+    def test_explain_queries__without_indexes(self):
+        out = StringIO()
+        call_command(
+            "explain_queries",
+            seed_moves=8,
+            rounds=2,
+            players=2,
+            without_indexes=True,
+            stdout=out,
+        )
+
+        self.assertIn("Without the indexes game_created_at_desc", out.getvalue())
+        self.assertEqual(out.getvalue().count("Move(game_round=...)"), 2)
+        # The dropped indexes are restored by the rollback
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Game._meta.db_table
+            )
+        self.assertIn("game_created_at_desc", constraints)
+
+    def test_explain_queries__no_data(self):
+        err = StringIO()
+        call_command("explain_queries", stdout=StringIO(), stderr=err)
+
+        self.assertIn("No data to explain", err.getvalue())
+
+
+class BenchmarkIdsTestCase(TestCase):
+    def test_benchmark_ids(self):
+        out = StringIO()
+        call_command("benchmark_ids", rows=30, batch_size=20, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report["rows"], 30)
+        self.assertGreater(report["libs.ids.uuid7"]["rows_per_second"], 0)
+        self.assertGreater(report["uuid.uuid4"]["rows_per_second"], 0)
+        # The inserted rows are rolled back
+        self.assertFalse(Move.objects.exists())
+
+    def test_benchmark_ids__unknown_generator(self):
+        with self.assertRaisesMessage(CommandError, "Unknown id generator"):
+            call_command("benchmark_ids", rows=1, generators="uuid.nope")
+
+
+class RebuildPlayerStatsTestCase(TestCase):
+    def test_rebuild_player_stats(self):
+        call_command("simulate_games", games=3, rounds=3, keep=True, stdout=StringIO())
+        columns = ("player_id", "rounds_played", "rounds_won", "rounds_tied", "rock")
+        stats = sorted(PlayerStats.objects.values_list(*columns))
+        matchups = sorted(
+            Matchup.objects.values_list("player_id", "opponent_id", "rounds_won")
+        )
+        PlayerStats.objects.update(rounds_played=0)
+        Matchup.objects.all().delete()
+        out = StringIO()
+
+        call_command("rebuild_player_stats", batch_size=2, stdout=out)
+
+        self.assertEqual(sorted(PlayerStats.objects.values_list(*columns)), stats)
+        self.assertEqual(
+            sorted(
+                Matchup.objects.values_list("player_id", "opponent_id", "rounds_won")
+            ),
+            matchups,
+        )
+        self.assertEqual(
+            out.getvalue(), "Rebuilt the statistics of 6 players and 6 matchups.\n"
+        )
+
+
+class SimulateGamesTestCase(TestCase):
+    def test_simulate_games(self):
+        out = StringIO()
+        call_command(
+            "simulate_games",
+            games=3,
+            rounds=2,
+            moves="1,2",
+            json=True,
+            keep=True,
+            stdout=out,
+        )
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report["moves"], 12)
+        self.assertEqual(report["tie_rate"], 0)
+        self.assertGreater(report["moves_per_second"], 0)
+        self.assertGreater(report["queries_per_move"], 0)
+        self.assertEqual(
+            Game.objects.filter(status=GameStatusChoices.FINISHED).count(), 3
+        )
+        self.assertEqual(
+            sorted(Player.objects.values_list("games_won", flat=True)),
+            [0, 0, 0, 1, 1, 1],
+        )
+
+    def test_simulate_games__random_moves(self):
+        out = StringIO()
+        call_command("simulate_games", games=2, rounds=3, seed=1, stdout=out)
+
+        self.assertIn("moves: 12", out.getvalue())
+        # The simulated rows are rolled back
+        self.assertFalse(Move.objects.exists())
+        self.assertFalse(Player.objects.exists())
+
+    def test_simulate_games__workers_need_keep(self):
+        with self.assertRaises(CommandError):
+            call_command("simulate_games", games=2, workers=2, stdout=StringIO())
+
+    def test_simulate_games__invalid_moves(self):
+        with self.assertRaises(CommandError):
+            call_command("simulate_games", games=1, moves="1,9", stdout=StringIO())
+
+
+class SimulateTournamentTestCase(TestCase):
+    def test_simulate_tournament(self):
+        out = StringIO()
+        call_command("simulate_tournament", players=9, seed=1, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+
+        tournament = Tournament.objects.get()
+        self.assertEqual(tournament.status, GameStatusChoices.FINISHED)
+        self.assertEqual(report["winner"], str(tournament.winner_id))
+        self.assertEqual(report["stages"], 4)
+        # Every tied game is replayed in another wave
+        self.assertEqual(report["games"], Game.objects.count())
+        self.assertEqual(
+            report["games"] - 8, Game.objects.filter(winner__isnull=True).count()
+        )
+        self.assertGreaterEqual(report["waves"], report["stages"])
+
+    def test_simulate_tournament__round_robin(self):
+        out = StringIO()
+        call_command(
+            "simulate_tournament",
+            players=4,
+            rounds=3,
+            format="round-robin",
+            seed=1,
+            stdout=out,
+        )
+
+        self.assertIn("games_per_second", out.getvalue())
+        self.assertEqual(Game.objects.count(), 6)
+        self.assertEqual(Move.objects.count(), 36)
+
+
+class ExportGamesTestCase(TestCase):
+    def test_export_games(self):
+        GameFactory(status=GameStatusChoices.FINISHED)
+        GameFactory(status=GameStatusChoices.IN_PROGRESS)
+        out = StringIO()
+        call_command("export_games", status="finished", since="2000-01-01", stdout=out)
+
+        (line,) = out.getvalue().splitlines()
+        self.assertEqual(json.loads(line)["status"], GameStatusChoices.FINISHED)
+
+    def test_export_games__file(self):
+        GameFactory()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.csv")
+            call_command("export_games", format="csv", output=path)
+
+            with open(path) as output:
+                self.assertEqual(output.readline().split(",")[0], "game")
+
+    def test_export_games__invalid_date(self):
+        with self.assertRaises(CommandError):
+            call_command("export_games", since="yesterday", stdout=StringIO())
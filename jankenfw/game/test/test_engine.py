@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+from jankenfw.game.engine import FINISHED, IN_PROGRESS, GameError, LiveGame
+from jankenfw.game.enum import MoveChoices
+
+
+class TestLiveGame(TestCase):
+    def setUp(self):
+        self.game = LiveGame(rounds=2)
+        self.game.join("one")
+        self.game.join("two")
+
+    def test_join(self):
+        self.assertEqual(self.game.status, IN_PROGRESS)
+        self.assertEqual(self.game.players, ["one", "two"])
+
+    def test_join__errors(self):
+        with self.assertRaisesRegex(GameError, "already joined"):
+            self.game.join("one")
+        with self.assertRaisesRegex(GameError, "full"):
+            self.game.join("three")
+
+    def test_move__waiting_for_players(self):
+        game = LiveGame(rounds=1, players=["one"])
+
+        with self.assertRaisesRegex(GameError, "Waiting for players."):
+            game.move("one", MoveChoices.Rock)
+
+    def test_move__not_your_move(self):
+        self.game.move("one", MoveChoices.Rock)
+
+        self.assertEqual(self.game.next_move, "two")
+        with self.assertRaisesRegex(GameError, "It's not your move."):
+            self.game.move("one", MoveChoices.Rock)
+
+    def test_move__not_a_player(self):
+        with self.assertRaisesRegex(GameError, "You are not a player in this game."):
+            self.game.move("three", MoveChoices.Rock)
+
+        self.assertEqual(self.game.round_moves, [])
+
+    def test_whole_game(self):
+        self.game.move("two", MoveChoices.Rock)
+        result = self.game.move("one", MoveChoices.Paper)
+
+        self.assertTrue(result.round_finished)
+        self.assertEqual(result.round_winner, "one")
+        self.assertFalse(result.game_finished)
+        self.assertEqual(self.game.round_number, 2)
+        self.assertIsNone(self.game.next_move)
+
+        self.game.move("one", MoveChoices.Spock)
+        result = self.game.move("two", MoveChoices.Lizard)
+
+        self.assertEqual(result.round_winner, "two")
+        self.assertTrue(result.game_finished)
+        self.assertIsNone(result.game_winner)
+        self.assertEqual(self.game.status, FINISHED)
+
+        with self.assertRaisesRegex(GameError, "This game is finished."):
+            self.game.move("one", MoveChoices.Rock)
+
+    def test_game_winner(self):
+        game = LiveGame(
+            rounds=3,
+            status=IN_PROGRESS,
+            players=["one", "two"],
+            round_number=3,
+            round_moves=[("two", MoveChoices.Scissors)],
+            round_winners=["one", None],
+        )
+        result = game.move("one", MoveChoices.Spock)
+
+        self.assertEqual(result.game_winner, "one")
+        self.assertEqual(result.rounds_won, 2)
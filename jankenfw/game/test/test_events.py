@@ -0,0 +1,125 @@
+import asyncio
+import json
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from jankenfw.game.consumers import game_events
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.events import InMemoryChannelLayer, game_channel, get_channel_layer
+from jankenfw.game.services import do_move
+from jankenfw.game.test.factories import GameFactory, GameRoundFactory, PlayerFactory
+
+
+class InMemoryChannelLayerTestCase(TestCase):
+    def test_publish_from_other_thread(self):
+        layer = InMemoryChannelLayer()
+
+        async def subscribe_and_wait():
+            subscription = layer.subscribe("game.1")
+            other = layer.subscribe("game.2")
+            thread = threading.Thread(
+                target=layer.publish, args=("game.1", {"type": "move_made"})
+            )
+            thread.start()
+            event = await asyncio.wait_for(subscription.get(), timeout=1)
+            thread.join()
+            subscription.close()
+            other.close()
+            return event, other._queue.empty()
+
+        event, other_empty = async_to_sync(subscribe_and_wait)()
+
+        self.assertEqual(event, {"type": "move_made"})
+        self.assertTrue(other_empty)
+        self.assertEqual(layer._subscriptions, {})
+
+
+class GameEventsTestCase(TestCase):
+    def setUp(self):
+        self.player_one = PlayerFactory()
+        self.player_two = PlayerFactory()
+        self.game = GameFactory(status=GameStatusChoices.IN_PROGRESS, next_move=None)
+        self.game.player.add(self.player_one, self.player_two)
+        self.game.current_round = GameRoundFactory(game=self.game, round_number=1)
+        self.game.save()
+
+    def _connect(self, path, query_string=b""):
+        """
+        Connect to the endpoint, publish an event from another thread once accepted
+        and disconnect after the first event. Return all messages sent by the endpoint.
+        """
+
+        sent = []
+
+        async def run():
+            incoming = asyncio.Queue()
+            await incoming.put({"type": "websocket.connect"})
+
+            async def receive():
+                return await incoming.get()
+
+            async def send(message):
+                sent.append(message)
+                if message["type"] == "websocket.accept":
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._publish
+                    )
+                elif message["type"] == "websocket.send":
+                    await incoming.put({"type": "websocket.disconnect"})
+
+            scope = {"type": "websocket", "path": path, "query_string": query_string}
+            await asyncio.wait_for(game_events(scope, receive, send), timeout=5)
+
+        async_to_sync(run)()
+        return sent
+
+    def _publish(self):
+        channel = game_channel(self.game.id)
+        event = {"type": "move_made", "game": str(self.game.id)}
+        get_channel_layer().publish(channel, event)
+
+    def test_game_events(self):
+        token = self.player_one.user.auth_token.key
+        sent = self._connect(f"/ws/game/{self.game.id}/", f"token={token}".encode())
+
+        self.assertEqual(sent[0], {"type": "websocket.accept"})
+        self.assertEqual(json.loads(sent[1]["text"])["type"], "move_made")
+        self.assertEqual(get_channel_layer()._subscriptions, {})
+
+    def test_game_events__no_token(self):
+        sent = self._connect(f"/ws/game/{self.game.id}/")
+
+        self.assertEqual(sent, [{"type": "websocket.close", "code": 4403}])
+
+    def test_game_events__unknown_game(self):
+        token = self.player_one.user.auth_token.key
+        sent = self._connect(
+            f"/ws/game/{self.player_one.id}/", f"token={token}".encode()
+        )
+
+        self.assertEqual(sent, [{"type": "websocket.close", "code": 4403}])
+
+    def test_do_move_publishes_events(self):
+        with mock.patch.object(InMemoryChannelLayer, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                do_move(self.game, MoveChoices.Rock, self.player_one)
+                do_move(self.game, MoveChoices.Paper, self.player_two)
+
+        events = [call.args[1] for call in publish.call_args_list]
+
+        self.assertEqual(
+            [event["type"] for event in events],
+            ["move_made", "move_made", "round_finished", "game_finished"],
+        )
+        self.assertNotIn("move", events[0])
+        self.assertEqual(
+            events[2]["moves"],
+            {
+                str(self.player_one.id): MoveChoices.Rock,
+                str(self.player_two.id): MoveChoices.Paper,
+            },
+        )
+        self.assertEqual(events[3]["winner"], str(self.player_two.id))
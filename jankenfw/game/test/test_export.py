@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from jankenfw.game.archive import archive_batch
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.export import CSV_HEADER, export_lines, filter_games, iter_games
+from jankenfw.game.models import Game, Move
+from jankenfw.game.test.factories import GameFactory, GameRoundFactory, PlayerFactory
+from jankenfw.users.test.factories import UserFactory
+
+
+def create_game(status=GameStatusChoices.FINISHED, rounds=2):
+    players = [PlayerFactory(), PlayerFactory()]
+    game = GameFactory(status=status, rounds=rounds, winner=players[0])
+    game.player.add(*players)
+    for round_number in range(1, rounds + 1):
+        game_round = GameRoundFactory(
+            game=game, round_number=round_number, move_count=2, winner=players[0]
+        )
+        for player, move in zip(players, (MoveChoices.Rock, MoveChoices.Scissors)):
+            Move.objects.create(
+                game=game, game_round=game_round, player=player, move=move
+            )
+    return game, players
+
+
+class ExportTestCase(TestCase):
+    def test_iter_games(self):
+        game, players = create_game()
+        create_game(status=GameStatusChoices.IN_PROGRESS, rounds=1)
+        create_game()
+
+        # The games and the players, rounds and moves of each chunk
+        with self.assertNumQueries(1 + 3 * 2):
+            games = list(iter_games(Game.objects.all(), chunk_size=2))
+
+        self.assertEqual(len(games), 3)
+        self.assertEqual(games[0]["id"], game.id)
+        self.assertEqual(set(games[0]["players"]), {player.id for player in players})
+        self.assertEqual(
+            [
+                (game_round["round_number"], len(game_round["moves"]))
+                for game_round in games[0]["game_rounds"]
+            ],
+            [(1, 2), (2, 2)],
+        )
+        self.assertEqual(
+            games[0]["game_rounds"][0]["moves"][0]["player"], players[0].id
+        )
+
+    def test_iter_games__archived(self):
+        game, players = create_game()
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            GAME_ARCHIVE_DIR=directory
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                archive_batch([game.id], directory)
+            (exported,) = iter_games(Game.objects.all())
+            rows = list(
+                csv.reader(
+                    io.StringIO("".join(export_lines(Game.objects.all(), "csv")))
+                )
+            )
+
+        self.assertIsNotNone(exported["archived_at"])
+        self.assertEqual(
+            [
+                (game_round["round_number"], game_round["winner"])
+                for game_round in exported["game_rounds"]
+            ],
+            [(1, players[0].id), (2, players[0].id)],
+        )
+        self.assertEqual(
+            exported["game_rounds"][0]["moves"],
+            [
+                {"player": players[0].id, "move": MoveChoices.Rock, "created_at": None},
+                {
+                    "player": players[1].id,
+                    "move": MoveChoices.Scissors,
+                    "created_at": None,
+                },
+            ],
+        )
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1][-2:], ["", exported["archived_at"].isoformat()])
+
+    def test_filter_games(self):
+        game, _ = create_game()
+        create_game(status=GameStatusChoices.IN_PROGRESS)
+
+        self.assertEqual(list(filter_games(status=GameStatusChoices.FINISHED)), [game])
+        self.assertFalse(filter_games(until=game.created_at).exists())
+        self.assertEqual(filter_games(since=game.created_at).count(), 2)
+
+    def test_export_lines(self):
+        game, players = create_game()
+
+        (line,) = export_lines(Game.objects.all(), "ndjson")
+        exported = json.loads(line)
+
+        self.assertEqual(exported["id"], str(game.id))
+        self.assertEqual(exported["winner"], str(players[0].id))
+        self.assertEqual(len(exported["game_rounds"]), 2)
+
+        rows = list(
+            csv.reader(io.StringIO("".join(export_lines(Game.objects.all(), "csv"))))
+        )
+
+        self.assertEqual(tuple(rows[0]), CSV_HEADER)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1][:2], [str(game.id), game.created_at.isoformat()])
+        self.assertEqual(
+            rows[1][5:9], ["1", str(players[0].id), str(players[0].id), "1"]
+        )
+
+
+class GameExportTestCase(APITestCase):
+    def setUp(self):
+        self.url = reverse("game-export")
+        self.game, _ = create_game()
+        create_game(status=GameStatusChoices.IN_PROGRESS, rounds=1)
+        admin = UserFactory(is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {admin.auth_token}")
+
+    def test_export(self):
+        response = self.client.get(
+            self.url, {"status": GameStatusChoices.FINISHED, "since": "2000-01-01"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(
+            [json.loads(line)["id"] for line in lines], [str(self.game.id)]
+        )
+
+    def test_export__csv(self):
+        response = self.client.get(self.url, {"output": "csv"})
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 7)
+
+    def test_export__invalid(self):
+        response = self.client.get(self.url, {"output": "xml", "since": "yesterday"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {"output", "since"})
+
+    def test_export__staff_only(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {UserFactory().auth_token}")
+
+        self.assertEqual(
+            self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from libs.ids import generate_id, get_id_generator, uuid7
+
+
+class UUID7TestCase(SimpleTestCase):
+    def test_uuid7(self):
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, "specified in RFC 4122")
+        self.assertGreaterEqual(value.int >> 80, before)
+        self.assertLessEqual(value.int >> 80, time.time_ns() // 1_000_000 + 1)
+
+    def test_uuid7__increasing(self):
+        values = [uuid7() for _ in range(10000)]
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    def test_generate_id(self):
+        self.addCleanup(get_id_generator.cache_clear)
+
+        with override_settings(PRIMARY_KEY_GENERATOR="libs.ids.uuid7"):
+            get_id_generator.cache_clear()
+            self.assertEqual(generate_id().version, 7)
+
+        get_id_generator.cache_clear()
+        self.assertEqual(generate_id().version, 4)
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from jankenfw.game.leaderboard import Leaderboard
+from jankenfw.game.test.factories import PlayerFactory
+
+
+class LeaderboardTestCase(TestCase):
+    def setUp(self):
+        self.player_one = PlayerFactory(games_won=1)
+        self.player_two = PlayerFactory(games_won=5)
+        self.player_three = PlayerFactory(games_won=5)
+        self.leaderboard = Leaderboard()
+
+    def test_top(self):
+        with self.assertNumQueries(1):
+            top = self.leaderboard.top(10)
+            self.leaderboard.top(10)
+
+        self.assertEqual([entry["rank"] for entry in top], [1, 1, 3])
+        self.assertEqual(top[2]["player"], str(self.player_one.id))
+        self.assertEqual(top[2]["username"], self.player_one.user.username)
+
+    def test_increment(self):
+        self.leaderboard.load()
+        self.leaderboard.increment(self.player_one.id, "one", amount=5)
+
+        with self.assertNumQueries(0):
+            entry = self.leaderboard.rank(self.player_one.id)
+
+        self.assertEqual(entry["rank"], 1)
+        self.assertEqual(entry["games_won"], 6)
+        self.assertEqual(self.leaderboard.rank(self.player_two.id)["rank"], 2)
+
+    def test_increment__not_loaded(self):
+        self.leaderboard.increment(self.player_one.id, "one")
+
+        self.assertEqual(self.leaderboard.rank(self.player_one.id)["games_won"], 1)
+
+    def test_rank__unknown_player(self):
+        entry = self.leaderboard.rank(self.player_one.user.id)
+
+        self.assertEqual(entry["rank"], 4)
+        self.assertEqual(entry["games_won"], 0)
+        self.assertIsNone(entry["username"])
+
+    @override_settings(LEADERBOARD_TTL=-1)
+    def test_reload__in_background(self):
+        self.leaderboard.load()
+
+        with mock.patch.object(self.leaderboard, "load") as load:
+            with self.assertNumQueries(0):
+                top = self.leaderboard.top(10)
+            self.leaderboard._refresher.join()
+
+        load.assert_called_once_with()
+        self.assertEqual(len(top), 3)
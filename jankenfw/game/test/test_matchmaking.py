@@ -0,0 +1,56 @@
+from unittest import TestCase
+from uuid import uuid4
+
+from jankenfw.game.matchmaking import InMemoryMatchmakingQueue
+
+
+class TestInMemoryMatchmakingQueue(TestCase):
+    def setUp(self):
+        self.queue = InMemoryMatchmakingQueue()
+        self.players = [uuid4() for _ in range(4)]
+
+    def test_pair(self):
+        self.assertIsNone(self.queue.pair(self.players[0], 3))
+        self.assertIsNone(self.queue.pair(self.players[1], 1))
+
+        self.assertEqual(self.queue.pair(self.players[2], 3), self.players[0])
+        self.assertEqual(self.queue.status(self.players[1]), {"game": None})
+        # Still waiting while the game of the paired player is created
+        self.assertEqual(self.queue.status(self.players[0]), {"game": None})
+        self.assertIsNone(self.queue.status(self.players[2]))
+
+    def test_pair__twice(self):
+        self.queue.pair(self.players[0], 3)
+
+        self.assertIsNone(self.queue.pair(self.players[0], 3))
+        self.assertIsNone(self.queue.pair(self.players[1], 1))
+
+    def test_matched(self):
+        game_id = uuid4()
+        self.queue.pair(self.players[0], 1)
+        self.queue.pair(self.players[1], 1)
+        self.queue.matched(self.players[0], game_id)
+
+        self.assertEqual(self.queue.status(self.players[0]), {"game": game_id})
+
+    def test_requeue(self):
+        self.queue.pair(self.players[0], 1)
+        self.queue.pair(self.players[1], 1)
+        self.queue.requeue(self.players[2], 1)
+
+        self.assertEqual(self.queue.pair(self.players[3], 1), self.players[2])
+
+    def test_requeue__paired(self):
+        self.queue.pair(self.players[0], 1)
+        self.queue.pair(self.players[1], 1)
+        self.queue.requeue(self.players[0], 1)
+
+        self.assertEqual(self.queue.status(self.players[0]), {"game": None})
+        self.assertEqual(self.queue.pair(self.players[2], 1), self.players[0])
+
+    def test_cancel(self):
+        self.queue.pair(self.players[0], 1)
+
+        self.assertTrue(self.queue.cancel(self.players[0]))
+        self.assertFalse(self.queue.cancel(self.players[0]))
+        self.assertIsNone(self.queue.pair(self.players[1], 1))
@@ -0,0 +1,69 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from jankenfw.game.test.factories import PlayerFactory
+from libs.metrics import RollingHistogram, metrics
+
+
+class RollingHistogramTestCase(TestCase):
+    def test_quantiles_of_window(self):
+        histogram = RollingHistogram(window=10)
+        for value in range(100):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.quantiles((0.5, 0.99)), [95, 99])
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.sum, sum(range(100)))
+
+    def test_quantiles__empty(self):
+        self.assertEqual(RollingHistogram(window=10).quantiles((0.5,)), [0.0])
+
+
+class RequestMetricsMiddlewareTestCase(APITestCase):
+    def setUp(self):
+        metrics.clear()
+        PlayerFactory.create_batch(3)
+
+    def test_records_route(self):
+        self.client.get(reverse("player-list"))
+
+        self.assertEqual(metrics.get("player-list", "queries").count, 1)
+        self.assertEqual(metrics.get("player-list", "queries").sum, 1)
+        self.assertGreater(metrics.get("player-list", "sql_seconds").sum, 0)
+        self.assertGreater(metrics.get("player-list", "serialization_seconds").sum, 0)
+        self.assertGreater(
+            metrics.get("player-list", "wall_seconds").sum,
+            metrics.get("player-list", "sql_seconds").sum,
+        )
+
+    @override_settings(METRICS_QUERY_BUDGET=0)
+    def test_query_budget(self):
+        with self.assertLogs("libs.middleware", "WARNING") as logs:
+            self.client.get(reverse("player-list"))
+
+        self.assertIn("(player-list) ran 1 queries, the budget is 0.", logs.output[0])
+
+    def test_metrics_view(self):
+        self.client.get(reverse("player-list"))
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"# TYPE jankenfw_request_queries summary", response.content)
+        self.assertIn(
+            b'jankenfw_request_queries{route="player-list",quantile="0.5"} 1',
+            response.content,
+        )
+        self.assertIn(
+            b'jankenfw_request_queries_count{route="player-list"} 1', response.content
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_view__token(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,87 @@
+from base64 import b64encode
+from urllib.parse import urlencode
+
+from django.db.models import Q
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from jankenfw.game.pagination import GamePagination, HighScorePagination
+from jankenfw.game.test.factories import GameFactory, PlayerFactory
+from jankenfw.users.test.factories import UserFactory
+
+
+class KeysetPaginationTestCase(APITestCase):
+    """
+    Tests KeysetPagination through the game list and the high score list.
+    """
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user.auth_token}")
+
+    def _walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            url = response.data["next"]
+        return pages
+
+    def test_high_score_pages(self):
+        # Most of the players share the same score.
+        players = [PlayerFactory(games_won=0) for _ in range(23)]
+        players += [PlayerFactory(games_won=games_won) for games_won in (1, 7)]
+
+        pages = self._walk(reverse("player-list"))
+        usernames = [entry["username"] for page in pages for entry in page["results"]]
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(usernames), 25)
+        self.assertEqual(set(usernames), {player.user.username for player in players})
+        self.assertEqual(
+            [entry["games_won"] for entry in pages[0]["results"][:3]], [7, 1, 0]
+        )
+
+        response = self.client.get(pages[2]["previous"])
+
+        self.assertEqual(response.data["results"], pages[1]["results"])
+
+    def test_game_pages(self):
+        games = GameFactory.create_batch(15)
+
+        pages = self._walk(reverse("game-list"))
+        ids = [game["id"] for page in pages for game in page["results"]]
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(ids, [str(game.id) for game in reversed(games)])
+
+    def test_new_rows_dont_shift_pages(self):
+        GameFactory.create_batch(15)
+        response = self.client.get(reverse("game-list"))
+        GameFactory.create_batch(5)
+
+        next_page = self.client.get(response.data["next"])
+
+        self.assertEqual(len(next_page.data["results"]), 5)
+
+    def test_after_position(self):
+        # The bound on the first field is the range of the index scan
+        self.assertEqual(
+            GamePagination()._after_position('["x", "y"]', reverse=False),
+            Q(created_at__lte="x") & (Q(created_at__lt="x") | Q(id__lt="y")),
+        )
+        self.assertEqual(
+            HighScorePagination()._after_position('["7", "y"]', reverse=True),
+            Q(games_won__gte="7") & (Q(games_won__gt="7") | Q(id__lt="y")),
+        )
+
+    def test_invalid_cursor(self):
+        for position in ("[1]", "not json", '["not a date", "1"]'):
+            cursor = b64encode(urlencode({"p": position}).encode()).decode()
+            response = self.client.get(reverse("game-list"), {"cursor": cursor})
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
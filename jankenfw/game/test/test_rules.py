@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from jankenfw.game import rules
+from jankenfw.game.enum import MoveChoices
+
+
+class TestRules(TestCase):
+    def test_resolve(self):
+        self.assertEqual(
+            rules.resolve(MoveChoices.Rock, MoveChoices.Scissors), rules.FIRST
+        )
+        self.assertEqual(
+            rules.resolve(MoveChoices.Rock, MoveChoices.Paper), rules.SECOND
+        )
+        self.assertEqual(rules.resolve(MoveChoices.Spock, MoveChoices.Spock), rules.TIE)
+        self.assertEqual(
+            rules.resolve(MoveChoices.Lizard, MoveChoices.Spock), rules.FIRST
+        )
+        self.assertEqual(
+            rules.resolve(MoveChoices.Spock, MoveChoices.Rock), rules.FIRST
+        )
+
+    def test_every_move_beats_two_and_loses_to_two(self):
+        for first in MoveChoices.values:
+            outcomes = [rules.resolve(first, second) for second in MoveChoices.values]
+
+            self.assertEqual(outcomes.count(rules.FIRST), 2)
+            self.assertEqual(outcomes.count(rules.SECOND), 2)
+            self.assertEqual(outcomes.count(rules.TIE), 1)
+
+    def test_resolve_many(self):
+        first = [MoveChoices.Rock, MoveChoices.Paper, MoveChoices.Scissors] * 1000
+        second = [MoveChoices.Scissors, MoveChoices.Lizard, MoveChoices.Scissors] * 1000
+
+        result = rules.resolve_many(first, second)
+
+        self.assertEqual(result.tolist(), [rules.FIRST, rules.SECOND, rules.TIE] * 1000)
+
+    def test_resolve_many__different_lengths(self):
+        with self.assertRaises(ValueError):
+            rules.resolve_many([MoveChoices.Rock], [])
@@ -1,12 +1,25 @@
+from django.db.models import Prefetch
 from django.test import TestCase
 from nose.tools import ok_
+from rest_framework.renderers import JSONRenderer
 
+from jankenfw.game.models import Game, Player
 from jankenfw.game.serializers import (
     GameSerializer,
     MoveSerializer,
     GameRoundSerializer,
+    PlayerHighScoreSerializer,
+    game_values,
+    high_score_values,
 )
-from jankenfw.game.test.factories import GameFactory, MoveFactory, GameRoundFactory
+from jankenfw.game.test.factories import (
+    GameFactory,
+    MoveFactory,
+    GameRoundFactory,
+    PlayerFactory,
+)
+from jankenfw.users.test.factories import UserFactory
+from libs.renderers import ORJSONRenderer
 
 
 class TestGameSerializer(TestCase):
@@ -51,3 +64,39 @@ class TestGameRoundSerializer(TestCase):
         self.assertIn("winner", serializer.data)
         self.assertIn("round_number", serializer.data)
         self.assertIn("game", serializer.data)
+
+
+class TestValuesSerializers(TestCase):
+    def setUp(self):
+        for _ in range(3):
+            game = GameFactory()
+            game.player.add(PlayerFactory(), PlayerFactory())
+            game.current_round = GameRoundFactory(game=game)
+            game.save()
+        GameFactory(next_move=None)
+        PlayerFactory(user=UserFactory(username="zażółć \u2028 \U0001f600"))
+
+    def test_game_values__same_json(self):
+        games = Game.objects.order_by("created_at").prefetch_related(
+            Prefetch("player", queryset=Player.objects.order_by("id"))
+        )
+        expected = JSONRenderer().render(GameSerializer(games, many=True).data)
+
+        rows = game_values.values(Game.objects.order_by("created_at"))
+        with self.assertNumQueries(2):
+            data = game_values.many(rows)
+
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+
+    def test_high_score_values__same_json(self):
+        players = Player.objects.select_related("user").order_by("-games_won", "id")
+        expected = JSONRenderer().render(
+            PlayerHighScoreSerializer(players, many=True).data
+        )
+
+        rows = high_score_values.values(Player.objects.order_by("-games_won", "id"))
+        with self.assertNumQueries(1):
+            data = high_score_values.many(rows)
+
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+        self.assertIn(b"\\u2028", expected)
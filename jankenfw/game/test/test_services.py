@@ -1,10 +1,24 @@
 from unittest import TestCase
+from django.test import TestCase as DjangoTestCase
 from django.forms.models import model_to_dict
 from django.contrib.auth import get_user_model
 
-from jankenfw.game.services import join_game, _get_current_round, _is_game_active
-from jankenfw.game.enum import GameStatusChoices
-from jankenfw.game.test.factories import PlayerFactory, GameFactory, GameRoundFactory
+from jankenfw.game.services import (
+    join_game,
+    _get_current_round,
+    _is_game_active,
+    _findout_winner,
+    do_move,
+)
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.leaderboard import leaderboard
+from jankenfw.game.models import Move, PlayerStats
+from jankenfw.game.test.factories import (
+    PlayerFactory,
+    GameFactory,
+    GameRoundFactory,
+    MoveFactory,
+)
 from jankenfw.users.test.factories import UserFactory
 
 
@@ -14,6 +28,8 @@ class TestServices(TestCase):
         self.player_one = PlayerFactory(user=self.user)
         self.game = GameFactory(status=GameStatusChoices.WAITING_FOR_PLAYER)
         self.game_round = GameRoundFactory(game=self.game, round_number=1)
+        self.game.current_round = self.game_round
+        self.game.save()
 
     def test_join_game(self):
         result = join_game(self.game, self.player_one)
@@ -69,5 +85,128 @@ class TestServices(TestCase):
         ...
 
     def test_findout_winner(self):
-        # TODO
-        ...
+        player_two = PlayerFactory()
+        self.game.player.add(self.player_one, player_two)
+        moves = [
+            MoveFactory(
+                game=self.game,
+                game_round=self.game_round,
+                player=self.player_one,
+                move=MoveChoices.Spock,
+            ),
+            MoveFactory(
+                game=self.game,
+                game_round=self.game_round,
+                player=player_two,
+                move=MoveChoices.Lizard,
+            ),
+        ]
+
+        result = _findout_winner(self.game, self.game_round, moves)
+
+        self.assertEqual(self.game_round.winner, player_two)
+        self.assertTrue(result.startswith(f"Game winner is {player_two}."))
+
+
+class TestDoMove(DjangoTestCase):
+    def setUp(self) -> None:
+        self.player_one = PlayerFactory()
+        self.player_two = PlayerFactory()
+        self.game = GameFactory(
+            status=GameStatusChoices.IN_PROGRESS, next_move=None, rounds=2
+        )
+        self.game.player.add(self.player_one, self.player_two)
+        self.game.current_round = GameRoundFactory(game=self.game, round_number=1)
+        self.game.save()
+
+    def test_do_move__query_count(self):
+        PlayerStats.objects.bulk_create(
+            [PlayerStats(player=self.player_one), PlayerStats(player=self.player_two)]
+        )
+
+        # Lock with the round, insert move, update round, update game and the
+        # savepoint pair.
+        with self.assertNumQueries(6):
+            result = do_move(self.game, MoveChoices.Rock, self.player_one)
+
+        self.assertIsNone(result)
+
+        # The second move of a round also loads the moves, counts the round in the
+        # statistics of the players, inserting missing rows first, and starts the
+        # next round.
+        with self.assertNumQueries(10):
+            result = do_move(self.game, MoveChoices.Paper, self.player_two)
+
+        self.assertEqual(result["status"], f"1 round winner is {self.player_two}")
+
+    def test_do_move__not_your_move(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+        result = do_move(self.game, MoveChoices.Rock, self.player_one)
+
+        self.assertEqual(result["error"], "It's not your move.")
+
+    def test_do_move__not_a_player(self):
+        result = do_move(self.game, MoveChoices.Rock, PlayerFactory())
+
+        self.assertEqual(result["error"], "You are not a player in this game.")
+        self.assertFalse(Move.objects.filter(game=self.game).exists())
+
+    def test_do_move__whole_game(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+        do_move(self.game, MoveChoices.Scissors, self.player_two)
+        do_move(self.game, MoveChoices.Spock, self.player_two)
+        result = do_move(self.game, MoveChoices.Lizard, self.player_one)
+
+        self.game.refresh_from_db()
+        self.player_one.refresh_from_db()
+        self.assertEqual(
+            result["status"],
+            f"Game winner is {self.player_one}. Total rounds won 2. Total games won 1",
+        )
+        self.assertEqual(self.game.status, GameStatusChoices.FINISHED)
+        self.assertEqual(self.game.current_round.round_number, 2)
+        self.assertEqual(self.player_one.games_won, 1)
+        self.assertEqual(self.player_one.rounds_won, 2)
+        self.assertEqual(self.player_one.games_played, 1)
+        self.assertEqual(
+            list(
+                self.game.game_round.order_by("round_number").values_list(
+                    "move_count", flat=True
+                )
+            ),
+            [2, 2],
+        )
+
+        result = do_move(self.game, MoveChoices.Rock, self.player_one)
+
+        self.assertEqual(result["error"], "This game is finished.")
+
+    def test_do_move__updates_leaderboard(self):
+        leaderboard.load()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                do_move(self.game, MoveChoices.Paper, self.player_one)
+                do_move(self.game, MoveChoices.Rock, self.player_two)
+
+        self.assertEqual(leaderboard.rank(self.player_one.id)["games_won"], 1)
+        leaderboard.clear()
+
+    def test_do_move__tie_finishes_game(self):
+        for _ in range(2):
+            do_move(self.game, MoveChoices.Rock, self.player_one)
+            result = do_move(self.game, MoveChoices.Rock, self.player_two)
+
+        self.game.refresh_from_db()
+        self.assertEqual(result["status"], "The game finished. It's a Tie.")
+        self.assertEqual(self.game.status, GameStatusChoices.FINISHED)
+        self.player_one.refresh_from_db()
+        self.assertEqual(
+            (
+                self.player_one.games_played,
+                self.player_one.games_tied,
+                self.player_one.games_won,
+                self.player_one.rounds_won,
+            ),
+            (1, 1, 0, 0),
+        )
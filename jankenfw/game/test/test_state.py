@@ -0,0 +1,190 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.services import do_move, join_game
+from jankenfw.game.state import (
+    DjangoGameStateCache,
+    GameState,
+    LocalGameStateCache,
+    get_game_state,
+    get_game_state_cache,
+    update_game_state,
+)
+from jankenfw.game.test.factories import GameFactory, GameRoundFactory, PlayerFactory
+
+
+def make_state(**values):
+    state = {
+        "id": None,
+        "version": 0,
+        "status": GameStatusChoices.IN_PROGRESS,
+        "rounds": 1,
+        "players": (),
+        "next_move": None,
+        "round_number": 1,
+    }
+    state.update(values)
+    return GameState(**state)
+
+
+class LocalGameStateCacheTestCase(TestCase):
+    def setUp(self):
+        self.cache = LocalGameStateCache()
+
+    @override_settings(GAME_STATE_CACHE_SIZE=2)
+    def test_evicts_least_recently_used(self):
+        for game_id in (1, 2, 3):
+            self.cache.set(make_state(id=game_id))
+            self.cache.get(1)
+
+        self.assertIsNotNone(self.cache.get(1))
+        self.assertIsNone(self.cache.get(2))
+        self.assertIsNotNone(self.cache.get(3))
+
+    @override_settings(GAME_STATE_CACHE_TTL=0)
+    def test_expires(self):
+        self.cache.set(make_state(id=1))
+
+        self.assertIsNone(self.cache.get(1))
+
+    def test_add__keeps_cached_state(self):
+        self.cache.set(make_state(id=1, version=2))
+        self.cache.add(make_state(id=1, version=1))
+
+        self.assertEqual(self.cache.get(1).version, 2)
+
+
+class DjangoGameStateCacheTestCase(TestCase):
+    def test_get_set(self):
+        cache = DjangoGameStateCache()
+        cache.clear()
+        cache.add(make_state(id=1, version=1))
+        cache.add(make_state(id=1, version=0))
+
+        self.assertEqual(cache.get(1), make_state(id=1, version=1))
+
+        cache.delete(1)
+        self.assertIsNone(cache.get(1))
+
+    def test_update__drops_state(self):
+        cache = DjangoGameStateCache()
+        cache.clear()
+        cache.set(make_state(id=1, version=1))
+
+        cache.update(1, 2, lambda state: state.replace(status=3))
+
+        self.assertIsNone(cache.get(1))
+
+
+class GameStateTestCase(TestCase):
+    def setUp(self):
+        get_game_state_cache().clear()
+        self.player_one = PlayerFactory()
+        self.player_two = PlayerFactory()
+        # The factory leaves the user ids as strings
+        self.player_one.refresh_from_db()
+        self.player_two.refresh_from_db()
+        self.game = GameFactory(
+            status=GameStatusChoices.WAITING_FOR_PLAYER, next_move=None, rounds=2
+        )
+        self.game.current_round = GameRoundFactory(game=self.game)
+        self.game.save()
+
+    def test_update__previous_version(self):
+        get_game_state_cache().set(make_state(id=1, version=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_game_state(1, 2, lambda state: state.replace(status=3))
+
+        self.assertEqual(get_game_state(1), make_state(id=1, version=2, status=3))
+
+    def test_update__other_version(self):
+        get_game_state_cache().set(make_state(id=1, version=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_game_state(1, 3, lambda state: state.replace(status=3))
+
+        self.assertIsNone(get_game_state_cache().get(1))
+
+    def test_write_through(self):
+        """
+        The cached state is the same as the state loaded from the database after
+        every change of the game.
+        """
+
+        get_game_state(self.game.id)
+        actions = [
+            lambda: join_game(self.game, self.player_one),
+            lambda: join_game(self.game, self.player_two),
+            lambda: do_move(self.game, MoveChoices.Rock, self.player_one),
+            lambda: do_move(self.game, MoveChoices.Rock, self.player_two),
+            lambda: do_move(self.game, MoveChoices.Spock, self.player_two),
+            lambda: do_move(self.game, MoveChoices.Paper, self.player_one),
+        ]
+
+        for action in actions:
+            with self.captureOnCommitCallbacks(execute=True):
+                action()
+
+            state = get_game_state_cache().get(self.game.id)
+            self.assertEqual(state, GameState.load(self.game.id))
+
+        self.assertEqual(state.status, GameStatusChoices.FINISHED)
+        self.assertEqual(state.round_winners, (None, self.player_one.id))
+        self.assertEqual(state.version, 6)
+
+
+class MoveStateTestCase(APITestCase):
+    def setUp(self):
+        get_game_state_cache().clear()
+        self.player_one = PlayerFactory()
+        self.player_two = PlayerFactory()
+        self.game = GameFactory(status=GameStatusChoices.IN_PROGRESS, next_move=None)
+        self.game.player.add(self.player_one, self.player_two)
+        self.game.current_round = GameRoundFactory(game=self.game)
+        self.game.save()
+        self.url = reverse("game-move", kwargs={"pk": self.game.id})
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {self.player_one.user.auth_token}"
+        )
+
+    def test_not_your_move__reloaded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {"move": MoveChoices.Rock})
+
+        # The token and the state loaded again
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, {"move": MoveChoices.Rock})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "It's not your move.")
+
+    def test_stale_state_is_reloaded(self):
+        # The move of the other player was made by another process.
+        stale = GameState.load(self.game.id)
+        get_game_state_cache().set(stale.replace(next_move=self.player_two.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"move": MoveChoices.Rock})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_game_state_cache().get(self.game.id).version, 1)
+
+    def test_not_a_player(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {PlayerFactory().user.auth_token}"
+        )
+
+        response = self.client.post(self.url, {"move": MoveChoices.Rock})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "You are not a player in this game.")
+
+    def test_unknown_game(self):
+        url = reverse("game-move", kwargs={"pk": self.player_one.id})
+        response = self.client.post(url, {"move": MoveChoices.Rock})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
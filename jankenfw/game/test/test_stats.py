@@ -0,0 +1,97 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.models import Matchup, Player, PlayerStats
+from jankenfw.game.stats import count_finished_game, count_rounds
+from jankenfw.game.test.factories import GameFactory, GameRoundFactory, PlayerFactory
+
+backfill = import_module("jankenfw.game.migrations.0008_player_counters")
+
+
+class CountFinishedGameTestCase(TestCase):
+    def setUp(self):
+        self.player_one = PlayerFactory(games_won=3, games_played=5, rounds_won=7)
+        self.player_two = PlayerFactory()
+
+    def counters(self, player):
+        player.refresh_from_db()
+        return (
+            player.games_played,
+            player.games_won,
+            player.games_tied,
+            player.rounds_won,
+        )
+
+    def test_winner(self):
+        players = [self.player_one.id, self.player_two.id]
+
+        count_finished_game(players, [2, 1], self.player_one.id)
+
+        self.assertEqual(self.counters(self.player_one), (6, 4, 0, 9))
+        self.assertEqual(self.counters(self.player_two), (1, 0, 0, 1))
+
+        # Inserts missing matchups, updates them and the players
+        with self.assertNumQueries(3):
+            count_finished_game(players, [0, 1], self.player_two.id)
+
+        self.assertEqual(
+            list(
+                Matchup.objects.values_list(
+                    "games_played", "games_won", "rounds_won", "rounds_lost"
+                )
+            ),
+            [(2, 1, 2, 2), (2, 1, 2, 2)],
+        )
+
+    def test_tie(self):
+        count_finished_game([self.player_one.id, self.player_two.id], [1, 1], None)
+
+        self.assertEqual(self.counters(self.player_one), (6, 3, 1, 8))
+        self.assertEqual(self.counters(self.player_two), (1, 0, 1, 1))
+
+
+class CountRoundsTestCase(TestCase):
+    def test_count_rounds(self):
+        player_one, player_two = PlayerFactory(), PlayerFactory()
+        moves = [(player_one.id, MoveChoices.Rock), (player_two.id, MoveChoices.Spock)]
+
+        count_rounds([(moves, player_two.id), (moves, None)])
+        count_rounds([(moves, player_two.id)])
+
+        self.assertEqual(
+            list(
+                PlayerStats.objects.order_by("rounds_won").values_list(
+                    "rounds_played", "rounds_won", "rounds_tied", "rock", "spock"
+                )
+            ),
+            [(3, 0, 1, 3, 0), (3, 2, 1, 0, 3)],
+        )
+
+
+class BackfillCountersTestCase(TestCase):
+    def test_backfill(self):
+        player_one, player_two = PlayerFactory(), PlayerFactory()
+        won = GameFactory(status=GameStatusChoices.FINISHED)
+        tied = GameFactory(status=GameStatusChoices.FINISHED)
+        playing = GameFactory(status=GameStatusChoices.IN_PROGRESS)
+        for game in (won, tied, playing):
+            game.player.add(player_one, player_two)
+        GameRoundFactory(game=won, round_number=1, winner=player_one)
+        GameRoundFactory(game=won, round_number=2, winner=player_one)
+        GameRoundFactory(game=tied, round_number=1, winner=player_one)
+        GameRoundFactory(game=tied, round_number=2, winner=player_two)
+        GameRoundFactory(game=playing, round_number=1, winner=player_two)
+
+        backfill.backfill_counters(apps, None)
+
+        self.assertEqual(
+            list(
+                Player.objects.filter(pk__in=[player_one.pk, player_two.pk])
+                .order_by("-rounds_won")
+                .values_list("games_played", "games_tied", "rounds_won")
+            ),
+            [(2, 1, 3), (2, 1, 1)],
+        )
@@ -0,0 +1,180 @@
+from django.test import TestCase
+
+from jankenfw.game.enum import (
+    GameStatusChoices,
+    MoveChoices,
+    TournamentFormatChoices,
+)
+from jankenfw.game.models import Game
+from jankenfw.game.services import do_move
+from jankenfw.game.test.factories import PlayerFactory, TournamentFactory
+from jankenfw.game.tournaments import (
+    advance_tournament,
+    join_tournament,
+    start_tournament,
+)
+
+
+class TournamentTestCase(TestCase):
+    def create_tournament(self, players, **kwargs):
+        tournament = TournamentFactory(**kwargs)
+        players = [PlayerFactory() for _ in range(players)]
+        for player in players:
+            join_tournament(tournament, player)
+        return tournament, players
+
+    def stage_games(self, tournament, stage):
+        return list(
+            Game.objects.filter(tournament=tournament, stage=stage).order_by(
+                "position", "created_at"
+            )
+        )
+
+    def seats(self, game):
+        return [
+            membership.player
+            for membership in Game.player.through.objects.filter(game=game)
+            .select_related("player__user")
+            .order_by("id")
+        ]
+
+    def play(self, game, winner=0):
+        """
+        Play every round of the game, won by the player at the 'winner' seat or
+        tied if it's None.
+        """
+
+        players = self.seats(game)
+        for _ in range(game.rounds):
+            first, second = MoveChoices.Rock, MoveChoices.Scissors
+            if winner is None:
+                second = MoveChoices.Rock
+            elif winner == 1:
+                first, second = second, first
+            do_move(game, first, players[0])
+            do_move(game, second, players[1])
+        return players
+
+
+class JoinTournamentTestCase(TournamentTestCase):
+    def test_join_tournament(self):
+        tournament, (player,) = self.create_tournament(1)
+
+        self.assertEqual(
+            join_tournament(tournament, player),
+            {"error": "You have already joined this tournament."},
+        )
+        self.assertEqual(
+            start_tournament(tournament),
+            {"error": "At least two players have to join the tournament."},
+        )
+
+        self.assertEqual(
+            join_tournament(tournament, PlayerFactory()),
+            {"status": "You joined the tournament."},
+        )
+        self.assertEqual(
+            start_tournament(tournament), {"status": "The tournament started."}
+        )
+        self.assertEqual(
+            join_tournament(tournament, PlayerFactory()),
+            {"error": "This tournament has already started."},
+        )
+        self.assertEqual(
+            start_tournament(tournament),
+            {"error": "This tournament has already started."},
+        )
+
+
+class SingleEliminationTestCase(TournamentTestCase):
+    def test_start_tournament(self):
+        tournament, players = self.create_tournament(5, rounds=3)
+
+        # The games of a stage are inserted in bulk, whatever their number
+        with self.assertNumQueries(8):
+            start_tournament(tournament)
+
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.status, GameStatusChoices.IN_PROGRESS)
+        self.assertEqual(tournament.stage, 1)
+        self.assertEqual(tournament.bye_id, players[4].id)
+
+        games = self.stage_games(tournament, 1)
+        self.assertEqual([game.position for game in games], [0, 1])
+        self.assertEqual(
+            [self.seats(game) for game in games],
+            [players[0:2], players[2:4]],
+        )
+        for game in games:
+            self.assertEqual(game.rounds, 3)
+            self.assertEqual(game.status, GameStatusChoices.IN_PROGRESS)
+            self.assertEqual(game.current_round.round_number, 1)
+
+    def test_tournament(self):
+        tournament, players = self.create_tournament(5)
+        start_tournament(tournament)
+        first, second = self.stage_games(tournament, 1)
+
+        self.play(first, winner=0)
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.stage, 1)
+
+        # A tied game is replayed by the same players
+        self.play(second, winner=None)
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.stage, 1)
+        replay = self.stage_games(tournament, 1)[2]
+        self.assertEqual(replay.position, 1)
+        self.assertEqual(self.play(replay, winner=1), players[2:4])
+
+        # The player with a bye plays the next stage first
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.stage, 2)
+        self.assertEqual(tournament.bye_id, players[3].id)
+        (game,) = self.stage_games(tournament, 2)
+        self.assertEqual(self.play(game, winner=1), [players[4], players[0]])
+
+        (game,) = self.stage_games(tournament, 3)
+        self.assertEqual(self.play(game), [players[3], players[0]])
+
+        tournament.refresh_from_db()
+        game.refresh_from_db()
+        self.assertEqual(tournament.status, GameStatusChoices.FINISHED)
+        self.assertEqual(tournament.stage, 3)
+        self.assertEqual(tournament.winner_id, players[3].id)
+        self.assertIsNone(tournament.bye_id)
+        self.assertEqual(game.winner_id, players[3].id)
+
+        self.assertFalse(advance_tournament(tournament.id))
+
+
+class RoundRobinTestCase(TournamentTestCase):
+    def test_tournament(self):
+        tournament, players = self.create_tournament(
+            3, format=TournamentFormatChoices.ROUND_ROBIN, rounds=2
+        )
+        start_tournament(tournament)
+
+        for stage in (1, 2, 3):
+            tournament.refresh_from_db()
+            self.assertEqual(tournament.stage, stage)
+            (game,) = self.stage_games(tournament, stage)
+            self.play(game, winner=0 if self.seats(game)[0] == players[0] else 1)
+
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.status, GameStatusChoices.FINISHED)
+        self.assertEqual(tournament.winner_id, players[0].id)
+        self.assertEqual(Game.objects.filter(tournament=tournament).count(), 3)
+
+    def test_tournament__tie(self):
+        tournament, players = self.create_tournament(
+            2, format=TournamentFormatChoices.ROUND_ROBIN
+        )
+        start_tournament(tournament)
+
+        (game,) = self.stage_games(tournament, 1)
+        self.play(game, winner=None)
+
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.status, GameStatusChoices.FINISHED)
+        self.assertIsNone(tournament.winner_id)
@@ -1,11 +1,23 @@
+import tempfile
+
+from django.test import override_settings
 from django.urls import reverse
 from faker import Faker
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from jankenfw.game.enum import GameStatusChoices
-from jankenfw.game.test.factories import PlayerFactory, GameRoundFactory, GameFactory
-from jankenfw.game.models import Game, Move
+from jankenfw.game.archive import archive_batch
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.leaderboard import leaderboard
+from jankenfw.game.matchmaking import get_matchmaking_queue
+from jankenfw.game.services import do_move
+from jankenfw.game.test.factories import (
+    PlayerFactory,
+    GameRoundFactory,
+    GameFactory,
+    TournamentFactory,
+)
+from jankenfw.game.models import Game, GameRound, Move, Player, Tournament
 from jankenfw.users.test.factories import UserFactory
 
 fake = Faker()
@@ -24,12 +36,38 @@ class GameViewSetTestCase(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user.auth_token}")
         self.game = GameFactory(status=GameStatusChoices.WAITING_FOR_PLAYER)
 
+    def test_create_game(self):
+        url = reverse("game-list")
+        response = self.client.post(url, {"rounds": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        game = Game.objects.select_related("current_round").get(pk=response.data["id"])
+        self.assertEqual(game.current_round.round_number, 1)
+
+    def test_create_game__archived_at_is_read_only(self):
+        url = reverse("game-list")
+        response = self.client.post(
+            url, {"rounds": 1, "archived_at": "2026-01-01T00:00:00Z"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(Game.objects.get(pk=response.data["id"]).archived_at)
+
     def test_join_game(self):
         url = reverse("game-join", kwargs={"pk": self.game.id})
         response = self.client.post(url, {})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_join_game__starts_game(self):
+        self.game.player.add(self.player_two)
+        url = reverse("game-join", kwargs={"pk": self.game.id})
+        response = self.client.post(url, {})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], GameStatusChoices.IN_PROGRESS)
+        self.assertEqual(len(response.data["player"]), 2)
+
     def test_join_game__twice(self):
         url = reverse("game-join", kwargs={"pk": self.game.id})
         self.client.post(url, {})
@@ -63,6 +101,7 @@ class GameViewSetTestCase(APITestCase):
         self.game.player.add(self.player_one, self.player_two)
         self.game.status = GameStatusChoices.IN_PROGRESS
         self.game.next_move = None
+        self.game.current_round = self.game_round
         self.game.save()
 
     def test_move(self):
@@ -94,6 +133,167 @@ class GameViewSetTestCase(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def _create_games(self, count):
+        for _ in range(count):
+            game = GameFactory(status=GameStatusChoices.IN_PROGRESS)
+            game.player.add(PlayerFactory(), PlayerFactory())
+            game.current_round = GameRoundFactory(
+                game=game, winner=game.next_move, move_count=2
+            )
+            game.save()
+
+    def test_list__constant_queries(self):
+        self._create_games(100)
+        url = reverse("game-list")
+
+        # Token, games and their players
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {"page_size": 100})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 100)
+        self.assertEqual(len(response.data["results"][0]["player"]), 2)
+
+    def test_list__embedded(self):
+        self._create_games(100)
+        url = reverse("game-list")
+
+        # Token, games with the current round, their players and finished rounds
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {"page_size": 100, "embed": "true"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 100)
+        game = Game.objects.get(pk=response.data["results"][0]["id"])
+        self.assertCountEqual(
+            response.data["results"][0]["player"],
+            [
+                {"id": str(player.id), "username": player.user.username}
+                for player in game.player.all()
+            ],
+        )
+        self.assertEqual(response.data["results"][0]["current_round_number"], 1)
+        self.assertEqual(
+            response.data["results"][0]["round_winners"],
+            [{"round_number": 1, "winner": game.next_move_id}],
+        )
+
+    def test_retrieve__embedded(self):
+        url = reverse("game-detail", kwargs={"pk": self.game.id})
+        response = self.client.get(url, {"embed": "true"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["player"], [])
+        self.assertIsNone(response.data["current_round_number"])
+        self.assertEqual(response.data["round_winners"], [])
+
+    def test_retrieve__not_modified(self):
+        url = reverse("game-detail", kwargs={"pk": self.game.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], f'"{self.game.id}.0"')
+
+        # Token and the version of the game
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve__modified(self):
+        self._set_up_game()
+        url = reverse("game-detail", kwargs={"pk": self.game.id})
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(reverse("game-move", kwargs={"pk": self.game.id}), {"move": 1})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["version"], 1)
+
+    def test_retrieve__unknown_game(self):
+        url = reverse("game-detail", kwargs={"pk": self.player_one.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_join_game__bumps_version(self):
+        url = reverse("game-join", kwargs={"pk": self.game.id})
+        self.client.post(url, {})
+
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.version, 1)
+
+    def test_rounds(self):
+        self._set_up_game()
+        url = reverse("game-rounds", kwargs={"pk": self.game.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["round_number"] for r in response.data], [1])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_moves__only_finished_rounds(self):
+        self._set_up_game()
+        url = reverse("game-moves", kwargs={"pk": self.game.id})
+        move_url = reverse("game-move", kwargs={"pk": self.game.id})
+        self.client.post(move_url, {"move": 1})
+
+        response = self.client.get(url)
+        self.assertEqual(response.data, [])
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {self.player_two.user.auth_token}"
+        )
+        self.client.post(move_url, {"move": 2})
+
+        response = self.client.get(url)
+        self.assertEqual([move["move"] for move in response.data], [1, 2])
+
+    def test_rounds__archived(self):
+        self._set_up_game()
+        for player, move in ((self.player_one, 1), (self.player_two, 3)):
+            Move.objects.create(
+                game=self.game, game_round=self.game_round, player=player, move=move
+            )
+        GameRound.objects.filter(pk=self.game_round.pk).update(
+            move_count=2, winner=self.player_one
+        )
+        Game.objects.filter(pk=self.game.pk).update(status=GameStatusChoices.FINISHED)
+        rounds_url = reverse("game-rounds", kwargs={"pk": self.game.id})
+        moves_url = reverse("game-moves", kwargs={"pk": self.game.id})
+        etag = self.client.get(rounds_url)["ETag"]
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            GAME_ARCHIVE_DIR=directory
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                archive_batch([self.game.id], directory)
+            response = self.client.get(rounds_url, HTTP_IF_NONE_MATCH=etag)
+            moves = self.client.get(moves_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (game_round["round_number"], game_round["winner"])
+                for game_round in response.data
+            ],
+            [(1, self.player_one.id)],
+        )
+        self.assertEqual(
+            [(move["player"], move["move"]) for move in moves.data],
+            [(self.player_one.id, 1), (self.player_two.id, 3)],
+        )
+
 
 class HighScoreAPITestCase(APITestCase):
     """
@@ -107,6 +307,7 @@ class HighScoreAPITestCase(APITestCase):
         self.player_three = PlayerFactory(user=UserFactory(), games_won=333)
         self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user.auth_token}")
         self.game = Game.objects.create()
+        leaderboard.clear()
 
     def test_high_score(self):
         url = reverse("player-list")
@@ -131,3 +332,249 @@ class HighScoreAPITestCase(APITestCase):
         self.assertEqual(
             self.player_one.games_won, response.data["results"][2]["games_won"]
         )
+
+    def test_high_score_top(self):
+        url = reverse("player-top")
+        response = self.client.get(url, {"count": 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(entry["rank"], entry["username"]) for entry in response.data],
+            [(1, self.player_three.user.username), (2, self.player_two.user.username)],
+        )
+
+    def test_high_score_top__count_is_clamped(self):
+        url = reverse("player-top")
+
+        for count, expected in (("-1", 1), ("0", 1), ("1000", 3)):
+            with self.subTest(count=count):
+                response = self.client.get(url, {"count": count})
+
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(response.data), expected)
+
+    def test_high_score_rank(self):
+        leaderboard.top(1)
+        self.client.credentials()
+        url = reverse("player-rank", kwargs={"pk": self.player_one.id})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rank"], 3)
+        self.assertEqual(response.data["games_won"], 3)
+
+    def test_high_score_rank__unknown_player(self):
+        leaderboard.top(1)
+        self.client.credentials()
+        url = reverse("player-rank", kwargs={"pk": self.game.id})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rank"], 4)
+        self.assertEqual(response.data["games_won"], 0)
+
+    def test_high_score_rank__invalid_id(self):
+        url = reverse("player-rank", kwargs={"pk": "not-an-id"})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PlayerViewSetTestCase(APITestCase):
+    """
+    Tests PlayerViewSet
+    """
+
+    def setUp(self):
+        self.player_one = PlayerFactory()
+        self.player_two = PlayerFactory()
+        self.game = GameFactory(
+            status=GameStatusChoices.IN_PROGRESS, next_move=None, rounds=2
+        )
+        self.game.player.add(self.player_one, self.player_two)
+        self.game.current_round = GameRoundFactory(game=self.game)
+        self.game.save()
+
+    def test_stats(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+        do_move(self.game, MoveChoices.Paper, self.player_two)
+        do_move(self.game, MoveChoices.Spock, self.player_one)
+        do_move(self.game, MoveChoices.Spock, self.player_two)
+        url = reverse("players-stats", kwargs={"pk": self.player_two.id})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["username"], self.player_two.user.username)
+        self.assertEqual(response.data["games_played"], 1)
+        self.assertEqual(response.data["games_won"], 1)
+        self.assertEqual(response.data["games_lost"], 0)
+        self.assertEqual(response.data["win_rate"], 1.0)
+        self.assertEqual(response.data["rounds"], {"played": 2, "won": 1, "tied": 1})
+        self.assertEqual(
+            response.data["moves"],
+            {"rock": 0, "paper": 1, "scissors": 0, "lizard": 0, "spock": 1},
+        )
+        self.assertEqual(len(response.data["head_to_head"]), 1)
+        self.assertEqual(
+            response.data["head_to_head"][0]["opponent"], self.player_one.id
+        )
+        self.assertEqual(response.data["head_to_head"][0]["rounds_won"], 1)
+
+    def test_stats__no_games(self):
+        url = reverse("players-stats", kwargs={"pk": self.player_one.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["win_rate"], 0.0)
+        self.assertEqual(response.data["rounds"], {"played": 0, "won": 0, "tied": 0})
+        self.assertEqual(response.data["head_to_head"], [])
+
+    def test_stats__unknown_player(self):
+        for pk in (self.game.id, "unknown"):
+            response = self.client.get(reverse("players-stats", kwargs={"pk": pk}))
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MatchmakingAPITestCase(APITestCase):
+    """
+    Tests MatchmakingAPI
+    """
+
+    def setUp(self):
+        get_matchmaking_queue.cache_clear()
+        self.user_one = UserFactory()
+        self.user_two = UserFactory()
+        self.url = reverse("matchmaking-list")
+
+    def _login(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {user.auth_token}")
+
+    def test_matchmaking(self):
+        self._login(self.user_one)
+        response = self.client.post(self.url, {"rounds": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        self._login(self.user_two)
+        response = self.client.post(self.url, {"rounds": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        game = Game.objects.select_related("current_round").get(
+            pk=response.data["game"]
+        )
+        self.assertEqual(game.rounds, 3)
+        self.assertEqual(game.status, GameStatusChoices.IN_PROGRESS)
+        self.assertEqual(game.current_round.round_number, 1)
+        self.assertEqual(
+            set(game.player.values_list("user__username", flat=True)),
+            {self.user_one.username, self.user_two.username},
+        )
+
+        self._login(self.user_one)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(str(response.data["game"]), str(game.id))
+
+    def test_matchmaking__different_rounds(self):
+        self._login(self.user_one)
+        self.client.post(self.url, {"rounds": 1})
+        self._login(self.user_two)
+        response = self.client.post(self.url, {"rounds": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Game.objects.exists())
+
+    def test_matchmaking__invalid_rounds(self):
+        self._login(self.user_one)
+        response = self.client.post(self.url, {"rounds": 0})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_matchmaking__cancel(self):
+        self._login(self.user_one)
+        self.client.post(self.url, {})
+        response = self.client.post(reverse("matchmaking-cancel"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Player.objects.count(), 1)
+
+
+class TournamentViewSetTestCase(APITestCase):
+    """
+    Tests TournamentViewSet
+    """
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.admin = UserFactory(is_staff=True)
+        self.tournament = TournamentFactory(rounds=3)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.user.auth_token}")
+
+    def test_create_tournament(self):
+        response = self.client.post(
+            reverse("tournament-list"), {"name": "Cup", "rounds": 1, "status": 3}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        tournament = Tournament.objects.get(pk=response.data["id"])
+        self.assertEqual(tournament.name, "Cup")
+        self.assertEqual(tournament.status, GameStatusChoices.WAITING_FOR_PLAYER)
+
+    def test_join_and_start_tournament(self):
+        url = reverse("tournament-join", kwargs={"pk": self.tournament.pk})
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.tournament.player.add(PlayerFactory())
+        start_url = reverse("tournament-start", kwargs={"pk": self.tournament.pk})
+        response = self.client.post(start_url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.admin.auth_token}")
+        response = self.client.post(start_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(
+            reverse("tournament-detail", kwargs={"pk": self.tournament.pk})
+        )
+
+        self.assertEqual(response.data["status"], GameStatusChoices.IN_PROGRESS)
+        self.assertEqual(response.data["stage"], 1)
+        self.assertEqual(len(response.data["player"]), 2)
+
+        response = self.client.get(
+            reverse("tournament-games", kwargs={"pk": self.tournament.pk}),
+            {"stage": 1},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (game,) = response.json()
+        self.assertEqual(game["tournament"], str(self.tournament.pk))
+        self.assertEqual((game["stage"], game["position"], game["rounds"]), (1, 0, 3))
+
+    def test_tournament_games__invalid_stage(self):
+        response = self.client.get(
+            reverse("tournament-games", kwargs={"pk": self.tournament.pk}),
+            {"stage": "first"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
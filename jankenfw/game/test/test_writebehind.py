@@ -0,0 +1,222 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jankenfw.game.enum import GameStatusChoices, MoveChoices
+from jankenfw.game.models import Move
+from jankenfw.game.services import do_move
+from jankenfw.game.state import GameState, get_game_state, get_game_state_cache
+from jankenfw.game.test.factories import (
+    GameFactory,
+    GameRoundFactory,
+    PlayerFactory,
+    TournamentFactory,
+)
+from jankenfw.game.writebehind import WriteBehind
+
+
+@override_settings(GAME_WRITE_BEHIND=True)
+class WriteBehindTestCase(TestCase):
+    def setUp(self):
+        get_game_state_cache().clear()
+        self.player_one = PlayerFactory()
+        self.player_two = PlayerFactory()
+        self.game = GameFactory(
+            status=GameStatusChoices.IN_PROGRESS, next_move=None, rounds=2
+        )
+        self.game.player.add(self.player_one, self.player_two)
+        self.game.current_round = GameRoundFactory(game=self.game, round_number=1)
+        self.game.save()
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "moves.journal")
+        self.write_behind = WriteBehind(self.path)
+        patcher = mock.patch(
+            "jankenfw.game.services.get_write_behind", return_value=self.write_behind
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def play(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+        do_move(self.game, MoveChoices.Scissors, self.player_two)
+        do_move(self.game, MoveChoices.Spock, self.player_two)
+        return do_move(self.game, MoveChoices.Lizard, self.player_one)
+
+    def assert_game_written(self):
+        self.game.refresh_from_db()
+        self.player_one.refresh_from_db()
+        self.assertEqual(self.game.status, GameStatusChoices.FINISHED)
+        self.assertEqual(self.game.version, 4)
+        self.assertEqual(self.game.current_round.round_number, 2)
+        self.assertEqual(self.player_one.games_won, 1)
+        self.assertEqual(self.player_one.rounds_won, 2)
+        self.assertEqual(self.player_one.games_played, 1)
+        self.assertEqual(
+            list(
+                self.game.game_round.order_by("round_number").values_list(
+                    "move_count", "winner"
+                )
+            ),
+            [(2, self.player_one.id), (2, self.player_one.id)],
+        )
+        self.assertEqual(Move.objects.filter(game=self.game).count(), 4)
+
+    def test_tournament_advances_on_flush(self):
+        tournament = TournamentFactory(
+            status=GameStatusChoices.IN_PROGRESS, stage=1, rounds=2
+        )
+        tournament.player.add(self.player_one, self.player_two)
+        self.game.tournament, self.game.stage, self.game.position = tournament, 1, 0
+        self.game.save()
+
+        self.play()
+        tournament.refresh_from_db()
+
+        self.assertEqual(tournament.status, GameStatusChoices.IN_PROGRESS)
+
+        self.write_behind.flush()
+        tournament.refresh_from_db()
+        self.game.refresh_from_db()
+
+        self.assertEqual(tournament.status, GameStatusChoices.FINISHED)
+        self.assertEqual(tournament.winner, self.player_one)
+        self.assertEqual(self.game.winner, self.player_one)
+
+    @override_settings(GAME_BOT_WORKERS=0)
+    def test_bot_answers_moves(self):
+        self.player_two.bot = "random"
+        self.player_two.save()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = do_move(self.game, MoveChoices.Rock, self.player_one)
+        self.assertIsNone(result)
+
+        # The bot answered, so the next move starts the second round
+        self.assertEqual(
+            self.write_behind.move(
+                self.game.id, self.player_one.id, MoveChoices.Rock
+            ).result.round_number,
+            2,
+        )
+
+    def test_moves_are_written_later(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+
+        # The game is loaded by the first move only
+        with self.assertNumQueries(0):
+            result = do_move(self.game, MoveChoices.Scissors, self.player_two)
+            self.assertEqual(result["status"], f"1 round winner is {self.player_one}")
+            do_move(self.game, MoveChoices.Spock, self.player_two)
+            result = do_move(self.game, MoveChoices.Lizard, self.player_one)
+
+        self.assertEqual(
+            result["status"],
+            f"Game winner is {self.player_one}. Total rounds won 2. Total games won 1",
+        )
+        self.assertFalse(Move.objects.filter(game=self.game).exists())
+
+        self.assertEqual(self.write_behind.flush(), 14)
+        self.assert_game_written()
+        self.assertEqual(self.write_behind.pending(), 0)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_state_matches_written_game(self):
+        get_game_state(self.game.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.play()
+        self.write_behind.flush()
+        self.player_one.refresh_from_db()
+        self.player_two.refresh_from_db()
+
+        self.assertEqual(
+            get_game_state_cache().get(self.game.id), GameState.load(self.game.id)
+        )
+
+    def test_errors(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+        result = do_move(self.game, MoveChoices.Rock, self.player_one)
+
+        self.assertEqual(result["error"], "It's not your move.")
+
+        result = do_move(self.game, MoveChoices.Rock, PlayerFactory())
+
+        self.assertEqual(result["error"], "You are not a player in this game.")
+
+        self.play()
+        result = do_move(self.game, MoveChoices.Rock, self.player_two)
+
+        self.assertEqual(result["error"], "This game is finished.")
+
+    def test_waiting_game_isnt_kept(self):
+        self.game.status = GameStatusChoices.WAITING_FOR_PLAYER
+        self.game.save()
+
+        result = do_move(self.game, MoveChoices.Rock, self.player_one)
+
+        self.assertEqual(result["error"], "Waiting for players.")
+        self.assertEqual(self.write_behind.pending(), 0)
+
+    def test_replay(self):
+        self.play()
+
+        # The next process replays the journal of the crashed one
+        self.assertEqual(WriteBehind(self.path).replay(), 14)
+        self.assert_game_written()
+
+        # Writing the same entries again doesn't count the game twice
+        self.write_behind.flush()
+        self.assert_game_written()
+
+    def test_moves_keep_their_time(self):
+        started = timezone.now()
+        self.play()
+        played = timezone.now()
+
+        WriteBehind(self.path).replay()
+
+        moves = Move.objects.filter(game=self.game).order_by("created_at")
+        self.assertEqual(
+            list(moves.values_list("move", flat=True)),
+            [
+                MoveChoices.Rock,
+                MoveChoices.Scissors,
+                MoveChoices.Spock,
+                MoveChoices.Lizard,
+            ],
+        )
+        for created_at in moves.values_list("created_at", flat=True):
+            self.assertTrue(started <= created_at <= played)
+
+    def test_flush__failed(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+
+        with mock.patch(
+            "jankenfw.game.writebehind.write_entries", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.write_behind.flush()
+
+        do_move(self.game, MoveChoices.Paper, self.player_two)
+
+        self.assertEqual(self.write_behind.pending(), 7)
+        with open(self.path) as journal:
+            self.assertEqual(len(journal.readlines()), 7)
+
+        self.write_behind.flush()
+        self.assertEqual(Move.objects.filter(game=self.game).count(), 2)
+
+    def test_replay_command(self):
+        do_move(self.game, MoveChoices.Rock, self.player_one)
+        out = StringIO()
+
+        call_command("replay_write_behind", journal=self.path, stdout=out)
+
+        self.assertEqual(out.getvalue(), "Replayed 3 journal entries.\n")
+        self.assertEqual(Move.objects.filter(game=self.game).count(), 1)
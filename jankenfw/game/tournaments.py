@@ -0,0 +1,228 @@
+"""
+Tournaments of players, played as stages of games.
+
+All games of a stage are created at once and played concurrently. When a game
+of a tournament finishes, 'advance_tournament' is called in the same transaction:
+once every game of the stage is finished it creates the games of the next stage
+or finishes the tournament.
+
+In a single elimination tournament the winners of a stage play the next one and
+a tied game is replayed at the same position of the stage. In a round-robin
+tournament every player plays every other player once and the player with the
+most games won wins the tournament, there is no winner if it's a tie.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from django.db import transaction
+
+from jankenfw.game.brackets import (
+    elimination_pairs,
+    round_robin_pairs,
+    round_robin_stages,
+)
+from jankenfw.game.enum import GameStatusChoices, TournamentFormatChoices
+from jankenfw.game.models import Game, GameRound, Player, Tournament
+
+WAITING_FOR_PLAYER = GameStatusChoices.WAITING_FOR_PLAYER
+IN_PROGRESS = GameStatusChoices.IN_PROGRESS
+FINISHED = GameStatusChoices.FINISHED
+
+
+@transaction.atomic
+def join_tournament(tournament: Tournament, player: Player) -> Dict:
+    """
+    Add a player to the provided tournament.
+
+    Return an error if:
+        - the tournament already started
+        - a player already joined the tournament
+    """
+
+    status = (
+        Tournament.objects.select_for_update()
+        .values_list("status", flat=True)
+        .get(pk=tournament.pk)
+    )
+    if status != WAITING_FOR_PLAYER:
+        return {"error": "This tournament has already started."}
+    if Tournament.player.through.objects.filter(
+        tournament=tournament, player=player
+    ).exists():
+        return {"error": "You have already joined this tournament."}
+
+    tournament.player.add(player)
+
+    return {"status": "You joined the tournament."}
+
+
+@transaction.atomic
+def start_tournament(tournament: Tournament) -> Dict:
+    """
+    Start the tournament with the players who joined it and create the games of
+    its first stage.
+
+    Return an error if:
+        - the tournament already started
+        - less than two players joined the tournament
+    """
+
+    locked = Tournament.objects.select_for_update().get(pk=tournament.pk)
+    if locked.status != WAITING_FOR_PLAYER:
+        return {"error": "This tournament has already started."}
+
+    players = _players(locked)
+    if len(players) < 2:
+        return {"error": "At least two players have to join the tournament."}
+
+    locked.status = IN_PROGRESS
+    _start_stage(locked, 1, players)
+    tournament.status, tournament.stage = locked.status, locked.stage
+
+    return {"status": "The tournament started."}
+
+
+@transaction.atomic
+def advance_tournament(tournament_id: UUID) -> bool:
+    """
+    Start the next stage of the tournament or finish it, if every game of its
+    current stage is finished.
+
+    The tournament row is locked, so the last two games of a stage finishing at
+    the same time advance the tournament once. Return whether the tournament
+    changed.
+    """
+
+    tournament = Tournament.objects.select_for_update().get(pk=tournament_id)
+    if tournament.status != IN_PROGRESS:
+        return False
+
+    games = list(
+        Game.objects.filter(tournament=tournament, stage=tournament.stage)
+        .order_by("position", "created_at")
+        .values_list("id", "position", "status", "winner_id")
+    )
+    if any(status != FINISHED for _, _, status, _ in games):
+        return False
+
+    if tournament.format == TournamentFormatChoices.ROUND_ROBIN:
+        players = _players(tournament)
+        if tournament.stage < round_robin_stages(len(players)):
+            _start_stage(tournament, tournament.stage + 1, players)
+        else:
+            _finish(tournament, _most_games_won(tournament))
+        return True
+
+    winners, tied = {}, {}
+    for game_id, position, _, winner_id in games:
+        if winner_id is None:
+            tied[position] = game_id
+        else:
+            winners[position] = winner_id
+
+    replays = {
+        position: game_id
+        for position, game_id in tied.items()
+        if position not in winners
+    }
+    if replays:
+        pairs = defaultdict(list)
+        for game_id, player_id in (
+            Game.player.through.objects.filter(game_id__in=replays.values())
+            .order_by("id")
+            .values_list("game_id", "player_id")
+        ):
+            pairs[game_id].append(player_id)
+        _create_games(
+            tournament,
+            ((position, pairs[game_id]) for position, game_id in replays.items()),
+        )
+        return True
+
+    # The player with a bye goes first, so the bye moves to another player.
+    entrants = [winners[position] for position in sorted(winners)]
+    if tournament.bye_id is not None:
+        entrants.insert(0, tournament.bye_id)
+
+    if len(entrants) == 1:
+        _finish(tournament, entrants[0])
+    else:
+        _start_stage(tournament, tournament.stage + 1, entrants)
+    return True
+
+
+def _players(tournament: Tournament) -> List[UUID]:
+    """
+    Return the ids of the players of the tournament in the order they joined.
+    """
+
+    return list(
+        Tournament.player.through.objects.filter(tournament=tournament)
+        .order_by("id")
+        .values_list("player_id", flat=True)
+    )
+
+
+def _start_stage(tournament: Tournament, stage: int, entrants: Sequence[UUID]) -> None:
+    if tournament.format == TournamentFormatChoices.ROUND_ROBIN:
+        pairs, bye = round_robin_pairs(entrants, stage)
+    else:
+        pairs, bye = elimination_pairs(entrants)
+
+    tournament.stage, tournament.bye_id = stage, bye
+    tournament.save(update_fields=["status", "stage", "bye", "updated_at"])
+    _create_games(tournament, enumerate(pairs))
+
+
+def _create_games(
+    tournament: Tournament, pairs: Iterable[Tuple[int, Sequence[UUID]]]
+) -> List[Game]:
+    """
+    Create in progress games with their first rounds for the paired players at
+    their positions of the current stage.
+
+    The games, their rounds and memberships are inserted by three queries,
+    whatever the number of games.
+    """
+
+    games, game_rounds, memberships = [], [], []
+    for position, player_ids in pairs:
+        game = Game(
+            rounds=tournament.rounds,
+            status=IN_PROGRESS,
+            tournament=tournament,
+            stage=tournament.stage,
+            position=position,
+        )
+        game.current_round = GameRound(game=game)
+        games.append(game)
+        game_rounds.append(game.current_round)
+        memberships.extend(
+            Game.player.through(game_id=game.id, player_id=player_id)
+            for player_id in player_ids
+        )
+
+    Game.objects.bulk_create(games)
+    GameRound.objects.bulk_create(game_rounds)
+    Game.player.through.objects.bulk_create(memberships)
+    return games
+
+
+def _most_games_won(tournament: Tournament) -> Optional[UUID]:
+    wins = Counter(
+        Game.objects.filter(tournament=tournament, winner__isnull=False).values_list(
+            "winner_id", flat=True
+        )
+    ).most_common(2)
+    if not wins or len(wins) > 1 and wins[0][1] == wins[1][1]:
+        return None
+    return wins[0][0]
+
+
+def _finish(tournament: Tournament, winner_id: Optional[UUID]) -> None:
+    tournament.status = FINISHED
+    tournament.winner_id = winner_id
+    tournament.bye_id = None
+    tournament.save(update_fields=["status", "winner", "bye", "updated_at"])
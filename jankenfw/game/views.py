@@ -1,17 +1,57 @@
+from typing import Callable, List
 from uuid import UUID
 
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 
-from jankenfw.game.models import Game, Player, GameRound
+from jankenfw.game.analytics import analytics
+from jankenfw.game.archive import ArchivedRound, MoveArchive
+from jankenfw.game.bots import get_bot_player
+from jankenfw.game.export import CONTENT_TYPES, export_lines, filter_games
+from jankenfw.game.leaderboard import leaderboard
+from jankenfw.game.models import Game, Player, GameRound, Matchup, Move, Tournament
+from jankenfw.game.pagination import GamePagination, HighScorePagination
 from jankenfw.game.serializers import (
+    BotSerializer,
+    ExportSerializer,
     GameSerializer,
+    GameRoundSerializer,
+    EmbeddedGameSerializer,
     MoveSerializer,
     PlayerHighScoreSerializer,
+    MatchmakingSerializer,
+    PlayerStatsSerializer,
+    TournamentSerializer,
+    game_values,
+    high_score_values,
 )
-from jankenfw.game.services import join_game, _is_game_active, do_move
+from jankenfw.game.state import (
+    get_game_state,
+    reload_game_state,
+)
+from jankenfw.game.services import (
+    join_game,
+    _can_move,
+    do_move,
+    find_match,
+    get_match,
+    cancel_match,
+)
+from jankenfw.game.tournaments import join_tournament, start_tournament
+from libs.renderers import ORJSONRenderer
+
+
+def _archived_rounds(game_id: UUID) -> List[ArchivedRound]:
+    return MoveArchive().game_rounds([game_id]).get(game_id, [])
 
 
 class GameViewSet(
@@ -23,6 +63,181 @@ class GameViewSet(
     queryset = Game.objects.all()
     serializer_class = GameSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = GamePagination
+    renderer_classes = (ORJSONRenderer, BrowsableAPIRenderer)
+
+    def is_embedded(self) -> bool:
+        """
+        Players, the current round number and round winners are embedded in listed
+        and retrieved games with the 'embed=true' query parameter.
+        """
+
+        return self.action in ("list", "retrieve") and self.request.query_params.get(
+            "embed"
+        ) in ("1", "true")
+
+    def get_queryset(self):
+        """
+        Fetch the related objects of embedded games in a constant number of queries.
+        Other listed and retrieved games are serialized from the values of the rows.
+        """
+
+        queryset = super().get_queryset()
+
+        if self.is_embedded():
+            return queryset.select_related("current_round").prefetch_related(
+                Prefetch(
+                    "player",
+                    queryset=Player.objects.select_related("user").order_by("id"),
+                ),
+                Prefetch(
+                    "game_round",
+                    queryset=GameRound.objects.filter(move_count__gte=2).order_by(
+                        "round_number"
+                    ),
+                    to_attr="finished_rounds",
+                ),
+            )
+        if self.action in ("list", "retrieve"):
+            return game_values.values(queryset)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.is_embedded():
+            return EmbeddedGameSerializer
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs) -> Response:
+        if self.is_embedded():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(game_values.many(queryset))
+        return self.get_paginated_response(game_values.many(page))
+
+    def conditional_response(self, build_response: Callable) -> HttpResponseBase:
+        """
+        Return 304 if the client sent the ETag or Last-Modified of the current version
+        of the game, otherwise the built response. Only the version stamp of the game
+        and whether it is archived are fetched to check it.
+
+        The ETag changes with every change of the game, Last-Modified has a resolution
+        of one second.
+        """
+
+        try:
+            version, updated_at, archived_at = Game.objects.values_list(
+                "version", "updated_at", "archived_at"
+            ).get(pk=self.kwargs["pk"])
+        except (Game.DoesNotExist, ValueError, ValidationError):
+            raise Http404
+        self.archived = archived_at is not None
+
+        etag = quote_etag(f"{self.kwargs['pk']}.{version}")
+        last_modified = int(updated_at.timestamp())
+
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = build_response()
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def retrieve(self, request, *args, **kwargs) -> HttpResponseBase:
+        if self.is_embedded():
+            return self.conditional_response(
+                lambda: super(GameViewSet, self).retrieve(request, *args, **kwargs)
+            )
+
+        return self.conditional_response(
+            lambda: Response(game_values.to_representation(self.get_object()))
+        )
+
+    @action(detail=True, serializer_class=GameRoundSerializer)
+    def rounds(self, request, pk: UUID) -> HttpResponseBase:
+        """
+        Return the rounds of the game, supports conditional requests like the game.
+
+        The rounds of an archived game are read from the archive, they have no id
+        and no times.
+        """
+
+        def build_response():
+            if self.archived:
+                game_rounds = [
+                    GameRound(
+                        id=None,
+                        game_id=pk,
+                        round_number=round_number,
+                        move_count=len(moves),
+                        winner_id=winner_id,
+                    )
+                    for round_number, moves, winner_id in _archived_rounds(UUID(pk))
+                ]
+            else:
+                game_rounds = GameRound.objects.filter(game_id=pk).order_by(
+                    "round_number"
+                )
+            return Response(self.get_serializer(game_rounds, many=True).data)
+
+        return self.conditional_response(build_response)
+
+    @action(detail=True, serializer_class=MoveSerializer)
+    def moves(self, request, pk: UUID) -> HttpResponseBase:
+        """
+        Return the moves of the finished rounds of the game, supports conditional
+        requests like the game.
+
+        The move of an unfinished round isn't revealed to the opponent. The moves of
+        an archived game are read from the archive, they have no id, round and time.
+        """
+
+        def build_response():
+            if self.archived:
+                moves = [
+                    Move(id=None, game_id=pk, player_id=player_id, move=move)
+                    for _, round_moves, _ in _archived_rounds(UUID(pk))
+                    for player_id, move in round_moves
+                ]
+            else:
+                moves = Move.objects.filter(
+                    game_id=pk, game_round__move_count__gte=2
+                ).order_by("created_at")
+            return Response(self.get_serializer(moves, many=True).data)
+
+        return self.conditional_response(build_response)
+
+    @action(detail=False, permission_classes=(IsAdminUser,))
+    def export(self, request) -> HttpResponseBase:
+        """
+        Stream the games with their rounds and moves as NDJSON or CSV.
+
+        The 'output' query parameter selects the format, 'status', 'since' and
+        'until' filter the games by status and creation time. The games are read
+        in chunks with a server-side cursor, so the memory used is constant.
+        """
+
+        sz = ExportSerializer(data=request.query_params)
+        if not sz.is_valid():
+            return Response(sz.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        options = sz.validated_data
+        games = filter_games(
+            options.get("status"), options.get("since"), options.get("until")
+        )
+        output = options["output"]
+        response = StreamingHttpResponse(
+            export_lines(games, output, options["chunk_size"]),
+            content_type=CONTENT_TYPES[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="games.{output}"'
+        return response
 
     def perform_create(self, serializer: GameSerializer) -> None:
         """
@@ -30,7 +245,8 @@ class GameViewSet(
         """
 
         game = serializer.save()
-        GameRound.objects.create(game=game)
+        game.current_round = GameRound.objects.create(game=game)
+        game.save(update_fields=["current_round", "updated_at"])
 
     @action(detail=True, methods=["post"])
     def join(self, request, pk: UUID) -> Response:
@@ -53,33 +269,68 @@ class GameViewSet(
 
         return Response(sz.data)
 
+    @action(detail=True, methods=["post"], serializer_class=BotSerializer)
+    def bot(self, request, pk: UUID) -> Response:
+        """
+        Add the bot player of the provided strategy to the game with 'join_game'.
+        The bot answers every move of its opponent.
+
+        Return 400 for an unknown strategy or if 'join_game' returns any error.
+        """
+
+        game = self.get_object()
+        sz = self.get_serializer(data=request.data)
+        if not sz.is_valid():
+            return Response(sz.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        result = join_game(game, get_bot_player(sz.validated_data["strategy"]))
+
+        if "error" in result:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(GameSerializer(game).data)
+
     @action(detail=True, methods=["post"], serializer_class=MoveSerializer)
     def move(self, request, pk: UUID) -> Response:
         """
         For active game nad valid move call 'do_move' function to create a Move object.
 
+        The game and whose move it is are checked with the cached state of the game.
+        The cached state may be stale, so a move it rejects is checked again with
+        the state loaded from the database.
+
         Return 400 for in case of invalid move.
         """
 
-        game = self.get_object()
+        try:
+            state = get_game_state(UUID(pk))
+        except ValueError:
+            state = None
+        if state is None:
+            raise Http404
 
-        result = _is_game_active(game)
+        result = _can_move(state, request.user.id)
+        if "error" in result:
+            state = reload_game_state(state.id)
+            if state is None:
+                raise Http404
+            result = _can_move(state, request.user.id)
         if "error" in result:
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
 
-        player = Player.objects.get(user=request.user)
-        if game.next_move and game.next_move != player:
-            return Response(
-                {"error": "It's not your move."}, status=status.HTTP_400_BAD_REQUEST
-            )
-
         sz = self.get_serializer(data=request.data)
         if not sz.is_valid():
             return Response(sz.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        player = Player.objects.get(user=request.user)
+        # 'do_move' locks and reloads the game row.
+        game = Game(pk=state.id)
+
         move = sz.validated_data["move"]
 
         result = do_move(game=game, move=move, player=player)
+        if result and "error" in result:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
         if result:
             return Response(result)
         return Response(sz.validated_data)
@@ -90,6 +341,234 @@ class HighScoreAPI(mixins.ListModelMixin, viewsets.GenericViewSet):
     API for providing a high score list of all players ordered by games_won value.
     """
 
-    queryset = Player.objects.order_by("-games_won")
+    queryset = Player.objects.select_related("user").order_by("-games_won")
     serializer_class = PlayerHighScoreSerializer
     permission_classes = (AllowAny,)
+    pagination_class = HighScorePagination
+    renderer_classes = (ORJSONRenderer, BrowsableAPIRenderer)
+
+    def list(self, request) -> Response:
+        """
+        Return the high score list serialized from the values of the rows.
+        """
+
+        queryset = high_score_values.values(self.get_queryset(), "games_won")
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(high_score_values.many(queryset))
+        return self.get_paginated_response(high_score_values.many(page))
+
+    @action(detail=False)
+    def top(self, request) -> Response:
+        """
+        Return the best players from the in-memory leaderboard.
+
+        The number of players is set with the 'count' query parameter (10 by default,
+        at least 1 and 100 at most).
+        """
+
+        try:
+            count = max(1, min(int(request.query_params.get("count", 10)), 100))
+        except ValueError:
+            return Response(
+                {"error": "Count has to be a number."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(leaderboard.top(count))
+
+    @action(detail=True)
+    def rank(self, request, pk: UUID) -> Response:
+        """
+        Return the rank of the player from the in-memory leaderboard, a player who
+        isn't in it yet has no won games.
+
+        Return 404 for an invalid player id.
+        """
+
+        try:
+            player_id = UUID(pk)
+        except ValueError:
+            return Response(
+                {"error": "Player not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(leaderboard.rank(player_id))
+
+
+class PlayerViewSet(viewsets.GenericViewSet):
+    """
+    API for providing the statistics of players.
+    """
+
+    queryset = Player.objects.select_related("user", "stats")
+    serializer_class = PlayerStatsSerializer
+    permission_classes = (AllowAny,)
+
+    # Number of the most played opponents in the head-to-head records
+    head_to_head_limit = 20
+
+    @action(detail=True)
+    def stats(self, request, pk: UUID) -> Response:
+        """
+        Return the win rate, the rounds, the move distribution and the head-to-head
+        records of the player.
+
+        The statistics are read from the counters updated when rounds and games
+        finish, so it takes two queries whatever the number of games played.
+        """
+
+        player = self.get_object()
+        matchups = (
+            Matchup.objects.filter(player=player)
+            .select_related("opponent__user")
+            .order_by("-games_played", "opponent")[: self.head_to_head_limit]
+        )
+        serializer = self.get_serializer(
+            player, context={**self.get_serializer_context(), "matchups": matchups}
+        )
+        return Response(serializer.data)
+
+
+class MatchmakingAPI(viewsets.ViewSet):
+    """
+    API for pairing players waiting for an opponent into new games.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = MatchmakingSerializer
+
+    def create(self, request) -> Response:
+        """
+        Find an opponent who wants to play the same number of rounds.
+
+        Return 201 with the id of the new game if an opponent was waiting,
+        otherwise queue the player and return 202.
+        """
+
+        sz = MatchmakingSerializer(data=request.data)
+        if not sz.is_valid():
+            return Response(sz.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        player, _ = Player.objects.get_or_create(user=request.user)
+        result = find_match(player, sz.validated_data["rounds"])
+
+        if "game" in result:
+            return Response(result, status=status.HTTP_201_CREATED)
+        return Response(result, status=status.HTTP_202_ACCEPTED)
+
+    def list(self, request) -> Response:
+        """
+        Return the game found for the queued player.
+
+        Return 404 if the player isn't waiting for an opponent.
+        """
+
+        player, _ = Player.objects.get_or_create(user=request.user)
+        result = get_match(player)
+
+        if "error" in result:
+            return Response(result, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+    @action(detail=False, methods=["post"])
+    def cancel(self, request) -> Response:
+        """
+        Leave the matchmaking queue.
+
+        Return 404 if the player isn't waiting for an opponent.
+        """
+
+        player, _ = Player.objects.get_or_create(user=request.user)
+        result = cancel_match(player)
+
+        if "error" in result:
+            return Response(result, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+
+class TournamentViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    API for creating, joining and following tournaments.
+    """
+
+    queryset = Tournament.objects.prefetch_related("player").order_by("-created_at")
+    serializer_class = TournamentSerializer
+    permission_classes = (IsAuthenticated,)
+
+    @action(detail=True, methods=["post"])
+    def join(self, request, pk: UUID) -> Response:
+        """
+        Add the player of the user to the tournament.
+
+        Return 400 if 'join_tournament' function returns any error.
+        """
+
+        tournament = self.get_object()
+        player, _ = Player.objects.get_or_create(user=request.user)
+
+        result = join_tournament(tournament, player)
+
+        if "error" in result:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @action(detail=True, methods=["post"], permission_classes=(IsAdminUser,))
+    def start(self, request, pk: UUID) -> Response:
+        """
+        Start the tournament and create the games of its first stage.
+
+        Return 400 if 'start_tournament' function returns any error.
+        """
+
+        result = start_tournament(self.get_object())
+
+        if "error" in result:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @action(detail=True, serializer_class=GameSerializer)
+    def games(self, request, pk: UUID) -> Response:
+        """
+        Return the games of the tournament ordered by stage and position, only the
+        games of one stage with the 'stage' query parameter.
+        """
+
+        tournament = self.get_object()
+        games = Game.objects.filter(tournament=tournament)
+
+        stage = request.query_params.get("stage")
+        if stage is not None:
+            if not stage.isdigit():
+                return Response(
+                    {"error": "Stage has to be a number."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            games = games.filter(stage=int(stage))
+
+        games = game_values.values(games.order_by("stage", "position", "created_at"))
+        return Response(game_values.many(games))
+
+
+class AnalyticsAPI(viewsets.ViewSet):
+    """
+    Read-only API for the move analytics of all games.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    def list(self, request) -> Response:
+        """
+        Return the move frequencies, the tie rate and the moves played after a won,
+        tied or lost round.
+
+        The statistics are computed from the moves and the archive at most once
+        every 'ANALYTICS_TTL' seconds.
+        """
+
+        return Response(analytics.report())
@@ -0,0 +1,584 @@
+"""
+Write-behind persistence of moves.
+
+With the 'GAME_WRITE_BEHIND' setting the games being played are kept in the
+memory of the process as LiveGames, which are the authority on moves. A move is
+applied to the LiveGame and appended to a journal, the response doesn't wait
+for the database. A worker thread flushes the journal in batches at most
+'GAME_WRITE_BEHIND_DELAY' seconds later:
+
+    - new Move and GameRound rows are inserted with 'bulk_create'
+    - GameRound and Game rows get their latest values with 'bulk_update'
+    - the counters and statistics of the players of finished rounds and games
+      are incremented
+    - tournaments of finished games advance to their next stage
+
+The journal is written to the 'GAME_WRITE_BEHIND_JOURNAL' file, if set, and
+replayed when the process starts again, so moves that weren't flushed before a
+crash are not lost. Every entry can be flushed more than once with the same
+result. Moves of a game must be sent to a single process, e.g. by routing on
+the id of the game.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from jankenfw.game.engine import FINISHED, IN_PROGRESS, LiveGame, MoveResult
+from jankenfw.game.models import Game, GameRound, Move, Player
+from jankenfw.game.stats import count_finished_game, count_rounds
+from jankenfw.game.tournaments import advance_tournament
+from libs.ids import generate_id
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedGame:
+    """
+    A game played in write-behind mode: the LiveGame and the ids of the rows it
+    is persisted to.
+    """
+
+    __slots__ = (
+        "id",
+        "live",
+        "version",
+        "round_id",
+        "usernames",
+        "games_won",
+        "tournament_id",
+        "bots",
+    )
+
+    def __init__(
+        self,
+        id: UUID,
+        live: LiveGame,
+        version: int,
+        round_id: Optional[UUID],
+        usernames: Dict[UUID, Optional[str]],
+        games_won: Dict[UUID, int],
+        tournament_id: Optional[UUID] = None,
+        bots: Optional[Dict[UUID, str]] = None,
+    ) -> None:
+        self.id = id
+        self.live = live
+        self.version = version
+        # None when the next move starts a new round
+        self.round_id = round_id
+        self.usernames = usernames
+        self.games_won = games_won
+        self.tournament_id = tournament_id
+        # Strategies of the bot players of the game
+        self.bots = bots or {}
+
+    @classmethod
+    def load(cls, game_id: UUID) -> "BufferedGame":
+        """
+        Load the game from the database, raise Game.DoesNotExist for an unknown game.
+        """
+
+        game = Game.objects.select_related("current_round").get(pk=game_id)
+        players = list(
+            Player.objects.filter(game=game_id).select_related("user").order_by("id")
+        )
+        game_round = game.current_round or GameRound(game=game)
+
+        round_moves = []
+        if game_round.move_count == 1:
+            round_moves = list(
+                Move.objects.filter(game_round=game_round).values_list(
+                    "player_id", "move"
+                )
+            )
+        round_winners = (
+            GameRound.objects.filter(game_id=game_id, move_count__gte=2)
+            .order_by("round_number")
+            .values_list("winner_id", flat=True)
+        )
+
+        round_number = game_round.round_number
+        round_id = None if game_round._state.adding else game_round.id
+        # Rounds finished before the next round was started together with the result.
+        if game_round.move_count >= 2 and round_number < game.rounds:
+            round_number, round_id = round_number + 1, None
+
+        live = LiveGame(
+            game.rounds,
+            status=game.status,
+            players=[player.id for player in players],
+            next_move=game.next_move_id,
+            round_number=round_number,
+            round_moves=round_moves,
+            round_winners=round_winners,
+        )
+        return cls(
+            id=game.id,
+            live=live,
+            version=game.version,
+            round_id=round_id,
+            usernames={
+                player.id: (
+                    str(player)
+                    if player.bot
+                    else getattr(player.user, "username", None)
+                )
+                for player in players
+            },
+            games_won={player.id: player.games_won for player in players},
+            tournament_id=game.tournament_id,
+            bots={player.id: player.bot for player in players if player.bot},
+        )
+
+
+class BufferedMove:
+    """
+    Outcome of a move accepted in write-behind mode, taken while the game was locked.
+    """
+
+    __slots__ = (
+        "result",
+        "version",
+        "status",
+        "next_move",
+        "round_number",
+        "round_moves",
+        "usernames",
+        "games_won",
+        "bots",
+    )
+
+    def __init__(
+        self,
+        result: MoveResult,
+        version: int,
+        status: int,
+        next_move: Optional[UUID],
+        round_number: int,
+        round_moves: List[Tuple[UUID, int]],
+        usernames: Dict[UUID, Optional[str]],
+        games_won: int,
+        bots: Optional[Dict[UUID, str]] = None,
+    ) -> None:
+        self.result = result
+        self.version = version
+        self.status = status
+        self.next_move = next_move
+        # Number of the round the next move is made in
+        self.round_number = round_number
+        # (player id, move) of a finished round
+        self.round_moves = round_moves
+        self.usernames = usernames
+        # Games won by the winner of the game
+        self.games_won = games_won
+        self.bots = bots or {}
+
+
+class WriteBehind:
+    """
+    Games played in memory and the journal of their changes waiting to be flushed.
+
+    Journal entries are dicts with an 'op' key:
+
+        - 'move': a Move row to insert
+        - 'round': the values of a GameRound row, inserted if it doesn't exist
+        - 'game': the values of a Game row
+        - 'finished': a finished game, counted for its players once
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # Only one flush runs at a time
+        self._flush_lock = threading.Lock()
+        self._games: Dict[UUID, BufferedGame] = {}
+        self._pending: List[Dict] = []
+        self._journal = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def _flushing_path(self) -> str:
+        return f"{self.path}.flushing"
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def move(self, game_id: UUID, player_id: UUID, move: int) -> BufferedMove:
+        """
+        Apply the move to the game in memory and queue its rows.
+
+        Raise GameError if the rules don't allow the move and Game.DoesNotExist
+        for an unknown game.
+        """
+
+        with self._lock:
+            game = self._games.get(game_id)
+        if game is None:
+            loaded = BufferedGame.load(game_id)
+            # Only games in progress are kept, their status isn't changed elsewhere.
+            if loaded.live.status != IN_PROGRESS:
+                loaded.live.check_move(player_id)
+            with self._lock:
+                game = self._games.setdefault(game_id, loaded)
+
+        with self._lock:
+            live = game.live
+            round_moves = [
+                (live.players[seat], value) for seat, value in live.round_moves
+            ]
+            result = live.move(player_id, move)
+            round_moves.append((player_id, move))
+
+            if game.round_id is None:
+                game.round_id = generate_id()
+            entries = [
+                {
+                    "op": "move",
+                    "id": generate_id(),
+                    "game": game.id,
+                    "round": game.round_id,
+                    "player": player_id,
+                    "move": move,
+                    "created_at": timezone.now(),
+                },
+                {
+                    "op": "round",
+                    "id": game.round_id,
+                    "game": game.id,
+                    "number": result.round_number,
+                    "move_count": len(round_moves),
+                    "winner": result.round_winner,
+                },
+            ]
+
+            if result.round_finished and not result.game_finished:
+                game.round_id = generate_id()
+                entries.append(
+                    {
+                        "op": "round",
+                        "id": game.round_id,
+                        "game": game.id,
+                        "number": live.round_number,
+                        "move_count": 0,
+                        "winner": None,
+                    }
+                )
+
+            games_won = 0
+            if result.game_winner is not None:
+                game.games_won[result.game_winner] += 1
+                games_won = game.games_won[result.game_winner]
+            if result.game_finished:
+                entries.append(
+                    {
+                        "op": "finished",
+                        "game": game.id,
+                        "players": list(live.players),
+                        "rounds_won": live.wins(),
+                        "winner": result.game_winner,
+                        "tournament": game.tournament_id,
+                    }
+                )
+
+            game.version += 1
+            entries.append(
+                {
+                    "op": "game",
+                    "id": game.id,
+                    "status": live.status,
+                    "next_move": live.next_move,
+                    "round": game.round_id,
+                    "winner": result.game_winner,
+                    "version": game.version,
+                }
+            )
+            self._append(entries)
+            full = len(self._pending) >= settings.GAME_WRITE_BEHIND_BATCH_SIZE
+
+            buffered = BufferedMove(
+                result,
+                version=game.version,
+                status=live.status,
+                next_move=live.next_move,
+                round_number=live.round_number,
+                round_moves=round_moves if result.round_finished else [],
+                usernames=game.usernames,
+                games_won=games_won,
+                bots=game.bots,
+            )
+
+        if full:
+            self._wakeup.set()
+        return buffered
+
+    def _append(self, entries: List[Dict]) -> None:
+        self._pending.extend(entries)
+        if not self.path:
+            return
+
+        if self._journal is None:
+            self._journal = open(self.path, "a", encoding="utf-8")
+        self._journal.writelines(
+            json.dumps(entry, default=str) + "\n" for entry in entries
+        )
+        self._journal.flush()
+        if settings.GAME_WRITE_BEHIND_FSYNC:
+            os.fsync(self._journal.fileno())
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def flush(self) -> int:
+        """
+        Write the queued entries to the database and return their number.
+
+        If the flush fails the entries are queued again in front of the newer ones.
+        """
+
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if batch and self.path:
+                    self._close_journal()
+                    if os.path.exists(self.path):
+                        os.replace(self.path, self._flushing_path)
+
+            if not batch:
+                return 0
+
+            try:
+                write_entries(batch)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                    if self.path:
+                        self._close_journal()
+                        _prepend_file(self._flushing_path, self.path)
+                raise
+
+            if self.path and os.path.exists(self._flushing_path):
+                os.remove(self._flushing_path)
+            with self._lock:
+                self._evict_finished()
+            return len(batch)
+
+    def _evict_finished(self) -> None:
+        waiting = {entry["game"] for entry in self._pending}
+        for game_id, game in list(self._games.items()):
+            if game.live.status == FINISHED and game_id not in waiting:
+                del self._games[game_id]
+
+    def replay(self) -> int:
+        """
+        Flush the entries left in the journal by a previous run and return their
+        number, call it before any move is made.
+        """
+
+        if not self.path:
+            return 0
+
+        entries = []
+        for path in (self._flushing_path, self.path):
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as journal:
+                    entries.extend(json.loads(line) for line in journal if line.strip())
+
+        if entries:
+            write_entries(entries)
+        for path in (self._flushing_path, self.path):
+            if os.path.exists(path):
+                os.remove(path)
+        return len(entries)
+
+    def start(self) -> None:
+        """
+        Start the worker thread flushing the journal.
+        """
+
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="game-write-behind", daemon=True
+            )
+            self._worker.start()
+
+    def stop(self) -> None:
+        """
+        Stop the worker and flush the entries left.
+        """
+
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        self.flush()
+        with self._lock:
+            self._close_journal()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(settings.GAME_WRITE_BEHIND_DELAY)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception(
+                    "Flushing %s queued game changes failed.", self.pending()
+                )
+        connection.close()
+
+
+def _prepend_file(source: str, target: str) -> None:
+    """
+    Put the lines of the 'source' file before the lines of 'target' and remove it.
+    """
+
+    if not os.path.exists(source):
+        return
+    with open(source, encoding="utf-8") as first:
+        lines = first.read()
+    if os.path.exists(target):
+        with open(target, encoding="utf-8") as second:
+            lines += second.read()
+    with open(target, "w", encoding="utf-8") as journal:
+        journal.write(lines)
+    os.remove(source)
+
+
+def write_entries(entries: List[Dict]) -> None:
+    """
+    Write journal entries to the database in a single transaction.
+
+    Later values of a row replace earlier ones, rows that already exist aren't
+    inserted again and a finished round or game is counted only if it wasn't
+    finished in the database yet, so flushing the same entries twice has no effect.
+    """
+
+    now = timezone.now()
+    rounds, games, moves, finished = {}, {}, [], []
+    moved_at = []
+    for entry in entries:
+        op = entry["op"]
+        if op == "move":
+            moved_at.append(entry.get("created_at", now))
+            moves.append(
+                Move(
+                    id=entry["id"],
+                    game_id=entry["game"],
+                    game_round_id=entry["round"],
+                    player_id=entry["player"],
+                    move=entry["move"],
+                )
+            )
+        elif op == "round":
+            rounds[str(entry["id"])] = GameRound(
+                id=entry["id"],
+                game_id=entry["game"],
+                round_number=entry["number"],
+                move_count=entry["move_count"],
+                winner_id=entry["winner"],
+                updated_at=now,
+            )
+        elif op == "game":
+            games[str(entry["id"])] = Game(
+                id=entry["id"],
+                status=entry["status"],
+                next_move_id=entry["next_move"],
+                current_round_id=entry["round"],
+                winner_id=entry.get("winner"),
+                version=entry["version"],
+                updated_at=now,
+            )
+        elif op == "finished":
+            finished.append(entry)
+
+    with transaction.atomic():
+        # Rounds finished by earlier flushes are already counted
+        finished_rounds = [pk for pk, row in rounds.items() if row.move_count >= 2]
+        counted_rounds = {
+            str(pk)
+            for pk in GameRound.objects.filter(
+                pk__in=finished_rounds, move_count__gte=2
+            ).values_list("id", flat=True)
+        }
+
+        GameRound.objects.bulk_create(rounds.values(), ignore_conflicts=True)
+        GameRound.objects.bulk_update(
+            rounds.values(), ["move_count", "winner", "updated_at"]
+        )
+        Move.objects.bulk_create(moves, ignore_conflicts=True)
+        # 'auto_now_add' set the time of the flush, moves keep the time they were
+        # made at since rounds and games are read in the order of their moves.
+        for row, created_at in zip(moves, moved_at):
+            row.created_at = created_at
+        Move.objects.bulk_update(moves, ["created_at"])
+
+        new_rounds = [pk for pk in finished_rounds if pk not in counted_rounds]
+        if new_rounds:
+            round_moves = defaultdict(list)
+            for round_id, player_id, move in Move.objects.filter(
+                game_round__in=new_rounds
+            ).values_list("game_round_id", "player_id", "move"):
+                round_moves[str(round_id)].append((str(player_id), move))
+            count_rounds(
+                (
+                    round_moves[pk],
+                    None if rounds[pk].winner_id is None else str(rounds[pk].winner_id),
+                )
+                for pk in new_rounds
+            )
+
+        if finished:
+            counted = {
+                str(game_id)
+                for game_id in Game.objects.filter(
+                    pk__in=[entry["game"] for entry in finished], status=FINISHED
+                ).values_list("id", flat=True)
+            }
+            finished = [
+                entry for entry in finished if str(entry["game"]) not in counted
+            ]
+            for entry in finished:
+                count_finished_game(
+                    entry["players"], entry["rounds_won"], entry["winner"]
+                )
+
+        Game.objects.bulk_update(
+            games.values(),
+            ["status", "next_move", "current_round", "winner", "version", "updated_at"],
+        )
+
+        # Tournaments advance once the finished games are written
+        for tournament_id in dict.fromkeys(
+            entry["tournament"] for entry in finished if entry.get("tournament")
+        ):
+            advance_tournament(tournament_id)
+
+
+@lru_cache(maxsize=None)
+def get_write_behind() -> WriteBehind:
+    """
+    Return the write-behind store of the process, the journal of a previous run is
+    replayed and the worker is started on first use.
+    """
+
+    write_behind = WriteBehind(settings.GAME_WRITE_BEHIND_JOURNAL or None)
+    write_behind.replay()
+    write_behind.start()
+    atexit.register(write_behind.stop)
+    return write_behind
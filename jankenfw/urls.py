@@ -6,7 +6,15 @@ from django.views.generic.base import RedirectView
 from rest_framework.routers import DefaultRouter
 from rest_framework.authtoken import views
 
-from .game.views import GameViewSet, HighScoreAPI
+from libs.metrics import metrics_view
+from .game.views import (
+    AnalyticsAPI,
+    GameViewSet,
+    HighScoreAPI,
+    MatchmakingAPI,
+    PlayerViewSet,
+    TournamentViewSet,
+)
 from .users.views import UserViewSet, UserCreateViewSet
 
 router = DefaultRouter()
@@ -14,10 +22,15 @@ router.register(r"users", UserViewSet)
 router.register(r"users", UserCreateViewSet)
 router.register(r"game", GameViewSet)
 router.register(r"high-score", HighScoreAPI)
+router.register(r"players", PlayerViewSet, basename="players")
+router.register(r"matchmaking", MatchmakingAPI, basename="matchmaking")
+router.register(r"tournaments", TournamentViewSet)
+router.register(r"analytics", AnalyticsAPI, basename="analytics")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include(router.urls)),
+    path("metrics", metrics_view, name="metrics"),
     path("api-token-auth/", views.obtain_auth_token),
     path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
     # the 'api-root' from django rest-frameworks default router
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Callable
+from uuid import UUID
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def uuid7() -> UUID:
+    """
+    Return a time-ordered UUID, version 7 of RFC 9562.
+
+    The first 48 bits are the Unix time in milliseconds, followed by a 12 bit
+    sequence and 62 random bits. The sequence starts at a random value every
+    millisecond and is incremented for the next ids in the same millisecond, so
+    the ids made by a process are strictly increasing. New rows are appended to
+    the end of the primary key index instead of splitting random pages.
+    """
+
+    global _last_ms, _sequence
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Leave room to increment the sequence within the millisecond
+            _sequence = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _sequence += 1
+            if _sequence > 0xFFF:
+                # Borrow the next millisecond once the sequence runs out
+                _last_ms += 1
+                _sequence = 0
+        timestamp, sequence = _last_ms, _sequence
+
+    random_bits = int.from_bytes(os.urandom(8), "big") & (1 << 62) - 1
+    value = timestamp << 80 | 0x7 << 76 | sequence << 64 | 0b10 << 62 | random_bits
+    return UUID(int=value)
+
+
+@lru_cache(maxsize=None)
+def get_id_generator() -> Callable[[], UUID]:
+    """
+    Return the function set with the 'PRIMARY_KEY_GENERATOR' setting.
+    """
+
+    return import_string(settings.PRIMARY_KEY_GENERATOR)
+
+
+def generate_id() -> UUID:
+    """
+    Return a new primary key for a BaseModel row.
+    """
+
+    return get_id_generator()()
@@ -0,0 +1,105 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class RollingHistogram:
+    """
+    Observations of a single metric, the quantiles are computed from the last
+    'window' of them, while the count and the sum cover all of them.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.values: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.values.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantiles(self, quantiles: Iterable[float] = QUANTILES) -> List[float]:
+        ordered = sorted(self.values)
+        if not ordered:
+            return [0.0 for _ in quantiles]
+        return [
+            ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+            for quantile in quantiles
+        ]
+
+
+class Metrics:
+    """
+    Rolling histograms of request metrics per route.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], RollingHistogram] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def observe(self, route: str, name: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((name, route))
+            if histogram is None:
+                histogram = RollingHistogram(settings.METRICS_WINDOW)
+                self._histograms[(name, route)] = histogram
+            histogram.observe(value)
+
+    def get(self, route: str, name: str) -> RollingHistogram:
+        return self._histograms[(name, route)]
+
+    def render(self) -> str:
+        """
+        Return the histograms as summaries in the Prometheus text format.
+        """
+
+        with self._lock:
+            histograms = [
+                (name, route, histogram.quantiles(), histogram.count, histogram.sum)
+                for (name, route), histogram in sorted(self._histograms.items())
+            ]
+
+        lines = []
+        for index, (name, route, quantiles, count, total) in enumerate(histograms):
+            metric = f"jankenfw_request_{name}"
+            if index == 0 or histograms[index - 1][0] != name:
+                lines.append(f"# TYPE {metric} summary")
+            for quantile, value in zip(QUANTILES, quantiles):
+                lines.append(
+                    f'{metric}{{route="{route}",quantile="{quantile}"}} {value:g}'
+                )
+            lines.append(f'{metric}_count{{route="{route}"}} {count}')
+            lines.append(f'{metric}_sum{{route="{route}"}} {total:g}')
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def metrics_view(request) -> HttpResponse:
+    """
+    Expose the request metrics to Prometheus.
+
+    If the 'METRICS_TOKEN' setting is set, the scraper has to send it in the
+    'Authorization: Bearer <token>' header.
+    """
+
+    if settings.METRICS_TOKEN and (
+        request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,84 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from libs.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """
+    Count the queries run on the connection and the time spent in them.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the number of queries, the SQL time, the time spent rendering the
+    response and the wall time of every request, labelled with the name of the
+    route (e.g. 'game-move').
+
+    A request running more queries than the 'METRICS_QUERY_BUDGET' setting is
+    logged as a warning, as it is usually an N+1 query.
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._metrics_render_seconds = 0.0
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        wall_seconds = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        route = (match.url_name if match else None) or "unmatched"
+
+        metrics.observe(route, "queries", recorder.count)
+        metrics.observe(route, "sql_seconds", recorder.seconds)
+        metrics.observe(route, "serialization_seconds", request._metrics_render_seconds)
+        metrics.observe(route, "wall_seconds", wall_seconds)
+
+        if recorder.count > settings.METRICS_QUERY_BUDGET:
+            logger.warning(
+                "%s %s (%s) ran %d queries, the budget is %d.",
+                request.method,
+                request.path,
+                route,
+                recorder.count,
+                settings.METRICS_QUERY_BUDGET,
+            )
+
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        DRF responses are rendered right after this hook, measure the rendering
+        with a post render callback.
+        """
+
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_seconds = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
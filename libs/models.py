@@ -1,14 +1,16 @@
-from uuid import uuid4
-
 from django.db import models
 
+from libs.ids import generate_id
+
 
 class BaseModel(models.Model):
     """
     Base model to apply a UUID PK.
+
+    Keys are made by the 'PRIMARY_KEY_GENERATOR' setting, random UUIDs by default.
     """
 
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=generate_id, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -0,0 +1,110 @@
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer of rows fetched with 'values()', compiled from a DRF
+    ModelSerializer.
+
+    The fields of the model serializer are bound once and each row is converted
+    with the 'to_representation' of its fields, so the output is the same as the
+    output of the model serializer, but model instances aren't built and fields
+    aren't looked up for every object. Primary key relations are taken from the
+    foreign key columns and many to many relations are fetched for all rows with
+    a single query on the through table, ordered by the related primary key.
+
+    Only plain, primary key related and many to many primary key related fields
+    are supported.
+    """
+
+    def __init__(self, serializer_class: Type[serializers.ModelSerializer]) -> None:
+        self.serializer_class = serializer_class
+        self._fields: Optional[List[Tuple[str, str, Optional[Callable]]]] = None
+        self._many_to_many: List[Tuple[str, object]] = []
+
+    def _compile(self) -> None:
+        serializer = self.serializer_class()
+        opts = serializer.Meta.model._meta
+        fields, many_to_many = [], []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if isinstance(field, ManyRelatedField):
+                if not isinstance(field.child_relation, PrimaryKeyRelatedField):
+                    raise TypeError(f"Field '{name}' isn't a primary key relation.")
+                many_to_many.append((name, opts.get_field(field.source)))
+            elif isinstance(field, serializers.RelatedField):
+                if not isinstance(field, PrimaryKeyRelatedField):
+                    raise TypeError(f"Field '{name}' isn't a primary key relation.")
+                fields.append((name, field.source, None))
+            else:
+                fields.append(
+                    (name, "__".join(field.source_attrs), field.to_representation)
+                )
+
+        self._pk = opts.pk.attname
+        self._many_to_many = many_to_many
+        self._fields = fields
+
+    @property
+    def fields(self) -> List[Tuple[str, str, Optional[Callable]]]:
+        if self._fields is None:
+            self._compile()
+        return self._fields
+
+    def values(self, queryset: QuerySet, *extra: str) -> QuerySet:
+        """
+        Return the queryset fetching the columns of the fields, the primary key and
+        the 'extra' lookups, e.g. fields the rows are paginated by.
+        """
+
+        lookups = [lookup for _, lookup, _ in self.fields]
+        return queryset.values(*dict.fromkeys([self._pk, *extra, *lookups]))
+
+    def to_representation(self, row: Dict) -> Dict:
+        return self.many([row])[0]
+
+    def many(self, rows: Iterable[Dict]) -> List[Dict]:
+        rows = list(rows)
+        fields = self.fields
+
+        data = [
+            {
+                name: (
+                    row[lookup]
+                    if convert is None or row[lookup] is None
+                    else convert(row[lookup])
+                )
+                for name, lookup, convert in fields
+            }
+            for row in rows
+        ]
+
+        for name, field in self._many_to_many:
+            related = self._fetch_many_to_many(field, [row[self._pk] for row in rows])
+            for item, row in zip(data, rows):
+                item[name] = related.get(row[self._pk], [])
+
+        return data
+
+    def _fetch_many_to_many(self, field, pks: List) -> Dict:
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+        related = defaultdict(list)
+        if pks:
+            for pk, related_pk in (
+                through.objects.filter(**{f"{source}__in": pks})
+                .order_by(target)
+                .values_list(source, target)
+            ):
+                related[pk].append(related_pk)
+        return related